@@ -2,6 +2,9 @@ import math
 import numpy as np
 from datetime import datetime, timedelta
 from advanced_sentiment import advanced_analyzer
+from keyword_matcher import KeywordMatcher
+from simple_sentiment import simple_analyzer
+from static_factors import StaticFactorTable
 
 class AdvancedImpactCalculator:
     """Advanced impact calculator using multiple factors and metadata"""
@@ -30,10 +33,19 @@ class AdvancedImpactCalculator:
             'market': ['market', 'industry', 'sector', 'trend', 'demand', 'supply', 'growth', 'decline'],
             'general': ['company', 'business', 'corporate', 'management', 'strategy', 'plan']
         }
+        
+        # One pass over the text finds every keyword of every type
+        self.news_type_matcher = KeywordMatcher(
+            (keyword, news_type) for news_type, keywords in self.news_keywords.items() for keyword in keywords
+        )
+        
+        # Metadata-only factors, computed once per symbol and dropped when its metadata is refreshed
+        self.static_factors = StaticFactorTable(advanced_analyzer.get_stock_metadata, self.calculate_static_factors)
+        simple_analyzer.add_metadata_listener(self.static_factors.invalidate)
     
     def classify_news_type(self, headline, summary, entities):
         """Classify news type based on content and entities"""
-        text = f"{headline} {summary}".lower()
+        text = f"{headline} {summary}"
         
         # Check for entity-based classification first
         if entities.get('competitors'):
@@ -42,8 +54,9 @@ class AdvancedImpactCalculator:
             return 'supply_chain'
         
         # Check for keyword-based classification
-        for news_type, keywords in self.news_keywords.items():
-            if any(keyword in text for keyword in keywords):
+        matched_types = self.news_type_matcher.matches(text)
+        for news_type in self.news_keywords:
+            if news_type in matched_types:
                 return news_type
         
         return 'general'
@@ -78,10 +91,9 @@ class AdvancedImpactCalculator:
         
         return min(liquidity_factor, 1.5)
     
-    def calculate_sector_factor(self, metadata, entities):
-        """Calculate sector-specific impact factor"""
+    def calculate_sector_multiplier(self, metadata):
+        """Sector-specific multiplier before any industry keyword boost"""
         sector = metadata.get('sector', 'Technology').lower()
-        industry_keywords = entities.get('industry_keywords', [])
         
         # Sector-specific multipliers
         sector_multipliers = {
@@ -93,7 +105,12 @@ class AdvancedImpactCalculator:
             'utilities': 0.8        # Very stable
         }
         
-        base_multiplier = sector_multipliers.get(sector, 1.0)
+        return sector_multipliers.get(sector, 1.0)
+    
+    def calculate_sector_factor(self, metadata, entities, sector_multiplier=None):
+        """Calculate sector-specific impact factor"""
+        base_multiplier = self.calculate_sector_multiplier(metadata) if sector_multiplier is None else sector_multiplier
+        industry_keywords = entities.get('industry_keywords', [])
         
         # Industry keywords can amplify impact
         if industry_keywords:
@@ -101,6 +118,23 @@ class AdvancedImpactCalculator:
         
         return base_multiplier
     
+    def calculate_static_factors(self, metadata):
+        """Everything in the impact calculation that depends only on the stock"""
+        return {
+            'volatility_factor': self.calculate_volatility_factor(metadata),
+            'liquidity_factor': self.calculate_liquidity_factor(metadata),
+            'sector_multiplier': self.calculate_sector_multiplier(metadata),
+            'beta': metadata.get('beta', 1.0),
+            'metadata': {
+                'market_cap': metadata.get('market_cap', 0),
+                'beta': metadata.get('beta', 1.0),
+                'sector': metadata.get('sector', 'Unknown'),
+                'industry': metadata.get('industry', 'Unknown'),
+                'pe_ratio': metadata.get('pe_ratio', 0),
+                'revenue': metadata.get('revenue', 0)
+            }
+        }
+    
     def calculate_time_decay(self, news_datetime):
         """Calculate time decay factor - newer news has more impact"""
         if not news_datetime:
@@ -156,7 +190,7 @@ class AdvancedImpactCalculator:
         
         return min(entity_score, 2.0)
     
-    def predict_price_movement(self, sentiment_score, impact_score, metadata):
+    def predict_price_movement(self, sentiment_score, impact_score, beta):
         """Predict potential price movement"""
         # Base movement calculation
         base_movement = impact_score * 0.15  # 0.15% per impact point
@@ -179,7 +213,6 @@ class AdvancedImpactCalculator:
             movement = base_movement * 0.3
         
         # Adjust based on stock characteristics
-        beta = metadata.get('beta', 1.0)
         movement *= beta
         
         return {
@@ -192,8 +225,8 @@ class AdvancedImpactCalculator:
         """
         Calculate advanced impact score using comprehensive analysis
         """
-        # Get stock metadata
-        metadata = advanced_analyzer.get_stock_metadata(stock_symbol)
+        # Per-stock factors from the precomputed table
+        factors = self.static_factors.get(stock_symbol)
         
         # Extract entities from sentiment analysis
         entities = sentiment_analysis.get('entities', {})
@@ -209,12 +242,12 @@ class AdvancedImpactCalculator:
         base_weight = self.news_type_weights.get(news_type, 0.3)
         
         # Calculate various factors
-        volatility_factor = self.calculate_volatility_factor(metadata)
-        liquidity_factor = self.calculate_liquidity_factor(metadata)
-        sector_factor = self.calculate_sector_factor(metadata, entities)
+        volatility_factor = factors['volatility_factor']
+        liquidity_factor = factors['liquidity_factor']
+        sector_factor = self.calculate_sector_factor(factors['metadata'], entities, factors['sector_multiplier'])
         time_decay = self.calculate_time_decay(news_item.get('datetime'))
         sentiment_amplifier = self.calculate_sentiment_amplifier(sentiment_analysis)
-        entity_impact = self.calculate_entity_impact(entities, metadata)
+        entity_impact = self.calculate_entity_impact(entities, factors['metadata'])
         
         # Calculate final impact score (0-100)
         impact_score = (
@@ -247,7 +280,7 @@ class AdvancedImpactCalculator:
         price_prediction = self.predict_price_movement(
             sentiment_analysis.get('score', 0),
             impact_score,
-            metadata
+            factors['beta']
         )
         
         return {
@@ -265,14 +298,7 @@ class AdvancedImpactCalculator:
                 'entity_impact': round(entity_impact, 3)
             },
             'entities_found': entities,
-            'metadata': {
-                'market_cap': metadata.get('market_cap', 0),
-                'beta': metadata.get('beta', 1.0),
-                'sector': metadata.get('sector', 'Unknown'),
-                'industry': metadata.get('industry', 'Unknown'),
-                'pe_ratio': metadata.get('pe_ratio', 0),
-                'revenue': metadata.get('revenue', 0)
-            },
+            'metadata': dict(factors['metadata']),
             'analysis_models': sentiment_analysis.get('models_used', [])
         }
 
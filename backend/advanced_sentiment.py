@@ -1 +1,310 @@
- 
\ No newline at end of file
+"""
+Transformer sentiment for news articles
+
+InferenceEngine runs a sequence-classification model (FinBERT by default) on
+the CPU behind a micro-batching queue: concurrent callers drop their texts on
+the queue and a single inference thread groups them into batches of up to
+ADVANCED_MAX_BATCH_SIZE, waiting at most ADVANCED_MAX_LATENCY_MS for a batch
+to fill. torch and transformers are only imported when the first text arrives,
+so importing this module (and advanced_impact_calculator) stays cheap.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from config import (
+    ADVANCED_MODEL_PATH, ADVANCED_QUANTIZE, ADVANCED_MAX_BATCH_SIZE,
+    ADVANCED_MAX_LATENCY_MS, ADVANCED_MAX_LENGTH, ADVANCED_LABELS
+)
+from result_cache import sentiment_cache
+from simple_sentiment import simple_analyzer
+
+# Bump when scoring changes so cached results from older code are not reused
+ANALYZER_VERSION = 'advanced-transformer-1'
+
+class InferenceEngine:
+    """Lazily loaded classifier with a dynamic micro-batching queue"""
+
+    def __init__(self, model_path=ADVANCED_MODEL_PATH, quantize=ADVANCED_QUANTIZE,
+                 max_batch_size=ADVANCED_MAX_BATCH_SIZE, max_latency_ms=ADVANCED_MAX_LATENCY_MS,
+                 max_length=ADVANCED_MAX_LENGTH, labels=ADVANCED_LABELS):
+        self.model_path = model_path
+        self.configured_labels = labels
+        self.quantize = quantize
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max_latency_ms / 1000.0
+        self.max_length = max_length
+
+        self.model = None
+        self.tokenizer = None
+        self.labels = None
+        self.load_seconds = None
+        self.load_error = None
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.counters = {'requests': 0, 'batches': 0, 'texts': 0, 'largest_batch': 0}
+
+    def load(self):
+        """Load the tokenizer and model once; later calls return immediately"""
+        with self._lock:
+            if self.model is not None:
+                return self
+            start = time.perf_counter()
+            try:
+                import torch
+                from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+                tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+                model = AutoModelForSequenceClassification.from_pretrained(self.model_path)
+                model.eval()
+                if self.quantize:
+                    # int8 weights for the Linear layers, activations quantized on the fly
+                    from torch.ao.quantization import quantize_dynamic
+                    model = quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                labels = _label_names(model.config.id2label, self.configured_labels)
+            except Exception as e:
+                self.load_error = str(e)
+                print(f"❌ Error loading sentiment model {self.model_path}: {e}")
+                raise
+
+            self.tokenizer = tokenizer
+            self.labels = labels
+            self.model = model
+            self.load_error = None
+            self.load_seconds = time.perf_counter() - start
+            print(f"🧠 Loaded {self.model_path}{' (int8)' if self.quantize else ''} in {self.load_seconds:.1f}s")
+            return self
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='inference-engine', daemon=True)
+                self._thread.start()
+
+    def predict(self, texts):
+        """
+        Class probabilities for each text, batched with whatever other callers submit meanwhile
+
+        Returns:
+            list: One {'positive': p, 'negative': p, 'neutral': p} dict per text, in order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        self.load()
+        self._ensure_worker()
+
+        futures = []
+        for text in texts:
+            future = Future()
+            self._queue.put((text, future))
+            futures.append(future)
+        with self._lock:
+            self.counters['requests'] += 1
+        return [future.result() for future in futures]
+
+    def predict_direct(self, texts):
+        """Probabilities for texts as one batch on the calling thread, bypassing the queue"""
+        self.load()
+        return self._infer(list(texts))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_latency
+
+            # Fill the batch until it is full or the oldest request has waited long enough
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            texts = [text for text, _ in batch]
+            try:
+                results = self._infer(texts)
+            except Exception as e:
+                print(f"❌ Error running sentiment model: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            with self._lock:
+                self.counters['batches'] += 1
+                self.counters['texts'] += len(batch)
+                self.counters['largest_batch'] = max(self.counters['largest_batch'], len(batch))
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _infer(self, texts):
+        import torch
+
+        encoded = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors='pt'
+        )
+        with torch.inference_mode():
+            probabilities = torch.softmax(self.model(**encoded).logits, dim=-1).tolist()
+        return [
+            {label: row[i] for i, label in enumerate(self.labels) if label is not None}
+            for row in probabilities
+        ]
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        batches = counters['batches']
+        return dict(
+            counters,
+            average_batch=round(counters['texts'] / batches, 2) if batches else 0.0,
+            model_path=self.model_path,
+            quantized=self.quantize,
+            loaded=self.model is not None,
+            load_seconds=round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            load_error=self.load_error,
+            queued=self._queue.qsize()
+        )
+
+def _label_names(id2label, configured=''):
+    """
+    Map the model's class ids onto positive/negative/neutral
+
+    Uses the configured names (ADVANCED_LABELS, comma-separated in class-id order)
+    when given, otherwise the model's own id2label. Generic LABEL_0..N heads say
+    nothing about which class is which, so they need the configured names;
+    guessing could silently swap positive and negative.
+
+    Raises:
+        ValueError: If the labels are not all positive/negative/neutral, or the
+        configured names do not match the model's number of classes
+    """
+    known = {'positive', 'negative', 'neutral'}
+    names = [str(id2label[i]).lower() for i in sorted(id2label)]
+    if configured:
+        configured_names = [name.strip().lower() for name in configured.split(',')]
+        if len(configured_names) != len(names) or not set(configured_names) <= known:
+            raise ValueError(
+                f"ADVANCED_LABELS={configured!r} must name {len(names)} classes from {sorted(known)}"
+            )
+        return configured_names
+    if not set(names) <= known:
+        raise ValueError(
+            f"Model labels {names} are not positive/negative/neutral; "
+            "set ADVANCED_LABELS to the class names in class-id order"
+        )
+    return names
+
+class AdvancedSentimentAnalyzer:
+    """Transformer-based sentiment with the entity extraction of the simple analyzer"""
+
+    def __init__(self, engine=None):
+        self.engine = engine or InferenceEngine()
+
+    def get_stock_metadata(self, symbol):
+        """Stock metadata for impact calculation"""
+        return simple_analyzer.get_stock_metadata(symbol)
+
+    def analyze_sentiment_advanced(self, news_item, stock_symbol):
+        """Transformer sentiment for one article"""
+        return self.analyze_many([news_item], stock_symbol)[0]
+
+    def analyze_many(self, news_items, stock_symbol):
+        """
+        Score a list of articles for one stock
+
+        Texts missing from the result cache are sent to the engine together, so
+        one call fills whole batches on its own.
+
+        Returns:
+            list: One result per article, in input order
+        """
+        metadata = self.get_stock_metadata(stock_symbol)
+        texts = [f"{item.get('headline', '')} {item.get('summary', '')}".strip() for item in news_items]
+
+        version = f'{ANALYZER_VERSION}:{self.engine.model_path}:{int(bool(self.engine.quantize))}'
+        keys = [sentiment_cache.make_key(version, text) for text in texts]
+        probabilities = [sentiment_cache.get(key) for key in keys]
+        missing = list(dict.fromkeys(texts[i] for i, cached in enumerate(probabilities) if cached is None))
+        if missing:
+            fresh = dict(zip(missing, self.engine.predict(missing)))
+            for i, text in enumerate(texts):
+                if probabilities[i] is None:
+                    probabilities[i] = fresh[text]
+                    sentiment_cache.set(keys[i], fresh[text])
+
+        return [
+            self._build_result(item, stock_symbol, text, scores, metadata)
+            for item, text, scores in zip(news_items, texts, probabilities)
+        ]
+
+    def _build_result(self, news_item, stock_symbol, text, probabilities, metadata):
+        positive = probabilities.get('positive', 0.0)
+        negative = probabilities.get('negative', 0.0)
+        neutral = probabilities.get('neutral', 0.0)
+        score = positive - negative
+
+        if score >= 0.05:
+            label = 'POSITIVE'
+        elif score <= -0.05:
+            label = 'NEGATIVE'
+        else:
+            label = 'NEUTRAL'
+
+        found = simple_analyzer.extract_entities(text, metadata)
+        entities = {
+            'competitors': found['competitors'],
+            'suppliers': found['suppliers'],
+            'raw_materials': found['raw_materials'],
+            'industry_keywords': found['keywords']
+        }
+
+        impact_multiplier = 1.0
+        if entities['competitors']:
+            impact_multiplier *= 1.3
+        if entities['suppliers']:
+            impact_multiplier *= 1.2
+        if entities['raw_materials']:
+            impact_multiplier *= 1.4
+        if entities['industry_keywords']:
+            impact_multiplier *= 1.1
+
+        return {
+            'label': label,
+            'score': round(score, 3),
+            'confidence': round(max(positive, negative, neutral), 3),
+            'impact_multiplier': round(impact_multiplier, 2),
+            'entities': entities,
+            'model_scores': {
+                'positive': round(positive, 3),
+                'negative': round(negative, 3),
+                'neutral': round(neutral, 3)
+            },
+            'models_used': [self.engine.model_path],
+            'stock_symbol': stock_symbol,
+            'news_id': news_item.get('id'),
+            'headline': news_item.get('headline', ''),
+            'summary': news_item.get('summary', ''),
+            'timestamp': news_item.get('datetime'),
+            'source': news_item.get('source'),
+            'url': news_item.get('url')
+        }
+
+# Global instance
+advanced_analyzer = AdvancedSentimentAnalyzer()
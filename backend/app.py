@@ -1,12 +1,23 @@
-from fastapi import FastAPI, Request
-from stock_monitor import monitor_stocks
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from monitor_scheduler import monitor_scheduler, QueueFullError
+from price_stream import price_stream
+from stock_monitor import start_price_stream
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import smtplib
 from email.mime.text import MIMEText
 import os
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    monitor_scheduler.start()
+    start_price_stream()
+    yield
+    price_stream.stop()
+    monitor_scheduler.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow CORS for local frontend
 app.add_middleware(
@@ -26,10 +37,20 @@ class AlertEmail(BaseModel):
     change: float
     changePercent: float
 
-@app.post('/monitor')
+@app.post('/monitor', status_code=202)
 def run_monitor():
-    alerts = monitor_stocks()
-    return {'alerts': alerts}
+    try:
+        job = monitor_scheduler.submit()
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {'job_id': job['id'], 'status': job['status'], 'coalesced': job['coalesced']}
+
+@app.get('/monitor/jobs/{job_id}')
+def get_monitor_job(job_id: str):
+    job = monitor_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Monitoring job {job_id} not found")
+    return job
 
 @app.get('/status')
 def status():
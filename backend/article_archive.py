@@ -0,0 +1,285 @@
+"""
+Durable archive of analyzed articles
+
+Every article scored by /news, /advanced and the monitor is appended to a
+SQLite table together with its sentiment and impact results, so historical
+views can be read back instead of re-fetching and re-scoring.
+
+Requests never wait on the disk: record() only puts rows on a queue, and a
+writer thread inserts them in batched transactions of up to
+ARCHIVE_BATCH_SIZE rows (or whatever arrived within ARCHIVE_FLUSH_SECONDS).
+Rows are unique per (symbol, analyzer, article key), so an article scored by
+several requests is stored once per analyzer. The key is a fingerprint of the
+article's url, headline and summary rather than its id: ids can be missing,
+and the mock news served without an API key gets a new id on every fetch.
+
+The archive is opt-in: nothing is written unless ARCHIVE_DB_PATH is set.
+
+Queries page newest first with a keyset cursor on (datetime, seq), which
+stays fast however deep the caller pages.
+"""
+
+import hashlib
+import json
+import queue
+import sqlite3
+import threading
+import time
+from config import ARCHIVE_ENABLED, ARCHIVE_DB_PATH, ARCHIVE_BATCH_SIZE, ARCHIVE_FLUSH_SECONDS, ARCHIVE_QUEUE_SIZE
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS analyzed_articles (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        analyzer TEXT NOT NULL,
+        news_id TEXT,
+        article_key TEXT NOT NULL,
+        datetime INTEGER NOT NULL,
+        headline TEXT,
+        summary TEXT,
+        source TEXT,
+        url TEXT,
+        news_type TEXT,
+        impact_level TEXT,
+        impact_score REAL,
+        sentiment_label TEXT,
+        sentiment_score REAL,
+        sentiment TEXT NOT NULL,
+        impact TEXT,
+        archived_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_articles_symbol_datetime ON analyzed_articles (symbol, datetime);
+    CREATE INDEX IF NOT EXISTS idx_articles_news_type_datetime ON analyzed_articles (news_type, datetime);
+    CREATE INDEX IF NOT EXISTS idx_articles_impact_level_datetime ON analyzed_articles (impact_level, datetime);
+    CREATE INDEX IF NOT EXISTS idx_articles_datetime ON analyzed_articles (datetime);
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_key ON analyzed_articles (symbol, analyzer, article_key);
+'''
+
+COLUMNS = (
+    'symbol', 'analyzer', 'news_id', 'article_key', 'datetime', 'headline', 'summary', 'source', 'url', 'news_type',
+    'impact_level', 'impact_score', 'sentiment_label', 'sentiment_score', 'sentiment', 'impact', 'archived_at'
+)
+
+INSERT_SQL = (
+    f"INSERT OR IGNORE INTO analyzed_articles ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in COLUMNS)})"
+)
+
+def article_key(item):
+    """Stable identity of an article across fetches: SHA-1 over url, headline and summary"""
+    digest = hashlib.sha1()
+    for part in (item.get('url'), item.get('headline'), item.get('summary')):
+        digest.update(b'\x00')
+        digest.update(str(part or '').strip().encode('utf-8'))
+    return digest.hexdigest()
+
+def encode_cursor(datetime_value, seq):
+    return f"{datetime_value}:{seq}"
+
+def decode_cursor(cursor):
+    """(datetime, seq) from a cursor string; ValueError if it is malformed"""
+    datetime_value, seq = cursor.split(':')
+    return int(datetime_value), int(seq)
+
+class ArticleArchive:
+    """Append-only SQLite archive of analyzed articles with a batched background writer"""
+
+    def __init__(self, path=ARCHIVE_DB_PATH, enabled=ARCHIVE_ENABLED, batch_size=ARCHIVE_BATCH_SIZE,
+                 flush_seconds=ARCHIVE_FLUSH_SECONDS, queue_size=ARCHIVE_QUEUE_SIZE):
+        self.path = path
+        self.enabled = enabled and bool(path)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._reader = None
+        self._writer = None
+        self._thread = None
+        self.counters = {'queued': 0, 'written': 0, 'duplicates': 0, 'dropped': 0, 'batches': 0, 'errors': 0}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._writer is None:
+                self._writer = self._connect()
+                self._reader = self._connect()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='article-archive', daemon=True)
+                self._thread.start()
+
+    def record(self, symbol, analyzer, items, results):
+        """
+        Queue analyzed articles for archiving; never blocks the caller
+
+        Args:
+            analyzer (str): Which path scored them ('simple', 'advanced', 'monitor')
+            results (list): (sentiment, impact) per item; impact may be None
+        """
+        if not self.enabled:
+            return 0
+        self._ensure_started()
+        now = time.time()
+        queued = 0
+        for item, (sentiment, impact) in zip(items, results):
+            row = self._row(symbol, analyzer, item, sentiment, impact, now)
+            try:
+                self._queue.put_nowait(row)
+                queued += 1
+            except queue.Full:
+                self.counters['dropped'] += 1
+        self.counters['queued'] += queued
+        return queued
+
+    def _row(self, symbol, analyzer, item, sentiment, impact, now):
+        impact = impact or {}
+        news_type = impact.get('news_type') or sentiment.get('news_type')
+        news_id = item.get('id')
+        return (
+            symbol,
+            analyzer,
+            str(news_id) if news_id is not None else None,
+            article_key(item),
+            int(item.get('datetime') or 0),
+            item.get('headline'),
+            item.get('summary'),
+            item.get('source'),
+            item.get('url'),
+            news_type.upper() if news_type else None,
+            impact.get('impact_level'),
+            impact.get('impact_score'),
+            str(sentiment.get('label', '')).upper() or None,
+            sentiment.get('score'),
+            json.dumps(sentiment, default=str),
+            json.dumps(impact, default=str) if impact else None,
+            now
+        )
+
+    def _run(self):
+        while True:
+            row = self._queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.flush_seconds
+            while True:
+                if isinstance(row, threading.Event):
+                    waiters.append(row)
+                else:
+                    batch.append(row)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    row = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+
+    def _write(self, rows):
+        try:
+            self._writer.execute('BEGIN')
+            before = self._writer.total_changes
+            self._writer.executemany(INSERT_SQL, rows)
+            written = self._writer.total_changes - before
+            self._writer.execute('COMMIT')
+        except Exception as e:
+            print(f"❌ Error writing {len(rows)} articles to the archive: {e}")
+            if self._writer.in_transaction:
+                self._writer.execute('ROLLBACK')
+            self.counters['errors'] += 1
+            return
+        self.counters['written'] += written
+        self.counters['duplicates'] += len(rows) - written
+        self.counters['batches'] += 1
+
+    def flush(self, timeout=10):
+        """Wait until everything queued so far is committed"""
+        if not self.enabled or self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def query(self, symbol=None, start=None, end=None, news_type=None, impact_level=None,
+              analyzer=None, limit=50, cursor=None):
+        """
+        Archived articles newest first, one page at a time
+
+        Args:
+            start, end (int): Unix time range on the article datetime, inclusive
+            cursor (str): next_cursor from the previous page
+
+        Returns:
+            dict: {'articles': [...], 'next_cursor': str or None}
+        """
+        if not self.enabled:
+            return {'articles': [], 'next_cursor': None}
+        self._ensure_started()
+
+        conditions, params = [], []
+        for column, value in (('symbol', symbol), ('news_type', news_type),
+                              ('impact_level', impact_level), ('analyzer', analyzer)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        if start is not None:
+            conditions.append('datetime >= ?')
+            params.append(int(start))
+        if end is not None:
+            conditions.append('datetime <= ?')
+            params.append(int(end))
+        if cursor:
+            conditions.append('(datetime, seq) < (?, ?)')
+            params.extend(decode_cursor(cursor))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        sql = f'SELECT seq, {", ".join(COLUMNS)} FROM analyzed_articles {where} ORDER BY datetime DESC, seq DESC LIMIT ?'
+        with self._lock:
+            rows = self._reader.execute(sql, params + [limit + 1]).fetchall()
+
+        articles = [self._article(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = articles[-1]
+            next_cursor = encode_cursor(last['datetime'], last['seq'])
+        return {'articles': articles, 'next_cursor': next_cursor}
+
+    def _article(self, row):
+        values = dict(zip(('seq',) + COLUMNS, row))
+        return {
+            'seq': values['seq'],
+            'symbol': values['symbol'],
+            'analyzer': values['analyzer'],
+            'id': values['news_id'],
+            'datetime': values['datetime'],
+            'headline': values['headline'],
+            'summary': values['summary'],
+            'source': values['source'],
+            'url': values['url'],
+            'news_type': values['news_type'],
+            'impact_level': values['impact_level'],
+            'impact_score': values['impact_score'],
+            'sentiment_analysis': json.loads(values['sentiment']),
+            'impact_analysis': json.loads(values['impact']) if values['impact'] else None,
+            'archived_at': values['archived_at']
+        }
+
+    def stats(self):
+        result = dict(self.counters, enabled=self.enabled, path=self.path, pending=self._queue.qsize())
+        if self.enabled and self._reader is not None:
+            with self._lock:
+                result['articles'] = self._reader.execute('SELECT COUNT(*) FROM analyzed_articles').fetchone()[0]
+        return result
+
+    def close(self):
+        self.flush()
+
+# Global instance
+article_archive = ArticleArchive()
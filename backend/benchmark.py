@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the backend's hot paths
+Run from the backend directory, e.g.: python benchmark.py dedup --count 10000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Benchmarks clear the sentiment cache between runs; keep it in memory so a
+# configured SENTIMENT_CACHE_PATH (and the results persisted there) is never touched.
+# Set before any backend module reads config, and inherited by pool workers.
+os.environ['SENTIMENT_CACHE_PATH'] = ''
+
+def benchmark_dedup(count, fp_rate, buckets):
+    """Rotating Bloom filter vs the exact per-symbol set for seen-news ids"""
+    from news_dedup import RotatingBloomFilter
+    
+    print(f"🧪 Seen-news dedup: {count:,} ids, target FP rate {fp_rate}, {buckets} buckets")
+    print("=" * 60)
+    
+    keys = (f'SYM{i % 5000}:{i}' for i in range(count))
+    
+    # Exact set, as stock_monitor used to keep it
+    start = time.perf_counter()
+    exact = set()
+    for key in keys:
+        exact.add(key)
+    exact_insert = time.perf_counter() - start
+    exact_bytes = sys.getsizeof(exact) + sum(sys.getsizeof(key) for key in exact)
+    
+    start = time.perf_counter()
+    hits = sum(1 for i in range(count) if f'SYM{i % 5000}:{i}' in exact)
+    exact_lookup = time.perf_counter() - start
+    del exact
+    
+    # Every id is added at the same moment, so all of them land in the current bucket:
+    # size that bucket for the whole count so the filter is not overfull
+    bloom = RotatingBloomFilter(
+        window_seconds=7 * 86400,
+        buckets=buckets,
+        bucket_capacity=count,
+        fp_rate=fp_rate
+    )
+    now = time.time()
+    start = time.perf_counter()
+    for i in range(count):
+        bloom.add(f'SYM{i % 5000}:{i}', now)
+    bloom_insert = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    bloom_hits = sum(1 for i in range(count) if f'SYM{i % 5000}:{i}' in bloom)
+    bloom_lookup = time.perf_counter() - start
+    
+    # Probe ids that were never inserted to measure the real false-positive rate
+    probes = min(count, 1000000)
+    false_positives = sum(1 for i in range(probes) if f'NEW{i % 5000}:{i}' in bloom)
+    stats = bloom.stats()
+    
+    print(f"  Exact set:   {exact_bytes / 1e6:10.1f} MB | insert {count / exact_insert:12,.0f}/s | lookup {count / exact_lookup:12,.0f}/s | hits {hits:,}")
+    print(f"  Bloom:       {stats['memory_bytes'] / 1e6:10.1f} MB | insert {count / bloom_insert:12,.0f}/s | lookup {count / bloom_lookup:12,.0f}/s | hits {bloom_hits:,}")
+    print(f"  Memory ratio: {exact_bytes / stats['memory_bytes']:.1f}x smaller")
+    print(f"  FP rate: estimated {stats['estimated_fp_rate']:.6f}, measured {false_positives / probes:.6f} over {probes:,} unseen ids")
+
+def make_articles(count, duplicate_ratio=0.3, seed=7):
+    """Synthetic news corpus; a share of the articles repeat an earlier headline/summary like syndicated copies do"""
+    import random
+    
+    rng = random.Random(seed)
+    subjects = ['Apple', 'Microsoft', 'Tesla', 'Nvidia', 'Amazon', 'Alphabet']
+    events = [
+        'reports record quarterly earnings and raises revenue guidance',
+        'faces regulatory investigation over compliance violations',
+        'announces new product launch with breakthrough technology',
+        'signs partnership deal with TSMC to secure chip supply',
+        'warns of supply chain shortage hitting production',
+        'loses market share to rival as competition intensifies',
+        'shares slide as demand weakens across the sector',
+        'beats analyst expectations but misses on profit margin'
+    ]
+    details = [
+        'Analysts were surprised by the strong results.',
+        'Investors worry about lithium and silicon costs.',
+        'The company expects growth to continue next year.',
+        'Critics call the decision a serious mistake.',
+        'Samsung and Foxconn were also mentioned in the report.'
+    ]
+    
+    articles = []
+    for i in range(count):
+        if articles and rng.random() < duplicate_ratio:
+            original = rng.choice(articles)
+            articles.append(dict(original, id=i))
+            continue
+        subject = rng.choice(subjects)
+        articles.append({
+            'id': i,
+            'headline': f'{subject} {rng.choice(events)}',
+            'summary': f'{rng.choice(details)} {rng.choice(details)} ({i})' if rng.random() < 0.5 else rng.choice(details),
+            'datetime': 1700000000 + i,
+            'source': 'Benchmark',
+            'url': f'https://example.com/{i}'
+        })
+    return articles
+
+def benchmark_sentiment_batch(count, duplicate_ratio):
+    """SimpleSentimentAnalyzer.analyze_many vs one analyze_sentiment_simple call per article"""
+    from simple_sentiment import simple_analyzer
+    from result_cache import sentiment_cache
+    
+    articles = make_articles(count, duplicate_ratio)
+    print(f"🧪 Sentiment batch: {count:,} articles, {duplicate_ratio:.0%} duplicates")
+    print("=" * 60)
+    
+    # Warm up lexicons and the metadata cache so neither path pays first-call costs
+    simple_analyzer.analyze_many(articles[:10], 'AAPL')
+    
+    # Start each path cold so the result cache doesn't hide the batching gain
+    sentiment_cache.clear()
+    start = time.perf_counter()
+    per_item = [simple_analyzer.analyze_sentiment_simple(article, 'AAPL') for article in articles]
+    per_item_seconds = time.perf_counter() - start
+    
+    sentiment_cache.clear()
+    start = time.perf_counter()
+    batched = simple_analyzer.analyze_many(articles, 'AAPL')
+    batch_seconds = time.perf_counter() - start
+    
+    print(f"  Per-item:     {count / per_item_seconds:10,.0f} articles/s ({per_item_seconds:.2f}s)")
+    print(f"  analyze_many: {count / batch_seconds:10,.0f} articles/s ({batch_seconds:.2f}s)")
+    print(f"  Speed-up:     {per_item_seconds / batch_seconds:.1f}x")
+    print(f"  Identical results: {'✅' if per_item == batched else '❌'}")
+
+def benchmark_sentiment_scorer(count):
+    """Vectorized lexicon scorer vs calling VADER and TextBlob per article"""
+    from simple_sentiment import SimpleSentimentAnalyzer
+    
+    articles = make_articles(count, duplicate_ratio=0)
+    texts = [f"{article['headline']} {article['summary']}".strip() for article in articles]
+    exact = SimpleSentimentAnalyzer(scorer='exact')
+    fast = SimpleSentimentAnalyzer(scorer='fast')
+    print(f"🧪 Sentiment scorer: {count:,} articles")
+    print("=" * 60)
+    
+    start = time.perf_counter()
+    expected = [exact._exact_scores(text) for text in texts]
+    exact_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    scored = fast.fast_scorer.score_many(texts)
+    fast_seconds = time.perf_counter() - start
+    
+    worst = max(
+        max(abs(a['vader']['compound'] - b['vader']['compound']),
+            abs(a['textblob'][0] - b['textblob'][0]),
+            abs(a['textblob'][1] - b['textblob'][1]))
+        for a, b in zip(expected, scored)
+    )
+    print(f"  VADER + TextBlob: {count / exact_seconds:10,.0f} articles/s ({exact_seconds:.2f}s)")
+    print(f"  Fast scorer:      {count / fast_seconds:10,.0f} articles/s ({fast_seconds:.2f}s)")
+    print(f"  Speed-up:         {exact_seconds / fast_seconds:.1f}x")
+    print(f"  Largest score difference: {worst:.4f}")
+
+def benchmark_impact_batch(count, seed=7):
+    """Vectorized score_batch vs calculate_simple_impact per article"""
+    import random
+    from simple_impact_calculator import simple_impact_calculator
+    
+    rng = random.Random(seed)
+    as_of = time.time()
+    news_types = list(simple_impact_calculator.news_type_weights) + ['other']
+    articles = [{'id': i, 'datetime': int(as_of - rng.uniform(0, 14 * 86400)) if rng.random() > 0.05 else None} for i in range(count)]
+    sentiments = [
+        {
+            'score': round(rng.uniform(-1, 1), 3),
+            'confidence': round(rng.uniform(0, 1), 3),
+            'impact_multiplier': rng.choice([1.0, 1.1, 1.3, 1.43, 2.0]),
+            'news_type': rng.choice(news_types).upper(),
+            'entities_found': {}
+        }
+        for _ in range(count)
+    ]
+    print(f"🧪 Impact scoring: {count:,} articles")
+    print("=" * 60)
+    
+    start = time.perf_counter()
+    expected = [simple_impact_calculator.calculate_simple_impact('AAPL', article, sentiment, as_of) for article, sentiment in zip(articles, sentiments)]
+    scalar_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    batched = simple_impact_calculator.calculate_simple_impact_many('AAPL', articles, sentiments, as_of)
+    batch_seconds = time.perf_counter() - start
+    
+    # Arrays only, without building the result dicts
+    columns = (
+        [s['score'] for s in sentiments], [s['confidence'] for s in sentiments], [s['impact_multiplier'] for s in sentiments],
+        [simple_impact_calculator.news_type_id(s['news_type']) for s in sentiments],
+        [a['datetime'] or float('nan') for a in articles]
+    )
+    factors = simple_impact_calculator.static_factors.get('AAPL')
+    start = time.perf_counter()
+    simple_impact_calculator.score_batch(*columns, factors, as_of)
+    array_seconds = time.perf_counter() - start
+    
+    print(f"  Per article:  {count / scalar_seconds:12,.0f} articles/s ({scalar_seconds:.2f}s)")
+    print(f"  Batch dicts:  {count / batch_seconds:12,.0f} articles/s ({batch_seconds:.2f}s)")
+    print(f"  score_batch:  {count / array_seconds:12,.0f} articles/s ({array_seconds:.3f}s)")
+    print(f"  Speed-up:     {scalar_seconds / batch_seconds:.1f}x with dicts, {scalar_seconds / array_seconds:.1f}x arrays only")
+    print(f"  Identical results: {'✅' if expected == batched else '❌'}")
+
+def benchmark_entity_index(universes, articles, seed=7):
+    """Inverted entity index vs checking every symbol's entities, as the universe grows"""
+    import random
+    from entity_index import EntityIndex
+    
+    rng = random.Random(seed)
+    print(f"🧪 Entity index: {articles:,} articles per universe size")
+    print("=" * 60)
+    for size in universes:
+        entities = [f"Entity{i}" for i in range(size * 2)]
+        metadata = {
+            f"SYM{i}": {
+                'competitors': rng.sample(entities, 4),
+                'suppliers': rng.sample(entities, 3),
+                'raw_materials': rng.sample(entities, 3)
+            }
+            for i in range(size)
+        }
+        texts = [
+            f"{rng.choice(entities)} and {rng.choice(entities)} report quarterly results as supply tightens"
+            for _ in range(articles)
+        ]
+        index = EntityIndex(universe=list(metadata), load_metadata=metadata.get)
+        start = time.perf_counter()
+        index.build()
+        build_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        indexed = [index.affected(text) for text in texts]
+        index_seconds = time.perf_counter() - start
+        
+        # Baseline: every symbol checks its own entity lists against the text
+        start = time.perf_counter()
+        scanned = []
+        for text in texts:
+            words = set(text.lower().split())
+            scanned.append({
+                symbol for symbol, data in metadata.items()
+                if any(name.lower() in words for relation in ('competitors', 'suppliers', 'raw_materials') for name in data[relation])
+            })
+        scan_seconds = time.perf_counter() - start
+        
+        same = [set(result) for result in indexed] == scanned
+        print(f"  {size:>6,} symbols: index {index_seconds / articles * 1e6:8.1f}µs/article, "
+              f"scan {scan_seconds / articles * 1e6:10.1f}µs/article, build {build_seconds:.2f}s, "
+              f"same {'✅' if same else '❌'}")
+
+def benchmark_metadata_table(count, lookups, seed=7):
+    """Compiled, memory-mapped metadata table vs a dict of dicts, for a large ticker universe"""
+    import json
+    import os
+    import random
+    import tempfile
+    import tracemalloc
+    from metadata_table import MetadataTable, build_arrays, write_table, read_source
+    
+    rng = random.Random(seed)
+    sectors = ['Technology', 'Healthcare', 'Financials', 'Energy', 'Industrials', 'Utilities']
+    entities = [f"Entity{i}" for i in range(count // 2)]
+    records = {
+        f"SYM{i}": {
+            'market_cap': rng.randrange(10**8, 10**12),
+            'sector': rng.choice(sectors),
+            'industry': f"Industry{rng.randrange(150)}",
+            'competitors': rng.sample(entities, 4),
+            'suppliers': rng.sample(entities, 3),
+            'raw_materials': rng.sample(entities, 2),
+            'beta': round(rng.uniform(0.5, 2.5), 2),
+            'pe_ratio': round(rng.uniform(5, 60), 1),
+            'revenue': rng.randrange(10**7, 10**11),
+            'profit_margin': round(rng.uniform(-0.1, 0.4), 3)
+        }
+        for i in range(count)
+    }
+    symbols = [f"SYM{rng.randrange(count)}" for _ in range(lookups)]
+    
+    print(f"🧪 Metadata table: {count:,} symbols, {lookups:,} lookups")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'metadata.json')
+        table_path = os.path.join(directory, 'metadata.table')
+        with open(source_path, 'w') as f:
+            json.dump(records, f)
+        
+        start = time.perf_counter()
+        write_table(table_path, build_arrays(read_source(source_path)))
+        compile_seconds = time.perf_counter() - start
+        
+        # Python heap each process pays to hold the metadata: parsed dicts vs the mapped table
+        tracemalloc.start()
+        with open(source_path) as f:
+            parsed = json.load(f)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        MetadataTable.open(source_path, table_path)
+        table_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        start = time.perf_counter()
+        table = MetadataTable.open(source_path, table_path)
+        open_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        rows = [table.row(symbol) for symbol in symbols]
+        row_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        found = [table.get(symbol) for symbol in symbols]
+        get_seconds = time.perf_counter() - start
+        
+        same = all(found[i] == parsed[symbol] for i, symbol in enumerate(symbols[:1000]))
+        print(f"  Compile:      {compile_seconds:.2f}s -> {os.path.getsize(table_path) / 1e6:.1f} MB file")
+        print(f"  Open (mmap):  {open_seconds * 1e3:.2f}ms")
+        print(f"  Row lookup:   {row_seconds / lookups * 1e6:.2f}µs/symbol")
+        print(f"  Full record:  {get_seconds / lookups * 1e6:.2f}µs/symbol")
+        print(f"  Heap per process: {table_bytes / 1e6:.2f} MB mapped table vs {dict_bytes / 1e6:.1f} MB of dicts")
+        print(f"  Identical records: {'✅' if same and None not in rows else '❌'}")
+
+def benchmark_sentiment_pool(count, workers, chunk_size):
+    """Scoring throughput in-process and across growing worker pools"""
+    from simple_sentiment import simple_analyzer
+    from result_cache import sentiment_cache
+    from sentiment_pool import SentimentPool
+    
+    # No duplicates, so every article costs a full VADER + TextBlob pass
+    articles = make_articles(count, duplicate_ratio=0)
+    print(f"🧪 Sentiment pool: {count:,} articles, chunks of {chunk_size}")
+    print("=" * 60)
+    
+    simple_analyzer.analyze_many(articles[:10], 'AAPL')
+    sentiment_cache.clear()
+    start = time.perf_counter()
+    expected = simple_analyzer.analyze_many(articles, 'AAPL')
+    baseline = count / (time.perf_counter() - start)
+    print(f"  In-process:  {baseline:10,.0f} articles/s")
+    
+    for size in workers:
+        # Workers start (and load their analyzers) before the clock runs
+        pool = SentimentPool(workers=size, chunk_size=chunk_size).start()
+        try:
+            start = time.perf_counter()
+            results = pool.analyze_many(articles, 'AAPL')
+            rate = count / (time.perf_counter() - start)
+        finally:
+            pool.close()
+        print(f"  {size:2d} worker(s): {rate:10,.0f} articles/s | {rate / baseline:4.1f}x in-process | "
+              f"{rate / baseline / size:4.0%} per-core efficiency | identical {'✅' if results == expected else '❌'}")
+
+def benchmark_inference(model_path, count, callers, batch_size, quantize):
+    """Micro-batched transformer inference vs one forward pass per request"""
+    from concurrent.futures import ThreadPoolExecutor
+    from advanced_sentiment import InferenceEngine
+    
+    texts = [f"{article['headline']} {article['summary']}" for article in make_articles(count, duplicate_ratio=0)]
+    print(f"🧪 Inference: {count:,} texts from {callers} concurrent callers, model {model_path}{' (int8)' if quantize else ''}")
+    print("=" * 60)
+    
+    for size in (1, batch_size):
+        engine = InferenceEngine(model_path=model_path, quantize=quantize, max_batch_size=size)
+        engine.load()
+        engine.predict(texts[:2])
+        with ThreadPoolExecutor(max_workers=callers) as pool:
+            start = time.perf_counter()
+            list(pool.map(lambda text: engine.predict([text]), texts))
+            seconds = time.perf_counter() - start
+        stats = engine.stats()
+        engine.close()
+        print(f"  max batch {size:3d}: {count / seconds:8,.1f} texts/s | average batch {stats['average_batch']}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Backend benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    
+    dedup = subparsers.add_parser('dedup', help='Bloom filter vs exact set for seen-news ids')
+    dedup.add_argument('--count', type=int, default=10000000)
+    dedup.add_argument('--fp-rate', type=float, default=0.001)
+    dedup.add_argument('--buckets', type=int, default=7)
+    
+    batch = subparsers.add_parser('sentiment-batch', help='analyze_many vs per-article sentiment analysis')
+    batch.add_argument('--count', type=int, default=5000)
+    batch.add_argument('--duplicates', type=float, default=0.3)
+    
+    scorer = subparsers.add_parser('sentiment-scorer', help='Vectorized lexicon scorer vs VADER/TextBlob')
+    scorer.add_argument('--count', type=int, default=20000)
+    
+    impact = subparsers.add_parser('impact-batch', help='Vectorized vs per-article impact scoring')
+    impact.add_argument('--count', type=int, default=100000)
+    
+    entities = subparsers.add_parser('entity-index', help='Entity -> symbol index lookups vs scanning every symbol')
+    entities.add_argument('--universes', type=lambda value: [int(size) for size in value.split(',')], default=[100, 1000, 5000])
+    entities.add_argument('--articles', type=int, default=2000)
+    
+    table = subparsers.add_parser('metadata-table', help='Memory-mapped metadata table vs a dict of dicts')
+    table.add_argument('--count', type=int, default=50000)
+    table.add_argument('--lookups', type=int, default=100000)
+    
+    pool = subparsers.add_parser('sentiment-pool', help='Scoring throughput across worker process counts')
+    pool.add_argument('--count', type=int, default=20000)
+    pool.add_argument('--workers', type=lambda value: [int(size) for size in value.split(',')], default=[1, 2, 4, 8])
+    pool.add_argument('--chunk-size', type=int, default=64)
+    
+    inference = subparsers.add_parser('inference', help='Micro-batched vs unbatched transformer inference')
+    inference.add_argument('--model', default=None, help='Model path or id (defaults to ADVANCED_MODEL_PATH)')
+    inference.add_argument('--count', type=int, default=512)
+    inference.add_argument('--callers', type=int, default=32)
+    inference.add_argument('--batch-size', type=int, default=32)
+    inference.add_argument('--quantize', action='store_true')
+    
+    args = parser.parse_args()
+    
+    if args.benchmark == 'dedup':
+        benchmark_dedup(args.count, args.fp_rate, args.buckets)
+    elif args.benchmark == 'sentiment-batch':
+        benchmark_sentiment_batch(args.count, args.duplicates)
+    elif args.benchmark == 'sentiment-scorer':
+        benchmark_sentiment_scorer(args.count)
+    elif args.benchmark == 'impact-batch':
+        benchmark_impact_batch(args.count)
+    elif args.benchmark == 'entity-index':
+        benchmark_entity_index(args.universes, args.articles)
+    elif args.benchmark == 'metadata-table':
+        benchmark_metadata_table(args.count, args.lookups)
+    elif args.benchmark == 'sentiment-pool':
+        benchmark_sentiment_pool(args.count, args.workers, args.chunk_size)
+    elif args.benchmark == 'inference':
+        from config import ADVANCED_MODEL_PATH
+        benchmark_inference(args.model or ADVANCED_MODEL_PATH, args.count, args.callers, args.batch_size, args.quantize)
+
+if __name__ == "__main__":
+    main()
@@ -11,4 +11,112 @@ EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_FROM = os.getenv('EMAIL_FROM')
-EMAIL_TO = os.getenv('EMAIL_TO') 
\ No newline at end of file
+EMAIL_TO = os.getenv('EMAIL_TO') 
+
+# Concurrent monitoring
+MONITOR_MAX_WORKERS = int(os.getenv('MONITOR_MAX_WORKERS', 8))
+MONITOR_DEADLINE_SECONDS = float(os.getenv('MONITOR_DEADLINE_SECONDS', 60))
+
+# Finnhub HTTP client
+FINNHUB_BASE_URL = os.getenv('FINNHUB_BASE_URL', 'https://finnhub.io/api/v1')
+FINNHUB_MAX_RETRIES = int(os.getenv('FINNHUB_MAX_RETRIES', 2))
+FINNHUB_BACKOFF_SECONDS = float(os.getenv('FINNHUB_BACKOFF_SECONDS', 0.5))
+FINNHUB_POOL_SIZE = int(os.getenv('FINNHUB_POOL_SIZE', max(MONITOR_MAX_WORKERS, 10)))
+
+# Finnhub quota (0 disables throttling)
+FINNHUB_CALLS_PER_MINUTE = int(os.getenv('FINNHUB_CALLS_PER_MINUTE', 60))
+FINNHUB_BURST = int(os.getenv('FINNHUB_BURST', 10))
+
+# Incremental news polling
+NEWS_INITIAL_LOOKBACK_DAYS = int(os.getenv('NEWS_INITIAL_LOOKBACK_DAYS', 7))
+NEWS_BUFFER_SIZE = int(os.getenv('NEWS_BUFFER_SIZE', 100))
+
+# Monitor state (last prices and seen news ids)
+STATE_BACKEND = os.getenv('STATE_BACKEND', 'memory')  # 'memory' or 'sqlite'
+STATE_DB_PATH = os.getenv('STATE_DB_PATH', 'monitor_state.db')
+SEEN_NEWS_TTL_HOURS = float(os.getenv('SEEN_NEWS_TTL_HOURS', 168))
+PRICE_HISTORY_SIZE = int(os.getenv('PRICE_HISTORY_SIZE', 100))
+
+# Seen-news dedup: 'exact' keeps every id, 'bloom' uses rotating time-bucketed Bloom filters
+SEEN_NEWS_DEDUP = os.getenv('SEEN_NEWS_DEDUP', 'exact')
+BLOOM_FP_RATE = float(os.getenv('BLOOM_FP_RATE', 0.001))
+BLOOM_BUCKETS = int(os.getenv('BLOOM_BUCKETS', 7))
+BLOOM_BUCKET_CAPACITY = int(os.getenv('BLOOM_BUCKET_CAPACITY', 100000))
+
+# Background monitoring (0 disables the interval; POST /monitor still enqueues runs)
+MONITOR_INTERVAL_SECONDS = float(os.getenv('MONITOR_INTERVAL_SECONDS', 0))
+MONITOR_JOB_HISTORY = int(os.getenv('MONITOR_JOB_HISTORY', 100))
+MONITOR_MAX_QUEUED = int(os.getenv('MONITOR_MAX_QUEUED', 5))
+
+# Streaming trade prices over the Finnhub WebSocket
+PRICE_STREAM_ENABLED = os.getenv('PRICE_STREAM_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+FINNHUB_WS_URL = os.getenv('FINNHUB_WS_URL', 'wss://ws.finnhub.io')
+PRICE_STREAM_MAX_AGE_SECONDS = float(os.getenv('PRICE_STREAM_MAX_AGE_SECONDS', 60))
+
+# Sentiment result cache (set SENTIMENT_CACHE_PATH to keep warm results across restarts)
+SENTIMENT_CACHE_SIZE = int(os.getenv('SENTIMENT_CACHE_SIZE', 50000))
+SENTIMENT_CACHE_TTL_SECONDS = float(os.getenv('SENTIMENT_CACHE_TTL_SECONDS', 86400))
+SENTIMENT_CACHE_PATH = os.getenv('SENTIMENT_CACHE_PATH', '')
+SENTIMENT_CACHE_DISK_MAX_ROWS = int(os.getenv('SENTIMENT_CACHE_DISK_MAX_ROWS', 500000))
+SENTIMENT_CACHE_PURGE_EVERY = int(os.getenv('SENTIMENT_CACHE_PURGE_EVERY', 1000))
+
+# Sentiment scorer: 'exact' runs VADER/TextBlob, 'fast' the vectorized lexicon scorer in fast_sentiment.py
+SENTIMENT_SCORER = os.getenv('SENTIMENT_SCORER', 'exact')
+
+# Sentiment worker processes for large batches (0 scores in the request process)
+SENTIMENT_WORKERS = int(os.getenv('SENTIMENT_WORKERS', 0))
+SENTIMENT_CHUNK_SIZE = int(os.getenv('SENTIMENT_CHUNK_SIZE', 64))
+SENTIMENT_MIN_CHUNK_SIZE = int(os.getenv('SENTIMENT_MIN_CHUNK_SIZE', 4))
+
+# Transformer sentiment (advanced_sentiment.py); any local path or Hugging Face model id works
+ADVANCED_MODEL_PATH = os.getenv('ADVANCED_MODEL_PATH', 'ProsusAI/finbert')
+ADVANCED_QUANTIZE = os.getenv('ADVANCED_QUANTIZE', 'false').lower() == 'true'
+ADVANCED_MAX_BATCH_SIZE = int(os.getenv('ADVANCED_MAX_BATCH_SIZE', 32))
+ADVANCED_MAX_LATENCY_MS = float(os.getenv('ADVANCED_MAX_LATENCY_MS', 10))
+ADVANCED_MAX_LENGTH = int(os.getenv('ADVANCED_MAX_LENGTH', 256))
+# Class names in class-id order, e.g. 'negative,neutral,positive'; required when the model's labels are LABEL_0..N
+ADVANCED_LABELS = os.getenv('ADVANCED_LABELS', '')
+
+# Startup warm-up (see /ready); set WARMUP_ADVANCED_MODEL to also preload the transformer
+WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+WARMUP_ADVANCED_MODEL = os.getenv('WARMUP_ADVANCED_MODEL', 'false').lower() == 'true'
+
+# Articles scored per step by the streaming endpoints (1 = send each article as soon as it is ready)
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 1))
+
+# Running per-symbol aggregates behind /summary (hourly buckets for a week by default)
+AGGREGATE_EWMA_ALPHA = float(os.getenv('AGGREGATE_EWMA_ALPHA', 0.2))
+AGGREGATE_BUCKET_SECONDS = int(os.getenv('AGGREGATE_BUCKET_SECONDS', 3600))
+AGGREGATE_MAX_BUCKETS = int(os.getenv('AGGREGATE_MAX_BUCKETS', 168))
+AGGREGATE_SEEN_IDS = int(os.getenv('AGGREGATE_SEEN_IDS', 10000))
+
+# Stock metadata cache shared by the analyzers and impact calculators (set METADATA_CACHE_PATH to keep a snapshot across restarts)
+METADATA_TTL_SECONDS = float(os.getenv('METADATA_TTL_SECONDS', 21600))
+METADATA_RETRY_SECONDS = float(os.getenv('METADATA_RETRY_SECONDS', 300))
+METADATA_CACHE_PATH = os.getenv('METADATA_CACHE_PATH', '')
+METADATA_REFRESH_WORKERS = int(os.getenv('METADATA_REFRESH_WORKERS', 2))
+
+# Symbol metadata source (JSON or CSV) and the compiled, memory-mapped table built from it
+# (the table defaults to the source path with a .table extension)
+METADATA_SOURCE_PATH = os.getenv('METADATA_SOURCE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stock_metadata.json'))
+METADATA_TABLE_PATH = os.getenv('METADATA_TABLE_PATH', '')
+
+# Archive of analyzed articles behind /archive (set ARCHIVE_DB_PATH to turn it on; written in batches off the request path)
+ARCHIVE_ENABLED = os.getenv('ARCHIVE_ENABLED', 'true').lower() == 'true'
+ARCHIVE_DB_PATH = os.getenv('ARCHIVE_DB_PATH', '')
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 500))
+ARCHIVE_FLUSH_SECONDS = float(os.getenv('ARCHIVE_FLUSH_SECONDS', 1.0))
+ARCHIVE_QUEUE_SIZE = int(os.getenv('ARCHIVE_QUEUE_SIZE', 10000))
+
+# Cross-ticker impact propagation: news naming a competitor, supplier or raw material of another
+# symbol in the universe (comma-separated, defaults to the portfolio) is passed on at damped impact
+ENTITY_PROPAGATION_ENABLED = os.getenv('ENTITY_PROPAGATION_ENABLED', 'true').lower() == 'true'
+ENTITY_PROPAGATION_DAMPING = float(os.getenv('ENTITY_PROPAGATION_DAMPING', 0.5))
+ENTITY_PROPAGATION_MIN_IMPACT = float(os.getenv('ENTITY_PROPAGATION_MIN_IMPACT', 20))
+ENTITY_PROPAGATION_HISTORY = int(os.getenv('ENTITY_PROPAGATION_HISTORY', 100))
+ENTITY_UNIVERSE = [symbol.strip().upper() for symbol in os.getenv('ENTITY_UNIVERSE', '').split(',') if symbol.strip()]
+
+# Offline backtesting (backtest.py); workers default to one per core
+BACKTEST_WORKERS = int(os.getenv('BACKTEST_WORKERS', os.cpu_count() or 1))
+BACKTEST_HORIZON_SECONDS = float(os.getenv('BACKTEST_HORIZON_SECONDS', 86400))
+BACKTEST_NEUTRAL_BAND_PCT = float(os.getenv('BACKTEST_NEUTRAL_BAND_PCT', 0.25))
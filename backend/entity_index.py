@@ -0,0 +1,180 @@
+"""
+Cross-ticker impact propagation
+
+Stock metadata lists each symbol's competitors, suppliers and raw materials,
+but an article only ever scored against the symbol it was fetched for. A
+headline about TSMC matters to every stock that buys from TSMC.
+
+EntityIndex inverts the metadata of the whole universe into
+{entity: [(symbol, relation), ...]} and compiles every entity name into one
+Aho-Corasick matcher, so an article is scanned once no matter how many
+tickers are indexed. Its impact is then fanned out to every other affected
+symbol, scaled down by ENTITY_PROPAGATION_DAMPING.
+"""
+
+import threading
+from config import (
+    ENTITY_PROPAGATION_ENABLED, ENTITY_PROPAGATION_DAMPING, ENTITY_PROPAGATION_MIN_IMPACT,
+    ENTITY_PROPAGATION_HISTORY, ENTITY_UNIVERSE
+)
+from keyword_matcher import KeywordMatcher
+from simple_impact_calculator import IMPACT_LEVELS, IMPACT_LEVEL_THRESHOLDS
+
+RELATIONS = ('competitors', 'suppliers', 'raw_materials')
+
+def impact_level(score):
+    """Impact level for a score, on the simple calculator's thresholds"""
+    level = 0
+    for threshold in IMPACT_LEVEL_THRESHOLDS:
+        if score >= threshold:
+            level += 1
+    return IMPACT_LEVELS[level]
+
+def _article_time(entry):
+    return entry['datetime'] or 0
+
+class EntityIndex:
+    """Inverted entity -> symbols index with one-pass matching and dampened impact fan-out"""
+
+    def __init__(self, universe=None, load_metadata=None, damping=ENTITY_PROPAGATION_DAMPING,
+                 min_impact=ENTITY_PROPAGATION_MIN_IMPACT, history=ENTITY_PROPAGATION_HISTORY,
+                 enabled=ENTITY_PROPAGATION_ENABLED):
+        self._universe = list(universe) if universe else None
+        self.load_metadata = load_metadata
+        self.damping = damping
+        self.min_impact = min_impact
+        self.history = history
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._index = None  # {entity key: [(symbol, relation, name), ...]}
+        self._matcher = None
+        self._received = {}  # {symbol: {(source, news_id): propagated impact}}
+        self.counters = {'builds': 0, 'articles': 0, 'propagated': 0}
+
+    def universe(self):
+        if self._universe is None:
+            from stock_monitor import PORTFOLIO
+            self._universe = list(ENTITY_UNIVERSE) or list(PORTFOLIO)
+        return self._universe
+
+    def _metadata(self, symbol):
+        if self.load_metadata is None:
+            from simple_sentiment import simple_analyzer
+            self.load_metadata = simple_analyzer.get_stock_metadata
+            # Rebuild after any metadata refresh
+            simple_analyzer.add_metadata_listener(lambda symbol: self.invalidate())
+        return self.load_metadata(symbol)
+
+    def build(self):
+        """Invert the universe's metadata and compile the matcher"""
+        index = {}
+        for symbol in self.universe():
+            metadata = self._metadata(symbol)
+            for relation in RELATIONS:
+                for name in metadata.get(relation, []):
+                    index.setdefault(name.lower(), []).append((symbol, relation, name))
+        matcher = KeywordMatcher(((entity, entity) for entity in index), word_boundaries=True)
+        with self._lock:
+            self._index, self._matcher = index, matcher
+            self.counters['builds'] += 1
+        return self
+
+    def invalidate(self):
+        with self._lock:
+            self._index = self._matcher = None
+
+    def _compiled(self):
+        with self._lock:
+            index, matcher = self._index, self._matcher
+        if index is None:
+            self.build()
+            with self._lock:
+                index, matcher = self._index, self._matcher
+        return index, matcher
+
+    def affected(self, text, source_symbol=None):
+        """
+        Symbols whose metadata references an entity in text
+
+        Returns:
+            dict: {symbol: [{'relation': ..., 'entity': ...}, ...]}, without source_symbol
+        """
+        index, matcher = self._compiled()
+        affected = {}
+        for entity in sorted(matcher.matches(text)):
+            for symbol, relation, name in index[entity]:
+                if symbol != source_symbol:
+                    affected.setdefault(symbol, []).append({'relation': relation, 'entity': name})
+        return affected
+
+    def propagate(self, source_symbol, item, impact):
+        """Dampened copies of one article's impact for every other affected symbol"""
+        if not self.enabled or impact['impact_score'] < self.min_impact:
+            return []
+        text = f"{item.get('headline', '')} {item.get('summary', '')}"
+        propagated = []
+        for symbol, relations in sorted(self.affected(text, source_symbol).items()):
+            score = round(impact['impact_score'] * self.damping, 2)
+            propagated.append({
+                'symbol': symbol,
+                'relations': relations,
+                'impact_score': score,
+                'impact_level': impact_level(score),
+                'damping': self.damping
+            })
+        return propagated
+
+    def propagate_many(self, source_symbol, items, results):
+        """
+        Attach 'propagated_to' to each impact and remember what each target symbol received
+
+        Args:
+            results (list): (sentiment, impact) per item, as from analyze_articles_shared
+        """
+        if not self.enabled:
+            return results
+        for item, (sentiment, impact) in zip(items, results):
+            impact['propagated_to'] = self.propagate(source_symbol, item, impact)
+            self.counters['articles'] += 1
+            for target in impact['propagated_to']:
+                self._receive(target, source_symbol, item, sentiment)
+        return results
+
+    def _receive(self, target, source_symbol, item, sentiment):
+        entry = {
+            'source_symbol': source_symbol,
+            'news_id': item.get('id'),
+            'headline': item.get('headline'),
+            'datetime': item.get('datetime'),
+            'sentiment_label': sentiment.get('label'),
+            'sentiment_score': sentiment.get('score'),
+            'relations': target['relations'],
+            'impact_score': target['impact_score'],
+            'impact_level': target['impact_level']
+        }
+        with self._lock:
+            received = self._received.setdefault(target['symbol'], {})
+            key = (source_symbol, item.get('id') if item.get('id') is not None else item.get('headline'))
+            if key not in received:
+                self.counters['propagated'] += 1
+            received[key] = entry
+            # Batches arrive newest first, so age by article time rather than arrival
+            while len(received) > self.history:
+                del received[min(received, key=lambda key: _article_time(received[key]))]
+
+    def received(self, symbol):
+        """Impacts propagated to a symbol from other symbols' news, newest article first"""
+        with self._lock:
+            entries = list(self._received.get(symbol, {}).values())
+        return sorted(entries, key=_article_time, reverse=True)
+
+    def stats(self):
+        with self._lock:
+            entities = len(self._index) if self._index is not None else None
+            targets = len(self._received)
+        return dict(self.counters, enabled=self.enabled, damping=self.damping,
+                    universe=len(self.universe()), entities=entities, symbols_with_propagated=targets)
+
+# Global instance
+entity_index = EntityIndex()
@@ -0,0 +1,338 @@
+"""
+Vectorized lexicon scorer for news sentiment
+
+Scores a whole batch of texts with NumPy instead of walking VADER's and
+TextBlob's Python rule engines one article at a time. Each text is tokenized
+once, every token is mapped to an integer id in a vocabulary built from both
+lexicons, and the valence, booster, negation and intensity rules become
+array operations over the flattened batch.
+
+The output has the same shape as SimpleSentimentAnalyzer.polarity_scores and
+follows the rules of both libraries closely, but not bit for bit:
+
+- VADER: emoji descriptions, the special-idiom table ("the bomb", "kiss of
+  death", ...) and its repeated-valence quirk in the "but" rule are skipped.
+- TextBlob: emoticons, "(!)" irony and multi-word lexicon entries are
+  skipped, and the tokenizer is a single regex rather than pattern's
+  abbreviation-aware sentence splitter.
+
+On financial headlines this keeps the VADER compound and TextBlob polarity and
+subjectivity within TOLERANCE of the reference libraries for the vast majority
+of texts (see test_fast_sentiment.py); select it per process with
+SENTIMENT_SCORER=fast.
+"""
+
+import re
+import string
+from itertools import repeat
+
+import numpy as np
+from vaderSentiment.vaderSentiment import BOOSTER_DICT, C_INCR, NEGATE, N_SCALAR
+from textblob.en import sentiment as textblob_lexicon
+
+# Largest difference from the reference libraries we accept on a single score
+TOLERANCE = 0.05
+
+# pattern's negations; it splits "n't" off the verb before scoring
+TEXTBLOB_NEGATIONS = ('no', 'not', "n't", 'never')
+TEXTBLOB_TOKEN = re.compile(r"\w+(?:[-.]\w+)*|[^\w\s]")
+
+VADER_KEYS = ('neg', 'neu', 'pos', 'compound')
+
+# Words VADER's rules refer to by name
+SPECIAL_WORDS = ('no', 'but', 'least', 'kind', 'of', 'so', 'this', 'never', 'without', 'doubt', 'at', 'very', 'or', 'nor', '!')
+
+# Two-word boosters ("kind of", "sort of") that VADER matches as phrases
+BOOSTER_PHRASES = tuple((tuple(phrase.split()), value) for phrase, value in BOOSTER_DICT.items() if len(phrase.split()) == 2)
+
+class FastLexiconScorer:
+    """Batch VADER/TextBlob approximation backed by flat NumPy lexicon tables"""
+
+    def __init__(self, vader_lexicon):
+        words = set(vader_lexicon) | set(BOOSTER_DICT) | set(NEGATE) | set(SPECIAL_WORDS)
+        words |= set(word for phrase, _ in BOOSTER_PHRASES for word in phrase)
+        words |= set(word for word in textblob_lexicon if ' ' not in word)
+        words |= set(TEXTBLOB_NEGATIONS)
+
+        # Id 0 is every word neither lexicon knows
+        self.vocab = {word: i for i, word in enumerate(sorted(words), start=1)}
+        size = len(self.vocab) + 1
+
+        self.vader_known = np.zeros(size, dtype=bool)
+        self.vader_valence = np.zeros(size)
+        self.booster = np.zeros(size)
+        self.is_booster = np.zeros(size, dtype=bool)
+        self.vader_negation = np.zeros(size, dtype=bool)
+
+        self.textblob_known = np.zeros(size, dtype=bool)
+        self.textblob_polarity = np.zeros(size)
+        self.textblob_subjectivity = np.zeros(size)
+        self.textblob_intensity = np.ones(size)
+        self.textblob_modifier = np.zeros(size, dtype=bool)
+        self.textblob_negation = np.zeros(size, dtype=bool)
+        self.ends_in_ly = np.zeros(size, dtype=bool)
+
+        for word, i in self.vocab.items():
+            if word in vader_lexicon:
+                self.vader_known[i] = True
+                self.vader_valence[i] = vader_lexicon[word]
+            if word in BOOSTER_DICT:
+                self.is_booster[i] = True
+                self.booster[i] = BOOSTER_DICT[word]
+            self.vader_negation[i] = word in NEGATE or "n't" in word
+
+            senses = textblob_lexicon.get(word)
+            if senses is not None and None in senses:
+                self.textblob_known[i] = True
+                polarity, subjectivity, intensity = senses[None]
+                self.textblob_polarity[i] = polarity
+                self.textblob_subjectivity[i] = subjectivity
+                self.textblob_intensity[i] = intensity
+                self.textblob_modifier[i] = 'RB' in senses
+            self.textblob_negation[i] = word in TEXTBLOB_NEGATIONS
+            self.ends_in_ly[i] = word.endswith('ly')
+
+        self.special = {word: self.vocab[word] for word in SPECIAL_WORDS}
+
+    def score(self, text):
+        """Scores for one text, shaped like SimpleSentimentAnalyzer.polarity_scores"""
+        return self.score_many([text])[0]
+
+    def score_many(self, texts):
+        """
+        Score a batch of texts in one vectorized pass
+
+        Returns:
+            list: One {'vader': {...}, 'textblob': [polarity, subjectivity]} dict per text, in order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        vader = self._vader_many(texts)
+        textblob = self._textblob_many(texts)
+        return [{'vader': v, 'textblob': t} for v, t in zip(vader, textblob)]
+
+    def _ids(self, tokens):
+        return np.fromiter(map(self.vocab.get, tokens, repeat(0)), dtype=np.int32, count=len(tokens))
+
+    @staticmethod
+    def _layout(lengths):
+        """Document index, position in document and document start for every token of the flat batch"""
+        lengths = np.asarray(lengths, dtype=np.int64)
+        starts = np.zeros(len(lengths), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        doc = np.repeat(np.arange(len(lengths)), lengths)
+        position = np.arange(int(lengths.sum())) - starts[doc]
+        return doc, position, starts
+
+    @staticmethod
+    def _back(values, k, position, fill):
+        """values[i - k] for every token, or fill where that would cross into the previous document"""
+        shifted = np.full_like(values, fill)
+        if k < len(values):
+            shifted[k:] = values[:len(values) - k]
+        shifted[position < k] = fill
+        return shifted
+
+    @staticmethod
+    def _last_before(mask, doc, starts):
+        """Index of the closest earlier token in the same document where mask holds, or -1"""
+        index = np.where(mask, np.arange(len(mask)), -1)
+        latest = np.maximum.accumulate(index)
+        before = np.concatenate(([-1], latest[:-1]))
+        before[before < starts[doc]] = -1
+        return before
+
+    def _vader_many(self, texts):
+        tokens = []
+        lengths = []
+        for text in texts:
+            # VADER strips punctuation around words but keeps short tokens like ":)" intact
+            words = [stripped if len(stripped := word.strip(string.punctuation)) > 2 else word for word in text.split()]
+            tokens.extend(words)
+            lengths.append(len(words))
+        if not tokens:
+            return [dict.fromkeys(VADER_KEYS, 0.0) for _ in texts]
+
+        doc, position, _ = self._layout(lengths)
+        count = len(texts)
+        lowered = [token.lower() for token in tokens]
+        ids = self._ids(lowered)
+        unknown = np.flatnonzero(ids == 0)
+        contracted = np.zeros(len(ids), dtype=bool)
+        contracted[unknown] = [("n't" in lowered[i]) for i in unknown]
+        upper = np.fromiter(map(str.isupper, tokens), dtype=bool, count=len(tokens))
+
+        # Some but not all words in ALL CAPS
+        caps = np.bincount(doc, weights=upper, minlength=count)
+        lengths = np.asarray(lengths)
+        cap_diff = ((lengths - caps) > 0) & ((lengths - caps) < lengths)
+        shout = upper & cap_diff[doc]
+
+        known = self.vader_known[ids]
+        negation = self.vader_negation[ids] | contracted
+        special = self.special
+        previous = [self._back(ids, k, position, -1) for k in (1, 2, 3)]
+        following = np.full_like(ids, -1)
+        following[:-1] = np.where(position[1:] == 0, -1, ids[1:])
+
+        def word_at(ids_at, word):
+            return ids_at == special[word]
+
+        def known_at(ids_at):
+            return (ids_at >= 0) & self.vader_known[np.maximum(ids_at, 0)]
+
+        # Boosters and "kind of" score zero themselves; only lexicon words carry valence
+        scored = known & ~self.is_booster[ids] & ~(word_at(ids, 'kind') & word_at(following, 'of'))
+        base = self.vader_valence[ids]
+        valence = base.copy()
+        valence[word_at(ids, 'no') & known_at(following)] = 0.0
+        after_no = (word_at(previous[0], 'no') | word_at(previous[1], 'no')
+                    | (word_at(previous[2], 'no') & (word_at(previous[0], 'or') | word_at(previous[0], 'nor'))))
+        valence = np.where(after_no, base * N_SCALAR, valence)
+        valence = np.where(shout, np.where(valence > 0, valence + C_INCR, valence - C_INCR), valence)
+
+        so_or_this = [word_at(p, 'so') | word_at(p, 'this') for p in previous]
+        for k, damping in enumerate((1.0, 0.95, 0.9)):
+            prior = previous[k]
+            active = (prior >= 0) & ~known_at(prior)
+            prior_ids = np.maximum(prior, 0)
+
+            scalar = np.where(valence < 0, -self.booster[prior_ids], self.booster[prior_ids])
+            prior_shout = self._back(shout, k + 1, position, False) & self.is_booster[prior_ids]
+            scalar = np.where(prior_shout, np.where(valence > 0, scalar + C_INCR, scalar - C_INCR), scalar)
+            valence = np.where(active, valence + scalar * damping, valence)
+
+            negated = self._back(negation, k + 1, position, False)
+            if k == 0:
+                factor = np.where(negated, N_SCALAR, 1.0)
+            elif k == 1:
+                emphasis = word_at(previous[1], 'never') & so_or_this[0]
+                doubtless = word_at(previous[1], 'without') & word_at(previous[0], 'doubt')
+                factor = np.where(emphasis, 1.25, np.where(doubtless, 1.0, np.where(negated, N_SCALAR, 1.0)))
+            else:
+                emphasis = (word_at(previous[2], 'never') & so_or_this[1]) | so_or_this[0]
+                doubtless = word_at(previous[2], 'without') & (word_at(previous[1], 'doubt') | word_at(previous[0], 'doubt'))
+                factor = np.where(emphasis, 1.25, np.where(doubtless, 1.0, np.where(negated, N_SCALAR, 1.0)))
+            valence = np.where(active, valence * factor, valence)
+
+        # Phrase boosters in the three words before, added without regard to the valence's sign
+        active = (previous[2] >= 0) & ~known_at(previous[2])
+        for (first, second), value in BOOSTER_PHRASES:
+            first, second = self.vocab[first], self.vocab[second]
+            hits = ((previous[1] == first) & (previous[0] == second)).astype(int)
+            hits += (previous[2] == first) & (previous[1] == second)
+            valence = np.where(active, valence + hits * value, valence)
+
+        least = (word_at(previous[0], 'least') & ~known_at(previous[0])
+                 & ~word_at(previous[1], 'at') & ~word_at(previous[1], 'very'))
+        valence = np.where(least, valence * N_SCALAR, valence)
+        valence = np.where(scored, valence, 0.0)
+
+        # Contrastive "but": halve what came before the first one, boost what follows
+        is_but = word_at(ids, 'but')
+        first_but = np.full(count, np.iinfo(np.int64).max)
+        np.minimum.at(first_but, doc[is_but], position[is_but])
+        but_position = first_but[doc]
+        has_but = but_position != np.iinfo(np.int64).max
+        valence = np.where(has_but & (position < but_position), valence * 0.5, valence)
+        valence = np.where(has_but & (position > but_position), valence * 1.5, valence)
+
+        total = np.bincount(doc, weights=valence, minlength=count)
+        pos_sum = np.bincount(doc, weights=np.where(valence > 0, valence + 1, 0.0), minlength=count)
+        neg_sum = np.bincount(doc, weights=np.where(valence < 0, valence - 1, 0.0), minlength=count)
+        neutral = np.bincount(doc, weights=valence == 0, minlength=count)
+
+        exclamations = np.minimum([text.count('!') for text in texts], 4) * 0.292
+        questions = np.array([text.count('?') for text in texts])
+        amplifier = exclamations + np.where(questions > 3, 0.96, np.where(questions > 1, questions * 0.18, 0.0))
+
+        total = total + np.sign(total) * amplifier
+        compound = np.clip(total / np.sqrt(total * total + 15), -1.0, 1.0)
+        positive_wins = pos_sum > -neg_sum
+        negative_wins = pos_sum < -neg_sum
+        pos_sum = np.where(positive_wins, pos_sum + amplifier, pos_sum)
+        neg_sum = np.where(negative_wins, neg_sum - amplifier, neg_sum)
+        denominator = pos_sum - neg_sum + neutral
+        denominator = np.where(denominator > 0, denominator, 1.0)
+
+        scores = np.column_stack((
+            np.round(np.abs(neg_sum / denominator), 3),
+            np.round(np.abs(neutral / denominator), 3),
+            np.round(np.abs(pos_sum / denominator), 3),
+            np.round(compound, 4)
+        ))
+        scores[lengths == 0] = 0.0
+        return [dict(zip(VADER_KEYS, row)) for row in scores.tolist()]
+
+    def _textblob_many(self, texts):
+        tokens = []
+        lengths = []
+        for text in texts:
+            words = TEXTBLOB_TOKEN.findall(text.lower().replace("n't", " n't"))
+            tokens.extend(words)
+            lengths.append(len(words))
+        if not tokens:
+            return [[0.0, 0.0] for _ in texts]
+
+        doc, position, starts = self._layout(lengths)
+        count = len(texts)
+        ids = self._ids(tokens)
+        size = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+
+        known = self.textblob_known[ids]
+        negation = self.textblob_negation[ids]
+
+        # A known adverb modifies the next known word unless a longer unknown word comes between
+        holder = self._last_before(known | (size > 2), doc, starts)
+        holder_ids = ids[np.maximum(holder, 0)]
+        modified = (holder >= 0) & self.textblob_known[holder_ids] & self.textblob_modifier[holder_ids]
+
+        # A negation right after an -ly adverb negates the adverb's phrase and keeps it open ("really not good")
+        adverb_negation = ~known & negation & modified & self.ends_in_ly[holder_ids]
+        if adverb_negation.any():
+            holder = self._last_before(known | ((size > 2) & ~adverb_negation), doc, starts)
+            holder_ids = ids[np.maximum(holder, 0)]
+            modified = (holder >= 0) & self.textblob_known[holder_ids] & self.textblob_modifier[holder_ids]
+        merged = known & modified
+
+        # A negation carries over unknown one-letter tokens ("not a good")
+        setter = self._last_before(known | negation | (size > 1), doc, starts)
+        negates = negation & ~adverb_negation
+        negated = known & (setter >= 0) & negates[np.maximum(setter, 0)]
+        phrase_negated = negated.copy()
+        phrase_negated[holder[adverb_negation]] = True
+
+        # The modifier's intensity scales the word it modifies; a negated modifier inverts it
+        intensity = self.textblob_intensity[ids]
+        carried = np.where(negated, 1.0 / intensity, intensity)[np.maximum(holder, 0)]
+        scale = np.where(merged, carried, 1.0)
+        polarity = np.clip(self.textblob_polarity[ids] * scale, -1.0, 1.0)
+        subjectivity = np.clip(self.textblob_subjectivity[ids] * scale, -1.0, 1.0)
+
+        # Each unmerged known word opens an assessment; merged words overwrite its scores
+        word_index = np.flatnonzero(known)
+        opens = ~merged[word_index]
+        assessment = np.cumsum(opens) - 1
+        assessments = int(opens.sum())
+        last = np.ones(len(word_index), dtype=bool)
+        last[:-1] = opens[1:]
+        closing = word_index[last]
+        assessment_doc = doc[closing]
+        any_negated = np.zeros(assessments, dtype=bool)
+        np.logical_or.at(any_negated, assessment, phrase_negated[word_index])
+
+        # Every "!" after the closing word boosts the assessment's polarity by a quarter
+        bang = ids == self.special['!']
+        owner = self._last_before(known, doc, starts)
+        bang_owner = owner[bang & (owner >= 0)]
+        bangs = np.bincount(bang_owner, minlength=len(ids))[closing]
+
+        final_polarity = np.clip(polarity[closing] * 1.25 ** bangs, -1.0, 1.0)
+        final_polarity = np.where(any_negated, final_polarity * -0.5, final_polarity)
+
+        per_doc = np.bincount(assessment_doc, minlength=count)
+        polarity_sum = np.bincount(assessment_doc, weights=final_polarity, minlength=count)
+        subjectivity_sum = np.bincount(assessment_doc, weights=subjectivity[closing], minlength=count)
+        divisor = np.maximum(per_doc, 1)
+        return [[float(p), float(s)] for p, s in zip(polarity_sum / divisor, subjectivity_sum / divisor)]
@@ -0,0 +1,148 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from quota_scheduler import quota_scheduler
+from config import (
+    FINNHUB_API_KEY, FINNHUB_BASE_URL, FINNHUB_MAX_RETRIES,
+    FINNHUB_BACKOFF_SECONDS, FINNHUB_POOL_SIZE
+)
+
+# Status codes worth retrying - rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class FinnhubClient:
+    """Shared Finnhub REST client with a pooled keep-alive session and retries"""
+    
+    # Per-endpoint timeouts in seconds: (connect, read)
+    DEFAULT_TIMEOUTS = {
+        'quote': (3.05, 5),
+        'company-news': (3.05, 10),
+        'stock/profile2': (3.05, 10),
+        'stock/metric': (3.05, 10)
+    }
+    DEFAULT_TIMEOUT = (3.05, 10)
+    
+    # Quota priority class per endpoint - price checks win over news and metadata
+    ENDPOINT_PRIORITIES = {
+        'quote': 'quote',
+        'company-news': 'news',
+        'stock/profile2': 'metadata',
+        'stock/metric': 'metadata'
+    }
+    
+    def __init__(self, api_key=FINNHUB_API_KEY, base_url=FINNHUB_BASE_URL,
+                 max_retries=FINNHUB_MAX_RETRIES, backoff=FINNHUB_BACKOFF_SECONDS,
+                 pool_size=FINNHUB_POOL_SIZE, timeouts=None, scheduler=quota_scheduler):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.scheduler = scheduler
+        
+        self._session = None
+        self._lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """Lazily create the shared session so importing this module stays cheap"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    if self.api_key:
+                        session.headers['X-Finnhub-Token'] = self.api_key
+                    self._session = session
+        return self._session
+    
+    def set_base_url(self, base_url):
+        """Point the client at another server, e.g. a local stub in tests and benchmarks"""
+        self.base_url = base_url.rstrip('/')
+    
+    def _sleep_before_retry(self, attempt, response=None):
+        """
+        Exponential backoff with full jitter; when the server sends Retry-After,
+        wait at least that long and add the jitter on top
+        """
+        floor = 0.0
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    floor = max(0.0, float(retry_after))
+                except ValueError:
+                    pass
+        time.sleep(floor + random.uniform(0, self.backoff * (2 ** attempt)))
+    
+    def get(self, endpoint, params=None, timeout=None):
+        """
+        GET a Finnhub endpoint with bounded retries
+        
+        Every attempt, retries included, waits for a token from the quota scheduler.
+        The time spent queued is exposed as response.queue_wait_seconds.
+        
+        Args:
+            endpoint (str): Path below the base URL, e.g. 'quote' or 'stock/profile2'
+            params (dict): Query parameters
+            timeout: Override for the endpoint's (connect, read) timeout
+        
+        Returns:
+            requests.Response: The last response received
+        
+        Raises:
+            requests.RequestException: If every attempt failed without a response
+        """
+        url = f'{self.base_url}/{endpoint}'
+        timeout = timeout or self.timeouts.get(endpoint, self.DEFAULT_TIMEOUT)
+        priority_class = self.ENDPOINT_PRIORITIES.get(endpoint, 'metadata')
+        queue_wait = 0.0
+        
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            if self.scheduler is not None:
+                queue_wait += self.scheduler.acquire(priority_class)
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if last_attempt:
+                    raise
+                self._sleep_before_retry(attempt)
+                continue
+            
+            if response.status_code == 429 and self.scheduler is not None:
+                self.scheduler.record_throttled()
+            
+            if response.status_code in RETRY_STATUS_CODES and not last_attempt:
+                self._sleep_before_retry(attempt, response)
+                continue
+            
+            response.queue_wait_seconds = queue_wait
+            return response
+    
+    def quote(self, symbol):
+        return self.get('quote', {'symbol': symbol})
+    
+    def company_news(self, symbol, start, end):
+        return self.get('company-news', {'symbol': symbol, 'from': start, 'to': end})
+    
+    def profile(self, symbol):
+        return self.get('stock/profile2', {'symbol': symbol})
+    
+    def metrics(self, symbol):
+        return self.get('stock/metric', {'symbol': symbol, 'metric': 'all'})
+    
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+# Global instance
+finnhub_client = FinnhubClient()
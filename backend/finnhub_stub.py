@@ -0,0 +1,99 @@
+"""
+Local stand-ins for Finnhub, for tests and benchmarks
+Point FINNHUB_WS_URL (or PriceStream(url=...)) at StubTradeServer.url
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+class StubTradeServer:
+    """Minimal Finnhub trade WebSocket: tracks subscriptions and pushes trades on demand"""
+    
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.url = None
+        self.subscriptions = {}  # {connection: set of symbols}
+        self.connections_accepted = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+    
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name='stub-trade-server', daemon=True)
+        self._thread.start()
+        if not self._ready.wait(5):
+            raise RuntimeError('Stub trade server failed to start')
+        return self
+    
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop = None
+    
+    def publish(self, symbol, price, volume=1, timestamp_ms=None):
+        """Send one trade to every connection subscribed to symbol"""
+        message = json.dumps({
+            'type': 'trade',
+            'data': [{'s': symbol, 'p': price, 'v': volume, 't': timestamp_ms or int(time.time() * 1000)}]
+        })
+        return asyncio.run_coroutine_threadsafe(self._broadcast(symbol, message), self._loop).result(5)
+    
+    def drop_connections(self):
+        """Close every client connection, e.g. to exercise reconnect and resubscribe"""
+        asyncio.run_coroutine_threadsafe(self._close_all(), self._loop).result(5)
+    
+    def subscribed(self, symbol):
+        return any(symbol in symbols for symbols in list(self.subscriptions.values()))
+    
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(self._serve())
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.url = f'ws://{self.host}:{self.port}'
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+    
+    async def _serve(self):
+        import websockets
+        return await websockets.serve(self._handler, self.host, self.port)
+    
+    async def _handler(self, connection):
+        self.connections_accepted += 1
+        self.subscriptions[connection] = set()
+        try:
+            async for message in connection:
+                request = json.loads(message)
+                if request.get('type') == 'subscribe':
+                    self.subscriptions[connection].add(request.get('symbol'))
+                elif request.get('type') == 'unsubscribe':
+                    self.subscriptions[connection].discard(request.get('symbol'))
+        except Exception:
+            pass
+        finally:
+            self.subscriptions.pop(connection, None)
+    
+    async def _broadcast(self, symbol, message):
+        sent = 0
+        for connection, symbols in list(self.subscriptions.items()):
+            if symbol in symbols:
+                await connection.send(message)
+                sent += 1
+        return sent
+    
+    async def _close_all(self):
+        for connection in list(self.subscriptions):
+            await connection.close()
+    
+    async def _shutdown(self):
+        await self._close_all()
+        self._server.close()
+        await self._server.wait_closed()
@@ -1,7 +1,9 @@
-import requests
 import math
 from datetime import datetime, timedelta
 from config import FINNHUB_API_KEY, ALPHA_VANTAGE_API_KEY
+from finnhub_client import finnhub_client
+from keyword_matcher import KeywordMatcher
+from metadata_cache import metadata_cache
 
 class ImpactCalculator:
     """Calculate the potential impact of news on stock price"""
@@ -25,9 +27,21 @@ class ImpactCalculator:
             'market': ['market', 'competition', 'industry', 'sector', 'trend', 'demand', 'supply'],
             'general': ['company', 'business', 'corporate', 'management', 'strategy']
         }
+        
+        # One pass over the text finds every keyword of every type
+        self.news_type_matcher = KeywordMatcher(
+            (keyword, news_type) for news_type, keywords in self.news_keywords.items() for keyword in keywords
+        )
+        
+        # Finnhub profile and metrics are cached with a TTL and refreshed in the background
+        metadata_cache.register('finnhub', self._fetch_stock_metadata, default=self._get_default_metadata)
     
     def get_stock_metadata(self, symbol):
         """Get stock metadata for impact calculation"""
+        return metadata_cache.get('finnhub', symbol)
+    
+    def _fetch_stock_metadata(self, symbol):
+        """Company profile and metrics from Finnhub; raises when the profile is unavailable"""
         if not FINNHUB_API_KEY or FINNHUB_API_KEY == 'demo':
             # Return mock metadata for demo
             return {
@@ -39,45 +53,38 @@ class ImpactCalculator:
                 'industry': 'Consumer Electronics'
             }
         
-        try:
-            # Get company profile
-            profile_url = f'https://finnhub.io/api/v1/stock/profile2?symbol={symbol}&token={FINNHUB_API_KEY}'
-            profile_response = requests.get(profile_url, timeout=10)
-            
-            if profile_response.status_code == 200:
-                profile = profile_response.json()
-                
-                # Get additional metrics
-                metrics_url = f'https://finnhub.io/api/v1/stock/metric?symbol={symbol}&metric=all&token={FINNHUB_API_KEY}'
-                metrics_response = requests.get(metrics_url, timeout=10)
-                
-                metadata = {
-                    'market_cap': profile.get('marketCapitalization', 0),
-                    'volume': profile.get('shareOutstanding', 0),
-                    'sector': profile.get('finnhubIndustry', 'Unknown'),
-                    'industry': profile.get('industry', 'Unknown'),
-                    'country': profile.get('country', 'Unknown'),
-                    'exchange': profile.get('exchange', 'Unknown')
-                }
-                
-                if metrics_response.status_code == 200:
-                    metrics = metrics_response.json()
-                    if 'metric' in metrics:
-                        metric_data = metrics['metric']
-                        metadata.update({
-                            'beta': metric_data.get('beta', 1.0),
-                            'pe_ratio': metric_data.get('peRatioTTM', 0),
-                            'dividend_yield': metric_data.get('dividendYieldIndicatedAnnual', 0),
-                            'debt_to_equity': metric_data.get('totalDebtToEquity', 0)
-                        })
-                
-                return metadata
-            else:
-                return self._get_default_metadata(symbol)
-                
-        except Exception as e:
-            print(f"Error fetching metadata for {symbol}: {e}")
-            return self._get_default_metadata(symbol)
+        # Get company profile
+        profile_response = finnhub_client.profile(symbol)
+        
+        if profile_response.status_code != 200:
+            raise RuntimeError(f"profile request returned {profile_response.status_code}")
+        
+        profile = profile_response.json()
+        
+        # Get additional metrics
+        metrics_response = finnhub_client.metrics(symbol)
+        
+        metadata = {
+            'market_cap': profile.get('marketCapitalization', 0),
+            'volume': profile.get('shareOutstanding', 0),
+            'sector': profile.get('finnhubIndustry', 'Unknown'),
+            'industry': profile.get('industry', 'Unknown'),
+            'country': profile.get('country', 'Unknown'),
+            'exchange': profile.get('exchange', 'Unknown')
+        }
+        
+        if metrics_response.status_code == 200:
+            metrics = metrics_response.json()
+            if 'metric' in metrics:
+                metric_data = metrics['metric']
+                metadata.update({
+                    'beta': metric_data.get('beta', 1.0),
+                    'pe_ratio': metric_data.get('peRatioTTM', 0),
+                    'dividend_yield': metric_data.get('dividendYieldIndicatedAnnual', 0),
+                    'debt_to_equity': metric_data.get('totalDebtToEquity', 0)
+                })
+        
+        return metadata
     
     def _get_default_metadata(self, symbol):
         """Get default metadata when API fails"""
@@ -92,10 +99,11 @@ class ImpactCalculator:
     
     def classify_news_type(self, headline, summary):
         """Classify the type of news based on keywords"""
-        text = f"{headline} {summary}".lower()
+        text = f"{headline} {summary}"
         
-        for news_type, keywords in self.news_keywords.items():
-            if any(keyword in text for keyword in keywords):
+        matched_types = self.news_type_matcher.matches(text)
+        for news_type in self.news_keywords:
+            if news_type in matched_types:
                 return news_type
         
         return 'general'
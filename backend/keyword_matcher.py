@@ -0,0 +1,100 @@
+from collections import deque
+from functools import lru_cache
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton: finds every occurrence of every pattern in one pass over the text
+    
+    Matching is case-insensitive. By default a pattern matches anywhere, like
+    `pattern in text`; with word_boundaries=True it must not touch a letter or
+    digit on either side.
+    """
+    
+    def __init__(self, patterns, word_boundaries=False):
+        """
+        Args:
+            patterns: Iterable of (pattern, payload) pairs; payloads are returned on a match
+            word_boundaries (bool): Only match whole words
+        """
+        self.word_boundaries = word_boundaries
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]  # [(pattern length, payload)] ending at each state
+        self.size = 0
+        
+        for pattern, payload in patterns:
+            pattern = pattern.lower()
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(pattern), payload))
+            self.size += 1
+        
+        self._build_failure_links()
+    
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # Inherit the matches of the longest proper suffix
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def finditer(self, text):
+        """Yield (start, end, payload) for every match in text"""
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        word_boundaries = self.word_boundaries
+        state = 0
+        
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, payload in output[state]:
+                start = index - length + 1
+                if word_boundaries and (
+                    (start > 0 and text[start - 1].isalnum()) or
+                    (index + 1 < len(text) and text[index + 1].isalnum())
+                ):
+                    continue
+                yield start, index + 1, payload
+    
+    def matches(self, text):
+        """Set of payloads with at least one match in text"""
+        return {payload for _, _, payload in self.finditer(text)}
+
+@lru_cache(maxsize=4096)
+def entity_matcher(competitors, suppliers, raw_materials, keyword_table, word_boundaries=False):
+    """
+    Cached matcher for one symbol's entities plus the news-type keyword table
+    
+    Arguments are tuples so they can be cache keys; keyword_table is a tuple of
+    (news_type, (keyword, ...)) pairs. Payloads are ('competitors', name),
+    ('suppliers', name), ('raw_materials', name) and ('keywords', news_type, keyword).
+    """
+    patterns = []
+    for group, names in (('competitors', competitors), ('suppliers', suppliers), ('raw_materials', raw_materials)):
+        patterns.extend((name, (group, name)) for name in names)
+    for news_type, keywords in keyword_table:
+        patterns.extend((keyword, ('keywords', news_type, keyword)) for keyword in keywords)
+    return KeywordMatcher(patterns, word_boundaries=word_boundaries)
+
+def keyword_table(keywords_by_type):
+    """Hashable form of a {news_type: [keyword, ...]} table for entity_matcher"""
+    return tuple((news_type, tuple(keywords)) for news_type, keywords in keywords_by_type.items())
@@ -1,15 +1,39 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import os
+from contextlib import asynccontextmanager
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app):
+    # Background monitoring runs independently of request handling
+    from monitor_scheduler import monitor_scheduler
+    from stock_monitor import start_price_stream
+    from price_stream import price_stream
+    from sentiment_pool import sentiment_pool
+    from metadata_cache import metadata_cache
+    from article_archive import article_archive
+    from warmup import warmup
+    # Analyzers load in the background; /ready turns 200 once they are warm
+    warmup.start()
+    monitor_scheduler.start()
+    start_price_stream()
+    yield
+    price_stream.stop()
+    monitor_scheduler.stop()
+    sentiment_pool.close()
+    metadata_cache.close()
+    article_archive.close()
+
 app = FastAPI(
     title="Stock Portfolio Tracker API", 
     version="2.0.0",
-    description="A FastAPI backend for stock monitoring with sentiment analysis and impact scoring"
+    description="A FastAPI backend for stock monitoring with sentiment analysis and impact scoring",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -21,6 +45,96 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def fetch_news_shared(symbol):
+    """Fetch news for a symbol, sharing one upstream call between concurrent requests"""
+    from stock_monitor import fetch_news
+    from single_flight import single_flight
+    return single_flight.do(('news', symbol), fetch_news, symbol)
+
+def analyze_articles_shared(symbol, items):
+    """
+    Sentiment and impact for a list of articles, scored as one batch and shared
+    per article with concurrent requests for the same symbol
+    
+    Returns:
+        list: (sentiment, impact) tuples in the order of items
+    """
+    from article_archive import article_archive
+    from entity_index import entity_index
+    from sentiment_pool import sentiment_pool
+    from sentiment_aggregates import sentiment_aggregates
+    from simple_impact_calculator import simple_impact_calculator
+    from single_flight import single_flight
+    
+    def analyze(batch):
+        # Runs in-process unless SENTIMENT_WORKERS is set
+        sentiments = sentiment_pool.analyze_many(batch, symbol)
+        impacts = simple_impact_calculator.calculate_simple_impact_many(symbol, batch, sentiments)
+        results = list(zip(sentiments, impacts))
+        # Pass the impact on to other symbols whose competitors, suppliers or materials are named
+        entity_index.propagate_many(symbol, batch, results)
+        # Fold into the running /summary aggregates; articles already counted are skipped
+        sentiment_aggregates.ingest_many(symbol, batch, results)
+        article_archive.record(symbol, 'simple', batch, results)
+        return results
+    
+    keys = [('analysis', symbol, item['id']) if item.get('id') is not None else None for item in items]
+    return single_flight.do_many(keys, items, analyze)
+
+def analyze_articles_model(symbol, items):
+    """Like analyze_articles_shared, with transformer sentiment and the advanced impact calculator"""
+    from advanced_sentiment import advanced_analyzer
+    from advanced_impact_calculator import advanced_impact_calculator
+    from article_archive import article_archive
+    from single_flight import single_flight
+    
+    def analyze(batch):
+        sentiments = advanced_analyzer.analyze_many(batch, symbol)
+        results = [
+            (sentiment, advanced_impact_calculator.calculate_advanced_impact(symbol, item, sentiment))
+            for item, sentiment in zip(batch, sentiments)
+        ]
+        article_archive.record(symbol, 'advanced', batch, results)
+        return results
+    
+    keys = [('advanced', symbol, item['id']) if item.get('id') is not None else None for item in items]
+    return single_flight.do_many(keys, items, analyze)
+
+def news_article_record(item, sentiment, impact):
+    """One analyzed article as /news returns it"""
+    return {
+        'id': item.get('id'),
+        'headline': item.get('headline'),
+        'summary': item.get('summary'),
+        'source': item.get('source'),
+        'url': item.get('url'),
+        'datetime': item.get('datetime'),
+        'sentiment_analysis': {
+            'label': sentiment['label'],
+            'score': sentiment['score'],
+            'confidence': sentiment['confidence'],
+            'impact_multiplier': sentiment['impact_multiplier'],
+            'entities_found': sentiment['entities_found'],
+            'news_type': sentiment['news_type'],
+            'vader_scores': sentiment['vader_scores'],
+            'textblob_scores': sentiment['textblob_scores']
+        },
+        'impact_analysis': impact
+    }
+
+def advanced_analysis_record(item, sentiment, impact):
+    """One analyzed article as /advanced returns it"""
+    return {
+        'news': {
+            'headline': item.get('headline'),
+            'summary': item.get('summary'),
+            'source': item.get('source'),
+            'timestamp': item.get('datetime')
+        },
+        'sentiment': sentiment,
+        'impact': impact
+    }
+
 @app.get("/")
 def read_root():
     return {
@@ -36,11 +150,27 @@ def read_root():
         ],
         "endpoints": {
             "status": "/status",
+            "ready": "/ready",
             "monitor": "/monitor",
+            "monitor_job": "/monitor/jobs/{job_id}",
             "monitor_stock": "/monitor/{symbol}",
             "sentiment": "/sentiment/{symbol}",
             "news": "/news/{symbol}",
             "advanced_analysis": "/advanced/{symbol}",
+            "news_stream": "/news/{symbol}/stream",
+            "summary": "/summary/{symbol}",
+            "archive": "/archive/{symbol}",
+            "propagated": "/propagated/{symbol}",
+            "advanced_stream": "/advanced/{symbol}/stream",
+            "quota": "/quota",
+            "single_flight_stats": "/stats/singleflight",
+            "state_stats": "/stats/state",
+            "stream_stats": "/stats/stream",
+            "cache_stats": "/stats/cache",
+            "pool_stats": "/stats/pool",
+            "metadata_stats": "/stats/metadata",
+            "archive_stats": "/stats/archive",
+            "inference_stats": "/stats/inference",
             "docs": "/docs"
         }
     }
@@ -48,16 +178,15 @@ def read_root():
 @app.get('/status')
 def status():
     # Check if API keys are configured
+    from warmup import warmup
     finnhub_key = os.getenv('FINNHUB_API_KEY')
     alpha_key = os.getenv('ALPHA_VANTAGE_API_KEY')
     
     return {
         'status': 'ok',
         'version': '2.0.0',
-        'models_loaded': {
-            'vader': True,
-            'textblob': True
-        },
+        'ready': warmup.ready,
+        'models_loaded': warmup.models_loaded(),
         'api_keys_configured': {
             'finnhub': finnhub_key is not None and finnhub_key != 'demo',
             'alpha_vantage': alpha_key is not None and alpha_key != 'demo'
@@ -65,15 +194,38 @@ def status():
         'email_configured': os.getenv('EMAIL_HOST') is not None
     }
 
-@app.post('/monitor')
-def run_monitor():
+@app.post('/monitor', status_code=202)
+def run_monitor(max_workers: Optional[int] = None, deadline: Optional[float] = None):
+    """Queue a monitoring run for the whole portfolio and return its job id"""
+    from monitor_scheduler import QueueFullError
     try:
-        from stock_monitor import monitor_stocks
-        alerts = monitor_stocks()
-        return {'alerts': alerts, 'status': 'success'}
+        from monitor_scheduler import monitor_scheduler
+        job = monitor_scheduler.submit(max_workers=max_workers, deadline=deadline)
+        return {
+            'job_id': job['id'],
+            'status': job['status'],
+            'coalesced': job['coalesced'],
+            'status_url': f"/monitor/jobs/{job['id']}"
+        }
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=f"{e}; try again once they have run")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Monitoring failed: {str(e)}")
 
+@app.get('/monitor/jobs')
+def list_monitor_jobs(limit: int = 20):
+    from monitor_scheduler import monitor_scheduler
+    return {'jobs': monitor_scheduler.list_jobs(limit)}
+
+@app.get('/monitor/jobs/{job_id}')
+def get_monitor_job(job_id: str):
+    """Status, per-symbol timings and results of a monitoring run"""
+    from monitor_scheduler import monitor_scheduler
+    job = monitor_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Monitoring job {job_id} not found")
+    return job
+
 @app.post('/monitor/{symbol}')
 def monitor_specific_stock(symbol: str):
     try:
@@ -90,11 +242,7 @@ def monitor_specific_stock(symbol: str):
 @app.get('/sentiment/{symbol}')
 def get_stock_sentiment(symbol: str):
     try:
-        from stock_monitor import fetch_news
-        from simple_sentiment import simple_analyzer
-        from simple_impact_calculator import simple_impact_calculator
-        
-        news = fetch_news(symbol.upper())
+        news = fetch_news_shared(symbol.upper())
         
         if not news:
             return {
@@ -105,13 +253,9 @@ def get_stock_sentiment(symbol: str):
             }
         
         news_articles = []
-        for item in news[:10]:
-            # Simple sentiment analysis
-            sentiment = simple_analyzer.analyze_sentiment_simple(item, symbol.upper())
-            
-            # Simple impact calculation
-            impact = simple_impact_calculator.calculate_simple_impact(symbol.upper(), item, sentiment)
-            
+        items = news[:10]
+        # Simple sentiment and impact analysis, batched and shared with concurrent requests
+        for item, (sentiment, impact) in zip(items, analyze_articles_shared(symbol.upper(), items)):
             news_articles.append({
                 'news_id': item.get('id'),
                 'headline': item.get('headline'),
@@ -136,11 +280,7 @@ def get_stock_sentiment(symbol: str):
 @app.get('/news/{symbol}')
 def get_stock_news(symbol: str):
     try:
-        from stock_monitor import fetch_news
-        from simple_sentiment import simple_analyzer
-        from simple_impact_calculator import simple_impact_calculator
-        
-        news = fetch_news(symbol.upper())
+        news = fetch_news_shared(symbol.upper())
         
         if not news:
             return {
@@ -149,34 +289,12 @@ def get_stock_news(symbol: str):
                 'articles': []
             }
         
-        articles = []
-        for item in news[:15]:
-            # Simple sentiment analysis
-            sentiment = simple_analyzer.analyze_sentiment_simple(item, symbol.upper())
-            
-            # Simple impact calculation
-            impact = simple_impact_calculator.calculate_simple_impact(symbol.upper(), item, sentiment)
-            
-            article = {
-                'id': item.get('id'),
-                'headline': item.get('headline'),
-                'summary': item.get('summary'),
-                'source': item.get('source'),
-                'url': item.get('url'),
-                'datetime': item.get('datetime'),
-                'sentiment_analysis': {
-                    'label': sentiment['label'],
-                    'score': sentiment['score'],
-                    'confidence': sentiment['confidence'],
-                    'impact_multiplier': sentiment['impact_multiplier'],
-                    'entities_found': sentiment['entities_found'],
-                    'news_type': sentiment['news_type'],
-                    'vader_scores': sentiment['vader_scores'],
-                    'textblob_scores': sentiment['textblob_scores']
-                },
-                'impact_analysis': impact
-            }
-            articles.append(article)
+        items = news[:15]
+        # Simple sentiment and impact analysis, batched and shared with concurrent requests
+        articles = [
+            news_article_record(item, sentiment, impact)
+            for item, (sentiment, impact) in zip(items, analyze_articles_shared(symbol.upper(), items))
+        ]
         
         return {
             'symbol': symbol.upper(),
@@ -189,14 +307,12 @@ def get_stock_news(symbol: str):
         raise HTTPException(status_code=500, detail=f"News analysis for {symbol} failed: {str(e)}")
 
 @app.get('/advanced/{symbol}')
-def get_advanced_analysis(symbol: str):
-    """Get comprehensive analysis for a stock"""
+def get_advanced_analysis(symbol: str, model: bool = False):
+    """Get comprehensive analysis for a stock; model=true scores with the transformer engine"""
     try:
-        from stock_monitor import fetch_news
         from simple_sentiment import simple_analyzer
-        from simple_impact_calculator import simple_impact_calculator
         
-        news = fetch_news(symbol.upper())
+        news = fetch_news_shared(symbol.upper())
         
         if not news:
             return {
@@ -208,57 +324,194 @@ def get_advanced_analysis(symbol: str):
         # Get stock metadata
         metadata = simple_analyzer.get_stock_metadata(symbol.upper())
         
-        # Analyze all news
+        # Analyze all news, keeping running totals for the overall metrics
+        from streaming import RunningSummary
         analyses = []
-        total_impact = 0
-        sentiment_scores = []
+        summary = RunningSummary()
         
-        for item in news[:20]:
-            sentiment = simple_analyzer.analyze_sentiment_simple(item, symbol.upper())
-            impact = simple_impact_calculator.calculate_simple_impact(symbol.upper(), item, sentiment)
-            
-            analyses.append({
-                'news': {
-                    'headline': item.get('headline'),
-                    'summary': item.get('summary'),
-                    'source': item.get('source'),
-                    'timestamp': item.get('datetime')
-                },
-                'sentiment': sentiment,
-                'impact': impact
-            })
-            
-            total_impact += impact['impact_score']
-            sentiment_scores.append(sentiment['score'])
-        
-        # Calculate overall metrics
-        avg_impact = total_impact / len(analyses) if analyses else 0
-        avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
-        
-        # Determine overall sentiment
-        if avg_sentiment > 0.1:
-            overall_sentiment = 'POSITIVE'
-        elif avg_sentiment < -0.1:
-            overall_sentiment = 'NEGATIVE'
-        else:
-            overall_sentiment = 'NEUTRAL'
+        items = news[:20]
+        analyze = analyze_articles_model if model else analyze_articles_shared
+        for item, (sentiment, impact) in zip(items, analyze(symbol.upper(), items)):
+            analyses.append(advanced_analysis_record(item, sentiment, impact))
+            summary.add(sentiment, impact)
         
         return {
             'symbol': symbol.upper(),
             'metadata': metadata,
-            'overall_analysis': {
-                'sentiment': overall_sentiment,
-                'average_sentiment_score': round(avg_sentiment, 3),
-                'average_impact_score': round(avg_impact, 2),
-                'total_articles_analyzed': len(analyses),
-                'high_impact_articles': len([a for a in analyses if a['impact']['impact_level'] in ['HIGH', 'CRITICAL']])
-            },
+            'overall_analysis': summary.as_dict(),
             'detailed_analyses': analyses,
-            'analysis_method': 'Simple (VADER + TextBlob)'
+            'analysis_method': 'Transformer (micro-batched)' if model else 'Simple (VADER + TextBlob)'
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Advanced analysis for {symbol} failed: {str(e)}")
 
+@app.get('/news/{symbol}/stream')
+def stream_stock_news(symbol: str, format: str = 'ndjson'):
+    """/news as a stream: one 'article' record per scored article, then a 'summary' record (format=ndjson|sse)"""
+    from config import STREAM_CHUNK_SIZE
+    from streaming import MEDIA_TYPES, analyzed_in_chunks, stream_response
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(MEDIA_TYPES)}")
+    symbol = symbol.upper()
+    
+    def records():
+        news = fetch_news_shared(symbol)
+        items = news[:15]
+        analyzed = 0
+        for item, sentiment, impact in analyzed_in_chunks(symbol, items, analyze_articles_shared, STREAM_CHUNK_SIZE):
+            analyzed += 1
+            yield dict(news_article_record(item, sentiment, impact), type='article')
+        yield {
+            'type': 'summary',
+            'symbol': symbol,
+            'total_articles': len(news),
+            'analyzed_articles': analyzed,
+            'analysis_method': 'Simple (VADER + TextBlob)'
+        }
+    
+    return stream_response(records(), format)
+
+@app.get('/advanced/{symbol}/stream')
+def stream_advanced_analysis(symbol: str, format: str = 'ndjson', model: bool = False):
+    """/advanced as a stream: 'metadata', then one 'analysis' record per article, then the 'summary' (format=ndjson|sse)"""
+    from config import STREAM_CHUNK_SIZE
+    from streaming import MEDIA_TYPES, RunningSummary, analyzed_in_chunks, stream_response
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(MEDIA_TYPES)}")
+    symbol = symbol.upper()
+    
+    def records():
+        from simple_sentiment import simple_analyzer
+        yield {'type': 'metadata', 'symbol': symbol, 'metadata': simple_analyzer.get_stock_metadata(symbol)}
+        
+        items = fetch_news_shared(symbol)[:20]
+        analyze = analyze_articles_model if model else analyze_articles_shared
+        summary = RunningSummary()
+        for item, sentiment, impact in analyzed_in_chunks(symbol, items, analyze, STREAM_CHUNK_SIZE):
+            summary.add(sentiment, impact)
+            yield dict(advanced_analysis_record(item, sentiment, impact), type='analysis')
+        yield {
+            'type': 'summary',
+            'symbol': symbol,
+            'overall_analysis': summary.as_dict(),
+            'analysis_method': 'Transformer (micro-batched)' if model else 'Simple (VADER + TextBlob)'
+        }
+    
+    return stream_response(records(), format)
+
+@app.get('/summary/{symbol}')
+def get_symbol_summary(symbol: str, analyzer: str = 'simple'):
+    """Running sentiment and impact aggregates for every article one analyzer scored for a symbol, with time-bucketed rollups"""
+    from sentiment_aggregates import sentiment_aggregates, ANALYZERS
+    if analyzer not in ANALYZERS:
+        raise HTTPException(status_code=400, detail=f"analyzer must be one of {', '.join(ANALYZERS)}")
+    return sentiment_aggregates.summary(symbol.upper(), analyzer)
+
+def query_archive(symbol=None, start=None, end=None, news_type=None, impact_level=None, analyzer=None, limit=50, cursor=None):
+    from article_archive import article_archive
+    if not 1 <= limit <= 500:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+    try:
+        page = article_archive.query(
+            symbol=symbol,
+            start=start,
+            end=end,
+            news_type=news_type.upper() if news_type else None,
+            impact_level=impact_level.upper() if impact_level else None,
+            analyzer=analyzer,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return dict(page, count=len(page['articles']), enabled=article_archive.enabled)
+
+@app.get('/archive/{symbol}')
+def get_symbol_archive(symbol: str, start: Optional[int] = None, end: Optional[int] = None,
+                       news_type: Optional[str] = None, impact_level: Optional[str] = None,
+                       analyzer: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None):
+    """Archived analyses for a symbol, newest first; pass next_cursor back as cursor for the next page"""
+    page = query_archive(symbol.upper(), start, end, news_type, impact_level, analyzer, limit, cursor)
+    return dict(page, symbol=symbol.upper())
+
+@app.get('/archive')
+def get_archive(start: Optional[int] = None, end: Optional[int] = None,
+                news_type: Optional[str] = None, impact_level: Optional[str] = None,
+                analyzer: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None):
+    """Archived analyses across all symbols, filtered by time range, news type or impact level"""
+    return query_archive(None, start, end, news_type, impact_level, analyzer, limit, cursor)
+
+@app.get('/propagated/{symbol}')
+def get_propagated_impact(symbol: str):
+    """Impact passed on to a symbol from other symbols' news that named its competitors, suppliers or raw materials"""
+    from entity_index import entity_index
+    received = entity_index.received(symbol.upper())
+    return {'symbol': symbol.upper(), 'count': len(received), 'propagated_impacts': received}
+
+@app.get('/quota')
+def get_quota_usage():
+    """Live Finnhub quota usage and per-priority queue wait times"""
+    from quota_scheduler import quota_scheduler
+    return quota_scheduler.usage()
+
+@app.get('/stats/singleflight')
+def get_single_flight_stats():
+    """Executed vs coalesced upstream fetches and analysis passes"""
+    from single_flight import single_flight
+    return single_flight.stats()
+
+@app.get('/stats/state')
+def get_state_stats():
+    """Monitor state size, including dedup memory footprint and false-positive estimate"""
+    from state_store import state_store
+    return state_store.stats()
+
+@app.get('/stats/stream')
+def get_stream_status():
+    """Trade stream connection state and the latest price-drop alerts it raised"""
+    from price_stream import price_stream
+    from stock_monitor import stream_alerts
+    return dict(price_stream.status(), recent_alerts=list(stream_alerts))
+
+@app.get('/stats/cache')
+def get_cache_stats():
+    """Sentiment result cache hits, misses and evictions"""
+    from result_cache import sentiment_cache
+    return sentiment_cache.stats()
+
+@app.get('/stats/inference')
+def get_inference_stats():
+    """Transformer engine load state and micro-batch sizes"""
+    from advanced_sentiment import advanced_analyzer
+    return advanced_analyzer.engine.stats()
+
+@app.get('/stats/pool')
+def get_pool_stats():
+    """Sentiment worker pool size and batches scored in workers vs in-process"""
+    from sentiment_pool import sentiment_pool
+    return sentiment_pool.stats()
+
+@app.get('/stats/metadata')
+def get_metadata_stats():
+    """Stock metadata cache hits, background refreshes and failed loads, plus the compiled metadata table"""
+    from metadata_cache import metadata_cache
+    from metadata_table import metadata_table
+    return dict(metadata_cache.stats(), table=metadata_table.stats())
+
+@app.get('/stats/archive')
+def get_archive_stats():
+    """Archived article count, batched writes and anything dropped or still queued"""
+    from article_archive import article_archive
+    return article_archive.stats()
+
+@app.get('/ready')
+def readiness():
+    """200 once the startup warm-up has loaded the analyzers, 503 until then; includes per-step load timings"""
+    from fastapi.responses import JSONResponse
+    from warmup import warmup
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status['ready'] else 503)
+
 @app.get('/health')
 def health_check():
     return {'status': 'healthy', 'service': 'stock-tracker-api', 'version': '2.0.0'}
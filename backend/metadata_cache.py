@@ -0,0 +1,224 @@
+"""
+Shared stock metadata cache
+
+ImpactCalculator, SimpleSentimentAnalyzer and the advanced analyzer all look
+up per-symbol metadata, and ImpactCalculator's lookup is two Finnhub calls.
+MetadataCache keeps one entry per (source, symbol):
+
+- fresh entries (younger than METADATA_TTL_SECONDS) are returned as is
+- expired entries are still returned, and a background thread reloads them
+  (stale-while-revalidate), so a request never waits on an expired symbol
+- a symbol that has never loaded is fetched on the calling thread; if that
+  fails the source's default is returned and retried after
+  METADATA_RETRY_SECONDS
+
+preload() fills the whole portfolio at startup, and with METADATA_CACHE_PATH
+set, entries from network sources are snapshotted to a JSON file so a restart
+starts warm instead of refetching every symbol.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import METADATA_TTL_SECONDS, METADATA_RETRY_SECONDS, METADATA_CACHE_PATH, METADATA_REFRESH_WORKERS
+
+class MetadataCache:
+    """TTL cache of stock metadata with background refresh, preloading and a disk snapshot"""
+
+    def __init__(self, ttl=METADATA_TTL_SECONDS, retry_seconds=METADATA_RETRY_SECONDS,
+                 snapshot_path=METADATA_CACHE_PATH, refresh_workers=METADATA_REFRESH_WORKERS):
+        self.ttl = ttl
+        self.retry_seconds = retry_seconds
+        self.snapshot_path = snapshot_path or None
+        self.refresh_workers = max(1, refresh_workers)
+
+        self._sources = {}  # {source: (loader, default, persist)}
+        self._entries = {}  # {(source, symbol): {'metadata', 'fetched_at', 'expires_at', 'ok'}}
+        self._refreshing = set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._executor = None
+        self.counters = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'loads': 0, 'refreshes': 0, 'failures': 0}
+
+        self._snapshot = self._read_snapshot()
+
+    def register(self, source, loader, default=None, persist=True):
+        """
+        Add a metadata source
+
+        Args:
+            loader: symbol -> metadata dict; raise to signal a failed load
+            default: symbol -> metadata dict used when a first load fails
+            persist (bool): Include this source in the disk snapshot
+        """
+        with self._lock:
+            self._sources[source] = (loader, default, persist)
+            # Entries saved by an earlier run come back as they were, expired or not
+            for symbol, entry in self._snapshot.pop(source, {}).items():
+                self._entries.setdefault((source, symbol), entry)
+
+    def add_listener(self, callback):
+        """callback(source, symbol) runs whenever an entry is replaced or invalidated (symbol None for all)"""
+        self._listeners.append(callback)
+
+    def get(self, source, symbol):
+        """Metadata for a symbol from a source, loading it if it has never been loaded"""
+        now = time.time()
+        entry = self._entries.get((source, symbol))
+        if entry is not None:
+            if now < entry['expires_at']:
+                self.counters['hits'] += 1
+            else:
+                self.counters['stale_hits'] += 1
+                self._refresh_in_background(source, symbol)
+            return entry['metadata']
+
+        self.counters['misses'] += 1
+        return self._load(source, symbol)['metadata']
+
+    def preload(self, symbols, sources=None):
+        """Load every symbol that is not cached or has expired, for each source; returns how many were loaded"""
+        now = time.time()
+        loaded = 0
+        for source in sources or list(self._sources):
+            for symbol in symbols:
+                entry = self._entries.get((source, symbol))
+                if entry is None or now >= entry['expires_at']:
+                    self._load(source, symbol, save=False)
+                    loaded += 1
+        # One snapshot write for the whole batch
+        if loaded:
+            self.save()
+        return loaded
+
+    def put(self, source, symbol, metadata):
+        """Store metadata directly, e.g. from a bulk lookup"""
+        self._store(source, symbol, metadata, ok=True)
+
+    def invalidate(self, source=None, symbol=None):
+        """Drop entries so the next get reloads them; None matches every source or symbol"""
+        with self._lock:
+            for key in [key for key in self._entries if source in (None, key[0]) and symbol in (None, key[1])]:
+                del self._entries[key]
+        self._notify(source, symbol)
+
+    def _load(self, source, symbol, save=True):
+        loader, default, _ = self._sources[source]
+        try:
+            metadata = loader(symbol)
+            ok = True
+            self.counters['loads'] += 1
+        except Exception as e:
+            print(f"❌ Error loading {source} metadata for {symbol}: {e}")
+            self.counters['failures'] += 1
+            previous = self._entries.get((source, symbol))
+            if previous is not None and previous['ok']:
+                # Keep serving the last good metadata and try again later
+                metadata = previous['metadata']
+            elif default is not None:
+                metadata = default(symbol)
+            else:
+                raise
+            ok = False
+        return self._store(source, symbol, metadata, ok, save)
+
+    def _store(self, source, symbol, metadata, ok, save=True):
+        now = time.time()
+        entry = {
+            'metadata': metadata,
+            'fetched_at': now,
+            'expires_at': now + (self.ttl if ok else self.retry_seconds),
+            'ok': ok
+        }
+        with self._lock:
+            previous = self._entries.get((source, symbol))
+            self._entries[(source, symbol)] = entry
+            persist = self._sources[source][2]
+        if previous is not None and previous['metadata'] != metadata:
+            self._notify(source, symbol)
+        if ok and persist and save:
+            self.save()
+        return entry
+
+    def _refresh_in_background(self, source, symbol):
+        with self._lock:
+            if (source, symbol) in self._refreshing:
+                return
+            self._refreshing.add((source, symbol))
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.refresh_workers, thread_name_prefix='metadata-refresh')
+        self._executor.submit(self._refresh, source, symbol)
+
+    def _refresh(self, source, symbol):
+        try:
+            self._load(source, symbol)
+            self.counters['refreshes'] += 1
+        except Exception as e:
+            print(f"❌ Error refreshing {source} metadata for {symbol}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard((source, symbol))
+
+    def _notify(self, source, symbol):
+        for callback in self._listeners:
+            try:
+                callback(source, symbol)
+            except Exception as e:
+                print(f"❌ Error in metadata listener: {e}")
+
+    def _read_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return {}
+        try:
+            with open(self.snapshot_path) as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"❌ Error reading metadata snapshot {self.snapshot_path}: {e}")
+            return {}
+
+    def save(self):
+        """Write successfully loaded entries of persisted sources to the snapshot file"""
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            snapshot = {}
+            for (source, symbol), entry in self._entries.items():
+                if entry['ok'] and self._sources.get(source, (None, None, False))[2]:
+                    snapshot.setdefault(source, {})[symbol] = entry
+            # Sources not registered in this run keep their saved entries
+            for source, entries in self._snapshot.items():
+                snapshot.setdefault(source, entries)
+        with self._snapshot_lock:
+            temp_path = f"{self.snapshot_path}.tmp"
+            try:
+                with open(temp_path, 'w') as f:
+                    json.dump(snapshot, f, default=str)
+                os.replace(temp_path, self.snapshot_path)
+            except Exception as e:
+                print(f"❌ Error writing metadata snapshot {self.snapshot_path}: {e}")
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            entries = list(self._entries.values())
+            refreshing = len(self._refreshing)
+        return dict(
+            self.counters,
+            entries=len(entries),
+            expired=sum(1 for entry in entries if now >= entry['expires_at']),
+            refreshing=refreshing,
+            ttl_seconds=self.ttl,
+            snapshot_path=self.snapshot_path
+        )
+
+# Global instance
+metadata_cache = MetadataCache()
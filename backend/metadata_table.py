@@ -0,0 +1,260 @@
+"""
+File-backed stock metadata table
+
+SimpleSentimentAnalyzer used to rebuild a dict literal of six tickers on
+every metadata miss and hand every other symbol the same default. Symbol
+metadata now lives in a local source file (METADATA_SOURCE_PATH, JSON or
+CSV) that is compiled once into a single binary table:
+
+- numeric fields are NumPy columns, one row per symbol
+- sector, industry and every competitor, supplier and raw material name is
+  stored once in a UTF-8 string pool and referenced by int32 code; the list
+  fields are (offsets, codes) pairs
+- symbols are found through an open-addressing hash table of row numbers
+  (CRC32 of the symbol, so it is the same in every process)
+
+The compiled file is memory-mapped read-only, so every worker process on a
+machine shares one copy through the page cache, and a lookup touches a
+handful of array slots however many symbols the table holds. The table is
+recompiled when the source file is newer than the compiled one.
+"""
+
+import csv
+import json
+import os
+import zlib
+import numpy as np
+from config import METADATA_SOURCE_PATH, METADATA_TABLE_PATH
+
+MAGIC = b'FINMETA1'
+ALIGNMENT = 64
+
+INT_FIELDS = ('market_cap', 'revenue')
+FLOAT_FIELDS = ('beta', 'pe_ratio', 'profit_margin')
+STRING_FIELDS = ('sector', 'industry')
+LIST_FIELDS = ('competitors', 'suppliers', 'raw_materials')
+
+# Field order of the metadata dicts handed out, as the analyzers have always built them
+FIELDS = ('market_cap', 'sector', 'industry', 'competitors', 'suppliers', 'raw_materials',
+          'beta', 'pe_ratio', 'revenue', 'profit_margin')
+
+DEFAULT_METADATA = {
+    'market_cap': 1000000000000,
+    'sector': 'Technology',
+    'industry': 'General',
+    'competitors': [],
+    'suppliers': [],
+    'raw_materials': [],
+    'beta': 1.0,
+    'pe_ratio': 20.0,
+    'revenue': 50000000000,
+    'profit_margin': 0.10
+}
+
+def default_metadata():
+    """A fresh copy of the metadata used for symbols the table does not know"""
+    return {field: list(value) if isinstance(value, list) else value for field, value in DEFAULT_METADATA.items()}
+
+def symbol_hash(symbol):
+    return zlib.crc32(symbol.encode('utf-8'))
+
+def read_source(path):
+    """
+    {symbol: metadata} from a JSON object or a CSV file
+
+    CSV files have one row per symbol with a 'symbol' column and one column per
+    field; list fields are separated by '|'.
+    """
+    if path.lower().endswith('.csv'):
+        records = {}
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                record = {}
+                for field in FIELDS:
+                    value = (row.get(field) or '').strip()
+                    if field in LIST_FIELDS:
+                        record[field] = [name.strip() for name in value.split('|') if name.strip()]
+                    elif value:
+                        record[field] = value
+                records[row['symbol'].strip().upper()] = record
+        return records
+    with open(path) as f:
+        return {symbol.upper(): record for symbol, record in json.load(f).items()}
+
+def build_arrays(records):
+    """Columnar arrays for {symbol: metadata}; fields a record leaves out take the default"""
+    symbols = sorted(records)
+    count = len(symbols)
+    arrays = {}
+
+    for field in INT_FIELDS:
+        arrays[field] = np.array([int(float(records[s].get(field, DEFAULT_METADATA[field]))) for s in symbols], dtype=np.int64)
+    for field in FLOAT_FIELDS:
+        arrays[field] = np.array([float(records[s].get(field, DEFAULT_METADATA[field])) for s in symbols], dtype=np.float64)
+
+    # Every distinct string once, shared by all string and list fields
+    codes = {}
+    def code(value):
+        return codes.setdefault(value, len(codes))
+    for field in STRING_FIELDS:
+        arrays[field] = np.array([code(records[s].get(field) or DEFAULT_METADATA[field]) for s in symbols], dtype=np.int32)
+    for field in LIST_FIELDS:
+        lists = [records[s].get(field) or [] for s in symbols]
+        arrays[f'{field}_offsets'] = np.cumsum([0] + [len(names) for names in lists], dtype=np.int64)
+        arrays[f'{field}_codes'] = np.array([code(name) for names in lists for name in names], dtype=np.int32)
+
+    encoded = [value.encode('utf-8') for value in codes]
+    arrays['strings_offsets'] = np.cumsum([0] + [len(value) for value in encoded], dtype=np.int64)
+    arrays['strings_data'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+    encoded_symbols = [symbol.encode('utf-8') for symbol in symbols]
+    arrays['symbols'] = np.array(encoded_symbols, dtype=f'S{max([len(s) for s in encoded_symbols] + [1])}')
+
+    # Open addressing with linear probing, kept at most half full
+    slots = np.full(1 << max(1, (2 * count - 1).bit_length()), -1, dtype=np.int32)
+    mask = len(slots) - 1
+    for row, symbol in enumerate(symbols):
+        slot = symbol_hash(symbol) & mask
+        while slots[slot] != -1:
+            slot = (slot + 1) & mask
+        slots[slot] = row
+    arrays['slots'] = slots
+    return arrays
+
+def write_table(path, arrays):
+    """Write arrays into one file: magic, header length, JSON header, then 64-byte aligned arrays"""
+    columns = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        columns[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+    header = json.dumps({'count': int(len(arrays['symbols'])), 'columns': columns}).encode('utf-8')
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    # Written beside the target and renamed, so a reader never maps a half-written table
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + columns[name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temp_path, path)
+
+def read_table(path):
+    """Arrays of a compiled table as read-only views of one memory map"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a compiled metadata table")
+        header_length = int.from_bytes(f.read(8), 'little')
+        header = json.loads(f.read(header_length))
+    data_start = -(-(len(MAGIC) + 8 + header_length) // ALIGNMENT) * ALIGNMENT
+    # Plain ndarray views: slicing np.memmap itself runs Python-level hooks on every lookup
+    buffer = np.memmap(path, dtype=np.uint8, mode='r').view(np.ndarray)
+    arrays = {}
+    for name, column in header['columns'].items():
+        dtype = np.dtype(column['dtype'])
+        count = int(np.prod(column['shape']))
+        start = data_start + column['offset']
+        arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(column['shape'])
+    return arrays
+
+class MetadataTable:
+    """Read-only symbol -> metadata lookups over compiled columnar arrays"""
+
+    def __init__(self, arrays, path=None):
+        self.path = path
+        self._arrays = arrays
+        self._symbols = arrays['symbols']
+        self._slots = arrays['slots']
+        self._mask = len(self._slots) - 1
+        self._strings_offsets = arrays['strings_offsets']
+        self._strings_data = arrays['strings_data']
+
+    @classmethod
+    def from_records(cls, records):
+        """An in-memory table, e.g. for tests or when the compiled file cannot be written"""
+        return cls(build_arrays({symbol.upper(): record for symbol, record in records.items()}))
+
+    @classmethod
+    def open(cls, source_path=METADATA_SOURCE_PATH, table_path=METADATA_TABLE_PATH):
+        """
+        Memory-map the compiled table, compiling it from the source file first if it is missing or older
+
+        Returns:
+            MetadataTable: an empty table when neither file exists
+        """
+        table_path = table_path or (f"{os.path.splitext(source_path)[0]}.table" if source_path else '')
+        source_exists = bool(source_path) and os.path.exists(source_path)
+        table_exists = bool(table_path) and os.path.exists(table_path)
+
+        if source_exists and (not table_exists or os.path.getmtime(table_path) < os.path.getmtime(source_path)):
+            arrays = build_arrays(read_source(source_path))
+            try:
+                write_table(table_path, arrays)
+                print(f"✅ Compiled {len(arrays['symbols'])} symbols from {source_path} into {table_path}")
+            except OSError as e:
+                print(f"❌ Error writing metadata table {table_path}, keeping it in memory: {e}")
+                return cls(arrays)
+        elif not table_exists:
+            return cls(build_arrays({}))
+        return cls(read_table(table_path), table_path)
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __contains__(self, symbol):
+        return self.row(symbol) is not None
+
+    def row(self, symbol):
+        """Row number of a symbol, or None"""
+        key = symbol.upper().encode('utf-8')
+        slot = symbol_hash(symbol.upper()) & self._mask
+        while True:
+            row = int(self._slots[slot])
+            if row == -1:
+                return None
+            if self._symbols[row] == key:
+                return row
+            slot = (slot + 1) & self._mask
+
+    def _string(self, code):
+        start, end = self._strings_offsets[code:code + 2].tolist()
+        return self._strings_data[start:end].tobytes().decode('utf-8')
+
+    def get(self, symbol):
+        """Metadata dict for a symbol, or None if the table does not have it"""
+        row = self.row(symbol)
+        if row is None:
+            return None
+        arrays = self._arrays
+        metadata = {}
+        for field in FIELDS:
+            if field in INT_FIELDS:
+                metadata[field] = int(arrays[field][row])
+            elif field in FLOAT_FIELDS:
+                metadata[field] = float(arrays[field][row])
+            elif field in STRING_FIELDS:
+                metadata[field] = self._string(int(arrays[field][row]))
+            else:
+                start, end = arrays[f'{field}_offsets'][row:row + 2].tolist()
+                metadata[field] = [self._string(code) for code in arrays[f'{field}_codes'][start:end].tolist()]
+        return metadata
+
+    def symbols(self):
+        return [symbol.decode('utf-8') for symbol in self._symbols]
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'symbols': len(self),
+            'strings': len(self._strings_offsets) - 1,
+            'memory_mapped': self.path is not None,
+            'bytes': int(sum(array.nbytes for array in self._arrays.values()))
+        }
+
+# Global instance
+metadata_table = MetadataTable.open()
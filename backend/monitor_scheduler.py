@@ -0,0 +1,163 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from config import MONITOR_INTERVAL_SECONDS, MONITOR_JOB_HISTORY, MONITOR_MAX_QUEUED
+
+class QueueFullError(RuntimeError):
+    """Raised by submit when MONITOR_MAX_QUEUED jobs are already waiting"""
+
+class MonitorScheduler:
+    """Runs monitoring jobs on a background worker, on demand and on a fixed interval"""
+    
+    def __init__(self, interval=MONITOR_INTERVAL_SECONDS, max_jobs=MONITOR_JOB_HISTORY, max_queued=MONITOR_MAX_QUEUED):
+        self.interval = interval
+        self.max_jobs = max_jobs
+        self.max_queued = max(1, max_queued)
+        self._jobs = OrderedDict()  # {job_id: job}, oldest first
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+    
+    def start(self):
+        """Start the worker and, if an interval is configured, the interval timer"""
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._worker, name='monitor-worker', daemon=True)]
+        if self.interval > 0:
+            self._threads.append(threading.Thread(target=self._ticker, name='monitor-interval', daemon=True))
+        for thread in self._threads:
+            thread.start()
+        print(f"📅 Monitor scheduler started (interval: {f'{self.interval}s' if self.interval else 'disabled'})")
+    
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+    
+    def submit(self, portfolio=None, max_workers=None, deadline=None, trigger='manual'):
+        """
+        Queue a monitoring run
+        
+        A request identical to a job that is still queued joins that job instead
+        of queueing another full run.
+        
+        Returns:
+            dict: Snapshot of the queued job, including its id ('coalesced' is True
+            when an existing job was returned)
+        
+        Raises:
+            QueueFullError: If max_queued jobs are already waiting
+        """
+        symbols = list(portfolio) if portfolio else None
+        options = {'max_workers': max_workers, 'deadline': deadline}
+        job = {
+            'id': uuid.uuid4().hex,
+            'status': 'queued',
+            'trigger': trigger,
+            'symbols': symbols,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'alerts': [],
+            'results': {},
+            'timings': {},
+            'timed_out': [],
+            'error': None,
+            '_options': options
+        }
+        with self._lock:
+            queued = [queued_job for queued_job in self._jobs.values() if queued_job['status'] == 'queued']
+            for queued_job in queued:
+                if queued_job['symbols'] == symbols and queued_job['_options'] == options:
+                    return dict(self._public(queued_job), coalesced=True)
+            if len(queued) >= self.max_queued:
+                raise QueueFullError(f"{len(queued)} monitoring jobs are already queued")
+            self._jobs[job['id']] = job
+            self._trim()
+        self._queue.put(job['id'])
+        return dict(self._public(job), coalesced=False)
+    
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._public(job) if job else None
+    
+    def list_jobs(self, limit=20):
+        """Most recent jobs first, without their per-symbol results"""
+        with self._lock:
+            jobs = list(self._jobs.values())[-limit:]
+        return [
+            {key: job[key] for key in ('id', 'status', 'trigger', 'created_at', 'started_at', 'finished_at', 'timed_out', 'error')}
+            for job in reversed(jobs)
+        ]
+    
+    def _public(self, job):
+        return {key: value for key, value in job.items() if not key.startswith('_')}
+    
+    def _trim(self):
+        # Drop the oldest finished jobs beyond the history limit
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id]['status'] in ('completed', 'failed'):
+                del self._jobs[job_id]
+    
+    def _pending_scheduled(self):
+        with self._lock:
+            return any(
+                job['trigger'] == 'interval' and job['status'] in ('queued', 'running')
+                for job in self._jobs.values()
+            )
+    
+    def _ticker(self):
+        while not self._stop.wait(self.interval):
+            # Skip a tick rather than pile up runs when monitoring is slower than the interval
+            if not self._pending_scheduled():
+                try:
+                    self.submit(trigger='interval')
+                except QueueFullError as e:
+                    print(f"⏭️ Skipping scheduled monitoring run: {e}")
+    
+    def _worker(self):
+        from stock_monitor import PORTFOLIO, monitor_stocks_concurrent
+        
+        while not self._stop.is_set():
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job['status'] = 'running'
+                job['started_at'] = time.time()
+            
+            try:
+                run = monitor_stocks_concurrent(job['symbols'] or PORTFOLIO, **job['_options'])
+                with self._lock:
+                    job.update({
+                        'status': 'completed',
+                        'alerts': run['alerts'],
+                        'results': run['results'],
+                        'timings': run['timings'],
+                        'timed_out': run['timed_out'],
+                        'elapsed_seconds': run['elapsed_seconds']
+                    })
+            except Exception as e:
+                print(f"Monitoring job {job_id} failed: {e}")
+                with self._lock:
+                    job['status'] = 'failed'
+                    job['error'] = str(e)
+            finally:
+                with self._lock:
+                    job['finished_at'] = time.time()
+
+# Global instance
+monitor_scheduler = MonitorScheduler()
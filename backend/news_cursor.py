@@ -0,0 +1,119 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from config import NEWS_INITIAL_LOOKBACK_DAYS, NEWS_BUFFER_SIZE
+
+# Finnhub filters company news by calendar date only, so each poll re-requests
+# from a day before the high-water mark and de-duplicates the overlap by id
+OVERLAP_SECONDS = 86400
+
+class NewsCursorStore:
+    """Per-symbol high-water marks and recent-article buffers for incremental news polling"""
+    
+    def __init__(self, initial_lookback_days=NEWS_INITIAL_LOOKBACK_DAYS, buffer_size=NEWS_BUFFER_SIZE):
+        self.initial_lookback_days = initial_lookback_days
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        # {symbol: {'latest_datetime': int, 'latest_id': id, 'boundary': {id: datetime}, 'articles': [..]}}
+        self._cursors = {}
+    
+    def window(self, symbol):
+        """
+        Date window to request for this symbol
+        
+        Returns:
+            tuple: (from_date, to_date) as 'YYYY-MM-DD' strings
+        """
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            cursor = self._cursors.get(symbol)
+            latest = cursor['latest_datetime'] if cursor else None
+        
+        if latest:
+            start = datetime.fromtimestamp(latest - OVERLAP_SECONDS, timezone.utc)
+        else:
+            start = now - timedelta(days=self.initial_lookback_days)
+        
+        # 'to' is inclusive; a day ahead covers publishers stamped in later time zones
+        end = now + timedelta(days=1)
+        return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+    
+    def merge(self, symbol, items):
+        """
+        Merge a successful poll into the symbol's buffer and advance its cursor
+        
+        Args:
+            symbol (str): Stock symbol
+            items (list): Articles returned for the window from window()
+        
+        Returns:
+            tuple: (new_items, recent_items), both newest first
+        """
+        with self._lock:
+            cursor = self._cursors.setdefault(symbol, {
+                'latest_datetime': 0,
+                'latest_id': None,
+                'boundary': {},
+                'articles': []
+            })
+            boundary = cursor['boundary']
+            
+            new_items = []
+            for item in items:
+                news_id = item.get('id')
+                item_time = item.get('datetime') or 0
+                if news_id is None or news_id in boundary:
+                    continue
+                # Older than the remembered boundary - already covered by an earlier poll
+                if cursor['latest_datetime'] and item_time < cursor['latest_datetime'] - 2 * OVERLAP_SECONDS:
+                    continue
+                boundary[news_id] = item_time
+                new_items.append(item)
+            
+            if not new_items:
+                return [], list(cursor['articles'])
+            
+            new_items.sort(key=lambda item: item.get('datetime') or 0, reverse=True)
+            head = new_items[0]
+            if (head.get('datetime') or 0) >= cursor['latest_datetime']:
+                cursor['latest_datetime'] = head.get('datetime') or 0
+                cursor['latest_id'] = head.get('id')
+            
+            # Only ids that can reappear in the next window need to be remembered
+            cutoff = cursor['latest_datetime'] - 2 * OVERLAP_SECONDS
+            cursor['boundary'] = {
+                news_id: item_time for news_id, item_time in boundary.items() if item_time >= cutoff
+            }
+            
+            articles = new_items + cursor['articles']
+            articles.sort(key=lambda item: item.get('datetime') or 0, reverse=True)
+            cursor['articles'] = articles[:self.buffer_size]
+            
+            return new_items, list(cursor['articles'])
+    
+    def recent(self, symbol):
+        """Buffered articles for this symbol, newest first"""
+        with self._lock:
+            cursor = self._cursors.get(symbol)
+            return list(cursor['articles']) if cursor else []
+    
+    def cursor(self, symbol):
+        """High-water mark for this symbol, or None before the first successful poll"""
+        with self._lock:
+            cursor = self._cursors.get(symbol)
+            if not cursor:
+                return None
+            return {
+                'latest_datetime': cursor['latest_datetime'],
+                'latest_id': cursor['latest_id'],
+                'buffered_articles': len(cursor['articles'])
+            }
+    
+    def reset(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._cursors.clear()
+            else:
+                self._cursors.pop(symbol, None)
+
+# Global instance
+news_cursors = NewsCursorStore()
@@ -0,0 +1,143 @@
+import hashlib
+import math
+import threading
+import time
+from config import SEEN_NEWS_TTL_HOURS, BLOOM_FP_RATE, BLOOM_BUCKETS, BLOOM_BUCKET_CAPACITY
+
+class BloomFilter:
+    """Fixed-size Bloom filter over a bytearray using double hashing"""
+    
+    def __init__(self, capacity, fp_rate):
+        self.capacity = max(1, capacity)
+        self.fp_rate = fp_rate
+        # Optimal bit count and hash count for the target false-positive rate
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    @staticmethod
+    def hash_key(key):
+        """Two 64-bit hashes for double hashing; compute once and reuse across filters"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+    
+    def add_hashed(self, h1, h2):
+        bits = self.bits
+        m = self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % m
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def contains_hashed(self, h1, h2):
+        bits = self.bits
+        m = self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % m
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+    
+    def add(self, key):
+        self.add_hashed(*self.hash_key(key))
+    
+    def __contains__(self, key):
+        return self.contains_hashed(*self.hash_key(key))
+    
+    def estimated_fp_rate(self):
+        """False-positive probability given how many keys were actually added"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+    
+    @property
+    def memory_bytes(self):
+        return len(self.bits)
+
+class RotatingBloomFilter:
+    """
+    Time-windowed set membership built from one Bloom filter per time bucket
+    
+    Keys are remembered for roughly window_seconds; whole buckets are dropped as
+    they age out, so memory stays fixed instead of growing with every id seen.
+    """
+    
+    def __init__(self, window_seconds=SEEN_NEWS_TTL_HOURS * 3600, buckets=BLOOM_BUCKETS,
+                 bucket_capacity=BLOOM_BUCKET_CAPACITY, fp_rate=BLOOM_FP_RATE):
+        self.window_seconds = window_seconds
+        self.num_buckets = max(1, buckets)
+        self.bucket_seconds = window_seconds / self.num_buckets
+        self.bucket_capacity = bucket_capacity
+        self.fp_rate = fp_rate
+        # A lookup checks every live bucket, so split the FP budget between them
+        self.bucket_fp_rate = fp_rate / self.num_buckets
+        self._lock = threading.Lock()
+        self._buckets = {}  # {bucket_id: BloomFilter}
+        self._order = []    # live bucket ids, newest first
+        self._current_id = None
+    
+    def _bucket_id(self, timestamp):
+        return int(timestamp // self.bucket_seconds)
+    
+    def _expire(self, now):
+        current = self._bucket_id(now)
+        if current == self._current_id:
+            return
+        self._current_id = current
+        oldest = current - self.num_buckets + 1
+        for bucket_id in [b for b in self._buckets if b < oldest]:
+            del self._buckets[bucket_id]
+        self._order = sorted(self._buckets, reverse=True)
+    
+    def add(self, key, timestamp=None):
+        now = time.time()
+        timestamp = timestamp or now
+        h1, h2 = BloomFilter.hash_key(key)
+        with self._lock:
+            self._expire(now)
+            bucket_id = self._bucket_id(timestamp)
+            if bucket_id < self._current_id - self.num_buckets + 1:
+                return  # already outside the window
+            bucket = self._buckets.get(bucket_id)
+            if bucket is None:
+                bucket = self._buckets[bucket_id] = BloomFilter(self.bucket_capacity, self.bucket_fp_rate)
+                self._order = sorted(self._buckets, reverse=True)
+            bucket.add_hashed(h1, h2)
+    
+    def __contains__(self, key):
+        h1, h2 = BloomFilter.hash_key(key)
+        with self._lock:
+            self._expire(time.time())
+            # Newest buckets first - recent ids are the likeliest repeats
+            for bucket_id in self._order:
+                if self._buckets[bucket_id].contains_hashed(h1, h2):
+                    return True
+        return False
+    
+    def purge_expired(self, now=None):
+        with self._lock:
+            before = sum(bucket.count for bucket in self._buckets.values())
+            self._current_id = None
+            self._expire(now or time.time())
+            return before - sum(bucket.count for bucket in self._buckets.values())
+    
+    def estimated_fp_rate(self):
+        """Chance that an unseen key matches any live bucket"""
+        with self._lock:
+            miss = 1.0
+            for bucket in self._buckets.values():
+                miss *= 1 - bucket.estimated_fp_rate()
+            return 1 - miss
+    
+    def stats(self):
+        with self._lock:
+            buckets = list(self._buckets.values())
+        return {
+            'window_seconds': self.window_seconds,
+            'buckets': len(buckets),
+            'max_buckets': self.num_buckets,
+            'keys': sum(bucket.count for bucket in buckets),
+            'memory_bytes': sum(bucket.memory_bytes for bucket in buckets),
+            'target_fp_rate': self.fp_rate,
+            'estimated_fp_rate': round(self.estimated_fp_rate(), 8),
+            'overfull_buckets': sum(1 for bucket in buckets if bucket.count > bucket.capacity)
+        }
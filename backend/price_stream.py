@@ -0,0 +1,193 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from config import FINNHUB_API_KEY, FINNHUB_WS_URL, PRICE_STREAM_MAX_AGE_SECONDS
+
+class PriceStream:
+    """In-memory latest-price table fed by the Finnhub WebSocket trade stream"""
+    
+    def __init__(self, url=FINNHUB_WS_URL, api_key=FINNHUB_API_KEY, max_age=PRICE_STREAM_MAX_AGE_SECONDS,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.url = url
+        self.api_key = api_key
+        self.max_age = max_age
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        
+        self._lock = threading.Lock()
+        self._prices = {}  # {symbol: {'price', 'trade_time', 'received_at'}}
+        self._symbols = set()
+        self._listeners = []
+        self._loop = None
+        self._task = None
+        self._thread = None
+        self._ws = None
+        self._stopping = False
+        self.connected = threading.Event()
+        self.counters = {'connects': 0, 'reconnects': 0, 'messages': 0, 'trades': 0}
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self, symbols=()):
+        """Connect in a background thread and subscribe to the given symbols"""
+        try:
+            import websockets  # noqa: F401
+        except ImportError:
+            print("⚠️  websockets not installed - price streaming disabled (pip install websockets)")
+            return False
+        
+        for symbol in symbols:
+            self.subscribe(symbol)
+        if self.running:
+            return True
+        
+        self._stopping = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='price-stream', daemon=True)
+        self._thread.start()
+        print(f"📡 Price stream started for {len(self._symbols)} symbols")
+        return True
+    
+    def stop(self, timeout=5):
+        if not self.running:
+            return
+        self._stopping = True
+        self._loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def subscribe(self, symbol):
+        with self._lock:
+            self._symbols.add(symbol)
+        self._send_threadsafe({'type': 'subscribe', 'symbol': symbol})
+    
+    def unsubscribe(self, symbol):
+        with self._lock:
+            self._symbols.discard(symbol)
+            self._prices.pop(symbol, None)
+        self._send_threadsafe({'type': 'unsubscribe', 'symbol': symbol})
+    
+    def add_listener(self, listener):
+        """Call listener(symbol, price, trade_time_ms) on the stream thread for every trade; keep it cheap"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+    
+    def latest(self, symbol):
+        with self._lock:
+            entry = self._prices.get(symbol)
+            return dict(entry) if entry else None
+    
+    def latest_price(self, symbol, max_age=None):
+        """Latest streamed price, or None if nothing arrived within max_age seconds"""
+        entry = self.latest(symbol)
+        if entry is None:
+            return None
+        max_age = self.max_age if max_age is None else max_age
+        if time.monotonic() - entry['received_at'] > max_age:
+            return None
+        return entry['price']
+    
+    def status(self):
+        with self._lock:
+            symbols = sorted(self._symbols)
+            priced = len(self._prices)
+        return dict(self.counters, running=self.running, connected=self.connected.is_set(),
+                    url=self.url, symbols=symbols, symbols_priced=priced)
+    
+    def _send_threadsafe(self, message):
+        ws, loop = self._ws, self._loop
+        if ws is not None and loop is not None and self.connected.is_set():
+            asyncio.run_coroutine_threadsafe(ws.send(json.dumps(message)), loop)
+    
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self._run())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+    
+    async def _run(self):
+        import websockets
+        
+        delay = self.reconnect_delay
+        url = f'{self.url}?token={self.api_key}' if self.api_key else self.url
+        
+        while not self._stopping:
+            try:
+                async with websockets.connect(url, ping_interval=20) as ws:
+                    self._ws = ws
+                    self.counters['connects'] += 1
+                    delay = self.reconnect_delay
+                    
+                    # Resubscribe everything after every (re)connect
+                    with self._lock:
+                        symbols = sorted(self._symbols)
+                    for symbol in symbols:
+                        await ws.send(json.dumps({'type': 'subscribe', 'symbol': symbol}))
+                    self.connected.set()
+                    
+                    async for message in ws:
+                        self._handle(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Price stream disconnected: {e}")
+            finally:
+                self._ws = None
+                self.connected.clear()
+            
+            if self._stopping:
+                break
+            self.counters['reconnects'] += 1
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, self.max_reconnect_delay)
+    
+    def _handle(self, message):
+        self.counters['messages'] += 1
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            return
+        
+        if payload.get('type') == 'error':
+            print(f"Price stream error: {payload.get('msg')}")
+            return
+        if payload.get('type') != 'trade':
+            return  # pings and acknowledgements
+        
+        # A message can batch several trades; keep the newest per symbol
+        newest = {}
+        for trade in payload.get('data') or []:
+            symbol, price, trade_time = trade.get('s'), trade.get('p'), trade.get('t') or 0
+            if symbol is None or price is None:
+                continue
+            self.counters['trades'] += 1
+            if symbol not in newest or trade_time >= newest[symbol][1]:
+                newest[symbol] = (price, trade_time)
+        
+        received_at = time.monotonic()
+        updated = []
+        with self._lock:
+            for symbol, (price, trade_time) in newest.items():
+                current = self._prices.get(symbol)
+                if current and current['trade_time'] > trade_time:
+                    continue  # out-of-order trade
+                self._prices[symbol] = {'price': price, 'trade_time': trade_time, 'received_at': received_at}
+                updated.append((symbol, price, trade_time))
+        
+        for symbol, price, trade_time in updated:
+            for listener in self._listeners:
+                try:
+                    listener(symbol, price, trade_time)
+                except Exception as e:
+                    print(f"Price stream listener failed for {symbol}: {e}")
+
+# Global instance
+price_stream = PriceStream()
@@ -0,0 +1,164 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from config import FINNHUB_CALLS_PER_MINUTE, FINNHUB_BURST
+
+# Lower number = served first when callers compete for the same token
+PRIORITIES = {
+    'quote': 0,
+    'news': 1,
+    'metadata': 2
+}
+
+class QuotaScheduler:
+    """Token-bucket scheduler that shares the Finnhub call budget by priority class"""
+    
+    def __init__(self, calls_per_minute=FINNHUB_CALLS_PER_MINUTE, burst=FINNHUB_BURST):
+        self.calls_per_minute = calls_per_minute
+        self.rate = calls_per_minute / 60.0
+        self.capacity = max(1, min(burst, calls_per_minute)) if calls_per_minute else 0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._recent = deque()  # monotonic timestamps of granted calls in the last minute
+        self._throttled = 0
+        self._stats = {
+            name: {'granted': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+            for name in PRIORITIES
+        }
+    
+    @property
+    def enabled(self):
+        return self.calls_per_minute > 0
+    
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def acquire(self, priority_class='metadata', timeout=None):
+        """
+        Block until a call may be made for this priority class
+        
+        Args:
+            priority_class (str): One of PRIORITIES ('quote', 'news', 'metadata')
+            timeout (float): Give up after this many seconds (None waits indefinitely)
+        
+        Returns:
+            float: Seconds spent queued
+        
+        Raises:
+            TimeoutError: If no token was granted within the timeout
+        """
+        if priority_class not in PRIORITIES:
+            priority_class = 'metadata'
+        start = time.monotonic()
+        
+        if not self.enabled:
+            # No waiting, but the stats and recent-call window are still shared with other threads
+            with self._cond:
+                self._record(priority_class, 0.0, start)
+            return 0.0
+        
+        deadline = start + timeout if timeout is not None else None
+        
+        with self._cond:
+            ticket = (PRIORITIES[priority_class], next(self._sequence))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiters[0] == ticket and self.tokens >= 1:
+                        heapq.heappop(self._waiters)
+                        self.tokens -= 1
+                        break
+                    
+                    if deadline is not None and now >= deadline:
+                        raise TimeoutError(f"No Finnhub quota for {priority_class} request within {timeout}s")
+                    
+                    # Sleep until the next token is due; the head of the queue is woken by notify
+                    wait_for = max((1 - self.tokens) / self.rate, 0.001)
+                    if deadline is not None:
+                        wait_for = min(wait_for, deadline - now)
+                    self._cond.wait(wait_for)
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+            
+            waited = time.monotonic() - start
+            self._record(priority_class, waited, start + waited)
+            # Let the next caller in line re-check the bucket
+            self._cond.notify_all()
+        
+        return waited
+    
+    def _record(self, priority_class, waited, granted_at):
+        stats = self._stats[priority_class]
+        stats['granted'] += 1
+        stats['total_wait'] += waited
+        stats['max_wait'] = max(stats['max_wait'], waited)
+        self._recent.append(granted_at)
+        while self._recent and granted_at - self._recent[0] > 60:
+            self._recent.popleft()
+    
+    def submit(self, priority_class, func, *args, **kwargs):
+        """
+        Queue a call behind the quota and run it once a token is granted
+        
+        Returns:
+            tuple: (result of func, seconds spent queued)
+        """
+        waited = self.acquire(priority_class)
+        return func(*args, **kwargs), waited
+    
+    def record_throttled(self):
+        """Called when Finnhub answers 429 - drain the bucket so callers back off"""
+        with self._cond:
+            self._throttled += 1
+            if self.enabled:
+                self._refill(time.monotonic())
+                self.tokens = min(self.tokens, 0.0)
+    
+    def usage(self):
+        """Live quota usage and queueing statistics"""
+        with self._cond:
+            now = time.monotonic()
+            if self.enabled:
+                self._refill(now)
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            
+            queued = {name: 0 for name in PRIORITIES}
+            by_priority = {value: name for name, value in PRIORITIES.items()}
+            for priority, _ in self._waiters:
+                queued[by_priority[priority]] += 1
+            
+            return {
+                'enabled': self.enabled,
+                'calls_per_minute': self.calls_per_minute,
+                'burst': self.capacity,
+                'tokens_available': round(self.tokens, 2),
+                'calls_last_minute': len(self._recent),
+                'utilization': round(len(self._recent) / self.calls_per_minute, 3) if self.enabled else None,
+                'throttled_responses': self._throttled,
+                'queued': queued,
+                'classes': {
+                    name: {
+                        'granted': stats['granted'],
+                        'average_wait': round(stats['total_wait'] / stats['granted'], 4) if stats['granted'] else 0.0,
+                        'max_wait': round(stats['max_wait'], 4)
+                    }
+                    for name, stats in self._stats.items()
+                }
+            }
+
+# Global instance
+quota_scheduler = QuotaScheduler()
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from config import (
+    SENTIMENT_CACHE_SIZE, SENTIMENT_CACHE_TTL_SECONDS, SENTIMENT_CACHE_PATH,
+    SENTIMENT_CACHE_DISK_MAX_ROWS, SENTIMENT_CACHE_PURGE_EVERY
+)
+
+def normalize_text(text):
+    """Canonical form used for cache keys: NFC unicode with surrounding whitespace stripped"""
+    return unicodedata.normalize('NFC', text or '').strip()
+
+class ResultCache:
+    """
+    Content-addressed LRU cache with TTL and an optional SQLite disk tier
+    
+    The disk tier is purged of expired rows and trimmed to disk_max_rows (oldest
+    first) when it is opened and again every purge_every writes.
+    """
+    
+    def __init__(self, max_entries=SENTIMENT_CACHE_SIZE, ttl=SENTIMENT_CACHE_TTL_SECONDS, disk_path=SENTIMENT_CACHE_PATH,
+                 disk_max_rows=SENTIMENT_CACHE_DISK_MAX_ROWS, purge_every=SENTIMENT_CACHE_PURGE_EVERY):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path or None
+        self.disk_max_rows = disk_max_rows
+        self.purge_every = max(1, purge_every)
+        self._writes_since_purge = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # {key: (stored_at, value)}, least recently used first
+        self._counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'disk_purged': 0}
+        self._disk = None
+        
+        if self.disk_path:
+            self._disk = sqlite3.connect(self.disk_path, check_same_thread=False, isolation_level=None)
+            self._disk.execute('PRAGMA journal_mode=WAL')
+            self._disk.execute('PRAGMA synchronous=NORMAL')
+            self._disk.execute(
+                'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value TEXT NOT NULL)'
+            )
+            self._disk.execute('CREATE INDEX IF NOT EXISTS idx_results_stored_at ON results (stored_at)')
+            self.purge_disk()
+    
+    @staticmethod
+    def make_key(version, *parts):
+        """SHA-256 over the analyzer version and the normalized text parts"""
+        digest = hashlib.sha256(version.encode('utf-8'))
+        for part in parts:
+            digest.update(b'\x00')
+            digest.update(normalize_text(part).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def get(self, key):
+        """Cached value, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._counters['expirations'] += 1
+            
+            if self._disk is not None:
+                row = self._disk.execute('SELECT stored_at, value FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None and now - row[0] <= self.ttl:
+                    value = json.loads(row[1])
+                    self._store(key, value, row[0])
+                    self._counters['disk_hits'] += 1
+                    return value
+            
+            self._counters['misses'] += 1
+            return None
+    
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._store(key, value, now)
+            if self._disk is not None:
+                self._disk.execute(
+                    'INSERT OR REPLACE INTO results (key, stored_at, value) VALUES (?, ?, ?)',
+                    (key, now, json.dumps(value))
+                )
+                self._writes_since_purge += 1
+                if self._writes_since_purge >= self.purge_every:
+                    self._purge_disk()
+    
+    def _store(self, key, value, stored_at):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+    
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+    
+    def purge_disk(self):
+        """Delete expired rows from the disk tier, then the oldest beyond disk_max_rows; returns how many"""
+        if self._disk is None:
+            return 0
+        with self._lock:
+            return self._purge_disk()
+    
+    def _purge_disk(self):
+        self._writes_since_purge = 0
+        removed = self._disk.execute('DELETE FROM results WHERE stored_at < ?', (time.time() - self.ttl,)).rowcount
+        if self.disk_max_rows:
+            removed += self._disk.execute(
+                'DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY stored_at DESC, rowid DESC LIMIT -1 OFFSET ?)',
+                (self.disk_max_rows,)
+            ).rowcount
+        self._counters['disk_purged'] += removed
+        return removed
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.execute('DELETE FROM results')
+    
+    def stats(self):
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['disk_hits'] + self._counters['misses']
+            return dict(
+                self._counters,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                ttl_seconds=self.ttl,
+                disk_path=self.disk_path,
+                disk_max_rows=self.disk_max_rows,
+                hit_rate=round((self._counters['hits'] + self._counters['disk_hits']) / lookups, 3) if lookups else 0.0
+            )
+
+# Global instance shared by the sentiment analyzers
+sentiment_cache = ResultCache()
@@ -1,9 +1,13 @@
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import re
+from result_cache import sentiment_cache
 
 # Initialize analyzer once for better performance
 analyzer = SentimentIntensityAnalyzer()
 
+# Bump when scoring changes so cached results from older code are not reused
+ANALYZER_VERSION = 'vader-clean-1'
+
 def clean_text(text):
     """Clean and preprocess text for better sentiment analysis"""
     if not text:
@@ -44,8 +48,11 @@ def analyze_sentiment(text, stock_symbol=None):
             'stock_symbol': stock_symbol
         }
     
-    # Get sentiment scores
-    scores = analyzer.polarity_scores(cleaned_text)
+    # Get sentiment scores, memoized by text
+    scores = sentiment_cache.get_or_compute(
+        sentiment_cache.make_key(ANALYZER_VERSION, cleaned_text),
+        lambda: analyzer.polarity_scores(cleaned_text)
+    )
     
     # Determine label based on compound score
     compound = scores['compound']
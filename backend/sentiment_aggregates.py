@@ -0,0 +1,204 @@
+"""
+Running per-symbol sentiment aggregates
+
+Every analyzed article is folded into its symbol's totals once, when it is
+ingested: counts by label, an EWMA of the score, impact sums and high-impact
+counts, plus the same figures rolled up into fixed-width time buckets. A
+summary is then read straight off the totals, however much history there is.
+
+Aggregates are kept per analyzer, because the scorers are not comparable:
+'simple' holds /news results (VADER + TextBlob with impact scores) and
+'monitor' holds the monitor's VADER-only scores. Within an analyzer, articles
+are identified by (symbol, id) and counted once however often they are
+analyzed; articles without an id cannot be told apart and are not counted.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from config import AGGREGATE_EWMA_ALPHA, AGGREGATE_BUCKET_SECONDS, AGGREGATE_MAX_BUCKETS, AGGREGATE_SEEN_IDS
+
+LABELS = ('positive', 'negative', 'neutral')
+HIGH_IMPACT_LEVELS = ('HIGH', 'CRITICAL')
+ANALYZERS = ('simple', 'monitor')
+
+def _empty_totals():
+    return {
+        'count': 0,
+        'score_sum': 0.0,
+        'positive': 0,
+        'negative': 0,
+        'neutral': 0,
+        'impact_count': 0,
+        'impact_sum': 0.0,
+        'high_impact': 0
+    }
+
+def _add(totals, label, score, impact):
+    totals['count'] += 1
+    totals['score_sum'] += score
+    if label in LABELS:
+        totals[label] += 1
+    if impact is not None:
+        totals['impact_count'] += 1
+        totals['impact_sum'] += impact['impact_score']
+        if impact['impact_level'] in HIGH_IMPACT_LEVELS:
+            totals['high_impact'] += 1
+
+class SentimentAggregates:
+    """Per-symbol running totals, EWMA and time-bucketed rollups of analyzed articles"""
+
+    def __init__(self, alpha=AGGREGATE_EWMA_ALPHA, bucket_seconds=AGGREGATE_BUCKET_SECONDS,
+                 max_buckets=AGGREGATE_MAX_BUCKETS, seen_ids=AGGREGATE_SEEN_IDS):
+        self.alpha = alpha
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self.seen_ids = seen_ids
+        self._symbols = {}  # {(analyzer, symbol): aggregate}
+        self._lock = threading.Lock()
+        self.counters = {'ingested': 0, 'duplicates': 0, 'skipped': 0}
+
+    def _symbol(self, symbol, analyzer):
+        aggregate = self._symbols.get((analyzer, symbol))
+        if aggregate is None:
+            aggregate = self._symbols[(analyzer, symbol)] = {
+                'totals': _empty_totals(),
+                'ewma_score': None,
+                'buckets': OrderedDict(),
+                'seen': OrderedDict(),
+                'updated_at': None
+            }
+        return aggregate
+
+    def ingest(self, symbol, article_id, sentiment, impact=None, timestamp=None, analyzer='simple'):
+        """
+        Fold one analyzed article into its symbol's aggregates for an analyzer
+
+        The EWMA weights articles in the order they are ingested, so call this
+        oldest first (ingest_many sorts its batch by time).
+
+        Args:
+            analyzer (str): Which scorer produced the sentiment, one of ANALYZERS
+            sentiment (dict): Needs 'label' and 'score'
+            impact (dict): Optional, needs 'impact_score' and 'impact_level'
+            timestamp (float): Article time for the bucket; defaults to now
+
+        Returns:
+            bool: False if the article was already counted or has no id
+        """
+        if article_id is None:
+            with self._lock:
+                self.counters['skipped'] += 1
+            return False
+
+        label = str(sentiment.get('label', '')).lower()
+        score = sentiment.get('score', 0.0)
+        now = time.time()
+        timestamp = timestamp or now
+        bucket = int(timestamp // self.bucket_seconds) * self.bucket_seconds
+
+        with self._lock:
+            aggregate = self._symbol(symbol, analyzer)
+            seen = aggregate['seen']
+            if article_id in seen:
+                self.counters['duplicates'] += 1
+                return False
+            seen[article_id] = True
+            if len(seen) > self.seen_ids:
+                seen.popitem(last=False)
+
+            _add(aggregate['totals'], label, score, impact)
+            previous = aggregate['ewma_score']
+            aggregate['ewma_score'] = score if previous is None else self.alpha * score + (1 - self.alpha) * previous
+
+            buckets = aggregate['buckets']
+            if bucket in buckets or len(buckets) < self.max_buckets or bucket > next(iter(buckets)):
+                if bucket not in buckets:
+                    buckets[bucket] = _empty_totals()
+                    # Keep buckets sorted by start time and drop the oldest past the limit
+                    for key in sorted(buckets):
+                        buckets.move_to_end(key)
+                    while len(buckets) > self.max_buckets:
+                        buckets.popitem(last=False)
+                _add(buckets[bucket], label, score, impact)
+
+            aggregate['updated_at'] = now
+            self.counters['ingested'] += 1
+            return True
+
+    def ingest_many(self, symbol, items, results, analyzer='simple'):
+        """
+        Ingest (sentiment, impact) results for a list of articles; returns how many were new
+
+        News arrives newest first, so the batch is folded in oldest first to leave
+        the most recent article with the most weight in the EWMA.
+        """
+        now = time.time()
+        batch = sorted(zip(items, results), key=lambda pair: pair[0].get('datetime') or now)
+        return sum(
+            self.ingest(symbol, item.get('id'), sentiment, impact, item.get('datetime'), analyzer)
+            for item, (sentiment, impact) in batch
+        )
+
+    def summary(self, symbol, analyzer='simple'):
+        """Current aggregates for a symbol from one analyzer, in the shape of sentiment.get_sentiment_summary plus impact and buckets"""
+        with self._lock:
+            aggregate = self._symbols.get((analyzer, symbol))
+            if aggregate is None:
+                totals, ewma, buckets, updated_at = _empty_totals(), None, [], None
+            else:
+                totals = dict(aggregate['totals'])
+                ewma = aggregate['ewma_score']
+                buckets = [(start, dict(values)) for start, values in aggregate['buckets'].items()]
+                updated_at = aggregate['updated_at']
+
+        result = _summarize(totals)
+        result.update({
+            'symbol': symbol,
+            'analyzer': analyzer,
+            'ewma_score': round(ewma, 4) if ewma is not None else 0.0,
+            'updated_at': updated_at,
+            'bucket_seconds': self.bucket_seconds,
+            'buckets': [dict(_summarize(values), start=start) for start, values in buckets]
+        })
+        return result
+
+    def symbols(self):
+        with self._lock:
+            return sorted({symbol for _, symbol in self._symbols})
+
+    def reset(self, symbol=None):
+        """Forget one symbol's aggregates (for every analyzer), or everything"""
+        with self._lock:
+            if symbol is None:
+                self._symbols.clear()
+            else:
+                for key in [key for key in self._symbols if key[1] == symbol]:
+                    del self._symbols[key]
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, symbols=len({symbol for _, symbol in self._symbols}))
+
+def _summarize(totals):
+    count = totals['count']
+    if totals['positive'] > totals['negative']:
+        overall_sentiment = 'positive'
+    elif totals['negative'] > totals['positive']:
+        overall_sentiment = 'negative'
+    else:
+        overall_sentiment = 'neutral'
+    return {
+        'total_news': count,
+        'positive_count': totals['positive'],
+        'negative_count': totals['negative'],
+        'neutral_count': totals['neutral'],
+        'average_score': totals['score_sum'] / count if count else 0.0,
+        'overall_sentiment': overall_sentiment,
+        'impact_articles': totals['impact_count'],
+        'average_impact_score': round(totals['impact_sum'] / totals['impact_count'], 2) if totals['impact_count'] else 0.0,
+        'high_impact_articles': totals['high_impact']
+    }
+
+# Global instance
+sentiment_aggregates = SentimentAggregates()
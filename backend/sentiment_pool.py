@@ -0,0 +1,124 @@
+"""
+Process pool for CPU-bound sentiment scoring
+
+VADER and TextBlob are pure Python, so threads cannot score articles in
+parallel. SentimentPool spreads a batch over worker processes instead: each
+worker imports the analyzers once when it starts, articles go out in chunks,
+and results come back in input order. A batch is split evenly over the
+workers, in chunks of at least SENTIMENT_MIN_CHUNK_SIZE and at most
+SENTIMENT_CHUNK_SIZE articles, so the monitor's per-symbol batches spread out
+too. With SENTIMENT_WORKERS=0 (the default) everything runs in the calling
+process, exactly as before.
+"""
+
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from config import SENTIMENT_WORKERS, SENTIMENT_CHUNK_SIZE, SENTIMENT_MIN_CHUNK_SIZE
+
+def _init_worker():
+    # Building the analyzers is the expensive part; do it once per process
+    import simple_sentiment
+    import sentiment
+
+def _analyze_simple_chunk(args):
+    from simple_sentiment import simple_analyzer
+    symbol, items = args
+    return simple_analyzer.analyze_many(items, symbol)
+
+def _analyze_news_chunk(args):
+    from sentiment import analyze_news_sentiment
+    symbol, items = args
+    return [analyze_news_sentiment(item, symbol) for item in items]
+
+def _ping(_):
+    return True
+
+class SentimentPool:
+    """Chunked, order-preserving sentiment scoring across worker processes"""
+
+    def __init__(self, workers=SENTIMENT_WORKERS, chunk_size=SENTIMENT_CHUNK_SIZE, min_chunk_size=SENTIMENT_MIN_CHUNK_SIZE):
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self.min_chunk_size = max(1, min(min_chunk_size, self.chunk_size))
+        self._executor = None
+        self._lock = threading.Lock()
+        self.counters = {'batches': 0, 'chunks': 0, 'articles': 0, 'inline_batches': 0}
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def start(self):
+        """Start the workers and wait until each has loaded its analyzers"""
+        executor = self._get_executor()
+        if executor is not None:
+            list(executor.map(_ping, range(self.workers)))
+        return self
+
+    def _get_executor(self):
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers don't inherit the server's threads or sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+                print(f"⚙️ Sentiment pool started with {self.workers} worker(s)")
+            return self._executor
+
+    def analyze_many(self, news_items, stock_symbol):
+        """simple_analyzer.analyze_many, spread over the pool"""
+        return self._run(_analyze_simple_chunk, news_items, stock_symbol)
+
+    def analyze_news_many(self, news_items, stock_symbol):
+        """sentiment.analyze_news_sentiment for each article, spread over the pool"""
+        return self._run(_analyze_news_chunk, news_items, stock_symbol)
+
+    def _run(self, func, news_items, stock_symbol):
+        news_items = list(news_items)
+        # One share per worker, within the chunk size bounds
+        share = math.ceil(len(news_items) / max(1, self.workers))
+        size = min(self.chunk_size, max(self.min_chunk_size, share))
+        chunks = [
+            (stock_symbol, news_items[start:start + size])
+            for start in range(0, len(news_items), size)
+        ]
+
+        # One chunk isn't worth the round trip to a worker
+        executor = self._get_executor() if len(chunks) > 1 else None
+        with self._lock:
+            self.counters['batches'] += 1
+            self.counters['articles'] += len(news_items)
+            if executor is None:
+                self.counters['inline_batches'] += 1
+            else:
+                self.counters['chunks'] += len(chunks)
+
+        if executor is None:
+            return [result for chunk in chunks for result in func(chunk)]
+
+        # map yields chunk results in submission order
+        return [result for chunk_results in executor.map(func, chunks) for result in chunk_results]
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        return dict(
+            self.counters,
+            workers=self.workers,
+            chunk_size=self.chunk_size,
+            min_chunk_size=self.min_chunk_size,
+            running=self._executor is not None
+        )
+
+# Global instance
+sentiment_pool = SentimentPool()
@@ -1,6 +1,15 @@
 import math
-from datetime import datetime
+import time
+import numpy as np
 from simple_sentiment import simple_analyzer
+from static_factors import StaticFactorTable
+
+SECONDS_PER_DAY = 86400
+
+# Impact level and price direction names, indexed by the codes score_batch returns
+IMPACT_LEVELS = ('MINIMAL', 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+IMPACT_LEVEL_THRESHOLDS = (20, 40, 60, 80)
+PRICE_DIRECTIONS = ('STRONG_DOWN', 'DOWN', 'NEUTRAL', 'UP', 'STRONG_UP')
 
 class SimpleImpactCalculator:
     """Simple but effective impact calculator for news articles"""
@@ -17,6 +26,19 @@ class SimpleImpactCalculator:
             'market': 0.5,        # Medium impact
             'general': 0.3        # Low impact
         }
+        
+        # News types as integer ids for score_batch; the extra last id is any unknown type
+        self.news_types = list(self.news_type_weights)
+        self.news_type_weight_table = np.array(list(self.news_type_weights.values()) + [0.3])
+        
+        # Metadata-only factors, computed once per symbol and dropped when its metadata is refreshed
+        self.static_factors = StaticFactorTable(simple_analyzer.get_stock_metadata, self.calculate_static_factors)
+        simple_analyzer.add_metadata_listener(self.static_factors.invalidate)
+    
+    def news_type_id(self, news_type):
+        """Id of a news type in news_type_weight_table; unknown types share the last id"""
+        news_type = news_type.lower()
+        return self.news_types.index(news_type) if news_type in self.news_type_weights else len(self.news_types)
     
     def calculate_volatility_factor(self, metadata):
         """Calculate volatility factor based on stock characteristics"""
@@ -37,6 +59,20 @@ class SimpleImpactCalculator:
         volatility = (beta_factor + market_cap_factor + pe_factor) / 3
         return min(volatility, 2.0)
     
+    def calculate_static_factors(self, metadata):
+        """Everything in the impact calculation that depends only on the stock"""
+        return {
+            'volatility_factor': self.calculate_volatility_factor(metadata),
+            'beta': metadata.get('beta', 1.0),
+            'metadata': {
+                'market_cap': metadata.get('market_cap', 0),
+                'beta': metadata.get('beta', 1.0),
+                'sector': metadata.get('sector', 'Unknown'),
+                'industry': metadata.get('industry', 'Unknown'),
+                'pe_ratio': metadata.get('pe_ratio', 0)
+            }
+        }
+    
     def calculate_sentiment_amplifier(self, sentiment_analysis):
         """Calculate how sentiment amplifies the impact"""
         score = sentiment_analysis.get('score', 0)
@@ -47,30 +83,28 @@ class SimpleImpactCalculator:
         sentiment_strength = abs(score) * confidence * impact_multiplier
         return 1 + sentiment_strength
     
-    def calculate_time_factor(self, news_datetime):
+    def calculate_time_factor(self, news_datetime, as_of=None):
         """Calculate time factor - newer news has more impact"""
         if not news_datetime:
             return 1.0
         
         try:
-            news_time = datetime.fromtimestamp(news_datetime)
-            time_diff = datetime.now() - news_time
-            
-            # Time decay
-            if time_diff.days > 7:
-                return 0.4
-            elif time_diff.days > 3:
-                return 0.6
-            elif time_diff.days > 1:
-                return 0.8
-            elif time_diff.hours > 6:
-                return 0.9
-            else:
-                return 1.0
+            # Whole days between the article and as_of (now by default)
+            age_days = int(((time.time() if as_of is None else as_of) - news_datetime) // SECONDS_PER_DAY)
         except:
             return 1.0
+        
+        # Time decay
+        if age_days > 7:
+            return 0.4
+        elif age_days > 3:
+            return 0.6
+        elif age_days > 1:
+            return 0.8
+        else:
+            return 1.0
     
-    def predict_price_movement(self, sentiment_score, impact_score, metadata):
+    def predict_price_movement(self, sentiment_score, impact_score, beta):
         """Predict potential price movement"""
         # Base movement calculation
         base_movement = impact_score * 0.12  # 0.12% per impact point
@@ -93,7 +127,6 @@ class SimpleImpactCalculator:
             movement = base_movement * 0.4
         
         # Adjust based on stock characteristics
-        beta = metadata.get('beta', 1.0)
         movement *= beta
         
         return {
@@ -102,12 +135,12 @@ class SimpleImpactCalculator:
             'confidence': min(impact_score / 100, 0.85)
         }
     
-    def calculate_simple_impact(self, stock_symbol, news_item, sentiment_analysis):
+    def calculate_simple_impact(self, stock_symbol, news_item, sentiment_analysis, as_of=None):
         """
         Calculate simple but effective impact score for news articles
         """
-        # Get stock metadata
-        metadata = simple_analyzer.get_stock_metadata(stock_symbol)
+        # Per-stock factors from the precomputed table
+        factors = self.static_factors.get(stock_symbol)
         
         # Get news type from sentiment analysis
         news_type = sentiment_analysis.get('news_type', 'GENERAL').lower()
@@ -116,9 +149,9 @@ class SimpleImpactCalculator:
         base_weight = self.news_type_weights.get(news_type, 0.3)
         
         # Calculate various factors
-        volatility_factor = self.calculate_volatility_factor(metadata)
+        volatility_factor = factors['volatility_factor']
         sentiment_amplifier = self.calculate_sentiment_amplifier(sentiment_analysis)
-        time_factor = self.calculate_time_factor(news_item.get('datetime'))
+        time_factor = self.calculate_time_factor(news_item.get('datetime'), as_of)
         
         # Calculate final impact score (0-100)
         impact_score = (
@@ -148,7 +181,7 @@ class SimpleImpactCalculator:
         price_prediction = self.predict_price_movement(
             sentiment_analysis.get('score', 0),
             impact_score,
-            metadata
+            factors['beta']
         )
         
         return {
@@ -163,14 +196,120 @@ class SimpleImpactCalculator:
                 'time_factor': round(time_factor, 3)
             },
             'entities_found': sentiment_analysis.get('entities_found', {}),
-            'metadata': {
-                'market_cap': metadata.get('market_cap', 0),
-                'beta': metadata.get('beta', 1.0),
-                'sector': metadata.get('sector', 'Unknown'),
-                'industry': metadata.get('industry', 'Unknown'),
-                'pe_ratio': metadata.get('pe_ratio', 0)
-            }
+            'metadata': dict(factors['metadata'])
         }
 
+    def score_batch(self, scores, confidences, multipliers, news_type_ids, timestamps, factors, as_of=None):
+        """
+        Impact scores for many articles of one stock at once, as NumPy arrays
+        
+        Same arithmetic as calculate_simple_impact, element by element, so the
+        results are identical to the per-article path.
+        
+        Args:
+            scores, confidences, multipliers: Sentiment fields per article
+            news_type_ids (array): Ids from news_type_id
+            timestamps (array): Unix times; NaN (or 0) where an article has none
+            factors (dict): The stock's entry from static_factors
+            as_of (float or array): Time the article ages are measured against (defaults to now)
+        
+        Returns:
+            dict: Arrays keyed like the scalar result, with impact_level and
+                  direction as indexes into IMPACT_LEVELS and PRICE_DIRECTIONS
+        """
+        scores = np.asarray(scores, dtype=float)
+        confidences = np.asarray(confidences, dtype=float)
+        multipliers = np.asarray(multipliers, dtype=float)
+        timestamps = np.asarray(timestamps, dtype=float)
+        as_of = time.time() if as_of is None else np.asarray(as_of, dtype=float)
+        
+        base_weight = self.news_type_weight_table[np.asarray(news_type_ids, dtype=np.intp)]
+        volatility_factor = factors['volatility_factor']
+        sentiment_amplifier = 1 + np.abs(scores) * confidences * multipliers
+        
+        with np.errstate(invalid='ignore'):
+            age_days = np.floor_divide(as_of - timestamps, SECONDS_PER_DAY)
+        # Missing (NaN or 0) and unusable timestamps keep full weight, as in calculate_time_factor
+        dated = np.isfinite(age_days) & (timestamps != 0)
+        time_factor = np.select(
+            [dated & (age_days > 7), dated & (age_days > 3), dated & (age_days > 1)],
+            [0.4, 0.6, 0.8],
+            default=1.0
+        )
+        
+        impact_score = np.minimum(base_weight * volatility_factor * sentiment_amplifier * time_factor * 100, 100)
+        impact_level = np.searchsorted(IMPACT_LEVEL_THRESHOLDS, impact_score, side='right')
+        
+        direction = np.select(
+            [scores > 0.3, scores > 0.1, scores < -0.3, scores < -0.1],
+            [4, 3, 0, 1],
+            default=2
+        )
+        movement_weight = np.select([(direction == 0) | (direction == 4), direction == 2], [1.4, 0.4], default=1.0)
+        movement = impact_score * 0.12 * movement_weight * factors['beta']
+        
+        return {
+            'impact_score': impact_score,
+            'impact_level': impact_level,
+            'direction': direction,
+            'percentage': np.minimum(movement, 12.0),
+            'confidence': np.minimum(impact_score / 100, 0.85),
+            'base_weight': base_weight,
+            'volatility_factor': np.full(len(scores), volatility_factor),
+            'sentiment_amplifier': sentiment_amplifier,
+            'time_factor': time_factor
+        }
+    
+    def calculate_simple_impact_many(self, stock_symbol, news_items, sentiment_analyses, as_of=None):
+        """
+        calculate_simple_impact for a list of articles of one stock, scored with score_batch
+        
+        Returns:
+            list: One impact dict per article, equal to the per-article result
+        """
+        factors = self.static_factors.get(stock_symbol)
+        news_types = [sentiment.get('news_type', 'GENERAL').lower() for sentiment in sentiment_analyses]
+        timestamps = [item.get('datetime') for item in news_items]
+        
+        batch = self.score_batch(
+            [sentiment.get('score', 0) for sentiment in sentiment_analyses],
+            [sentiment.get('confidence', 0) for sentiment in sentiment_analyses],
+            [sentiment.get('impact_multiplier', 1.0) for sentiment in sentiment_analyses],
+            [self.news_type_id(news_type) for news_type in news_types],
+            [timestamp if isinstance(timestamp, (int, float)) and timestamp else np.nan for timestamp in timestamps],
+            factors,
+            as_of
+        )
+        # Back to Python floats so rounding matches the scalar path
+        columns = [batch[key].tolist() for key in (
+            'impact_score', 'impact_level', 'direction', 'percentage', 'confidence',
+            'base_weight', 'sentiment_amplifier', 'time_factor'
+        )]
+        volatility_factor = round(float(batch['volatility_factor'][0]), 3) if len(news_items) else 0.0
+        
+        results = []
+        for sentiment, news_type, impact_score, level, direction, percentage, confidence, base_weight, amplifier, time_factor in zip(
+            sentiment_analyses, news_types, *columns
+        ):
+            results.append({
+                'impact_score': round(impact_score, 2),
+                'impact_level': IMPACT_LEVELS[level],
+                'price_prediction': {
+                    'direction': PRICE_DIRECTIONS[direction],
+                    'percentage': percentage,
+                    'confidence': confidence
+                },
+                'news_type': news_type.upper(),
+                'factors': {
+                    'base_weight': round(base_weight, 3),
+                    'volatility_factor': volatility_factor,
+                    'sentiment_amplifier': round(amplifier, 3),
+                    'time_factor': round(time_factor, 3)
+                },
+                'entities_found': sentiment.get('entities_found', {}),
+                'metadata': dict(factors['metadata'])
+            })
+        return results
+
 # Global instance
 simple_impact_calculator = SimpleImpactCalculator() 
\ No newline at end of file
@@ -2,15 +2,33 @@ import requests
 import re
 from datetime import datetime
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
-from config import FINNHUB_API_KEY, ALPHA_VANTAGE_API_KEY
+from textblob.en.sentiments import PatternAnalyzer
+from config import FINNHUB_API_KEY, ALPHA_VANTAGE_API_KEY, SENTIMENT_SCORER
+from result_cache import sentiment_cache
+from keyword_matcher import KeywordMatcher, entity_matcher, keyword_table
+from fast_sentiment import FastLexiconScorer
+from metadata_cache import metadata_cache
+from metadata_table import metadata_table, default_metadata
+
+# Bump when scoring changes so cached results from older code are not reused
+ANALYZER_VERSION = 'simple-vader-textblob-1'
+FAST_ANALYZER_VERSION = 'simple-fast-lexicon-1'
 
 class SimpleSentimentAnalyzer:
     """Simple but effective sentiment analysis for news articles"""
     
-    def __init__(self):
+    def __init__(self, scorer=None):
         self.vader = SentimentIntensityAnalyzer()
-        self.metadata_cache = {}
+        self.textblob_analyzer = PatternAnalyzer()
+        
+        # 'fast' swaps the per-article VADER/TextBlob calls for one vectorized pass per batch
+        self.scorer = scorer or SENTIMENT_SCORER
+        self.fast_scorer = FastLexiconScorer(self.vader.lexicon) if self.scorer == 'fast' else None
+        self.analyzer_version = FAST_ANALYZER_VERSION if self.fast_scorer else ANALYZER_VERSION
+        # Shared with the impact calculators; this analyzer's entries live under the 'simple' source
+        self.metadata_cache = metadata_cache
+        self.metadata_cache.register('simple', self._load_stock_metadata, persist=False)
+        self.metadata_table = metadata_table
         
         # Keywords for impact analysis
         self.impact_keywords = {
@@ -22,117 +40,55 @@ class SimpleSentimentAnalyzer:
             'supply_chain': ['supplier', 'supply chain', 'shortage', 'inventory', 'production'],
             'market': ['market', 'industry', 'sector', 'trend', 'demand', 'supply']
         }
+        
+        # Compiled once; per-symbol entity matchers are cached in keyword_matcher
+        self.keyword_matcher = KeywordMatcher(
+            (keyword, news_type) for news_type, keywords in self.impact_keywords.items() for keyword in keywords
+        )
+        self.keyword_table = keyword_table(self.impact_keywords)
     
     def get_stock_metadata(self, symbol):
         """Get stock metadata for impact calculation"""
-        if symbol in self.metadata_cache:
-            return self.metadata_cache[symbol]
-        
-        # Enhanced mock metadata for better impact calculation
-        mock_metadata = {
-            'AAPL': {
-                'market_cap': 2500000000000,
-                'sector': 'Technology',
-                'industry': 'Consumer Electronics',
-                'competitors': ['MSFT', 'GOOGL', 'AMZN', 'Samsung'],
-                'suppliers': ['TSMC', 'Foxconn', 'Qualcomm'],
-                'raw_materials': ['Silicon', 'Aluminum', 'Rare Earth Metals'],
-                'beta': 1.2,
-                'pe_ratio': 25.5,
-                'revenue': 394328000000,
-                'profit_margin': 0.25
-            },
-            'MSFT': {
-                'market_cap': 2200000000000,
-                'sector': 'Technology',
-                'industry': 'Software',
-                'competitors': ['GOOGL', 'AAPL', 'AMZN', 'Oracle'],
-                'suppliers': ['Intel', 'AMD', 'NVIDIA'],
-                'raw_materials': ['Software Licenses', 'Cloud Infrastructure'],
-                'beta': 1.1,
-                'pe_ratio': 30.2,
-                'revenue': 198270000000,
-                'profit_margin': 0.35
-            },
-            'TSLA': {
-                'market_cap': 800000000000,
-                'sector': 'Consumer Discretionary',
-                'industry': 'Automotive',
-                'competitors': ['Ford', 'GM', 'Toyota', 'BMW'],
-                'suppliers': ['Panasonic', 'CATL', 'LG Chem'],
-                'raw_materials': ['Lithium', 'Nickel', 'Cobalt', 'Steel'],
-                'beta': 2.1,
-                'pe_ratio': 45.8,
-                'revenue': 81462000000,
-                'profit_margin': 0.15
-            },
-            'GOOGL': {
-                'market_cap': 1800000000000,
-                'sector': 'Technology',
-                'industry': 'Internet Services',
-                'competitors': ['MSFT', 'AAPL', 'AMZN', 'Meta'],
-                'suppliers': ['Cloud Providers', 'Data Centers'],
-                'raw_materials': ['Data', 'Computing Resources'],
-                'beta': 1.0,
-                'pe_ratio': 28.5,
-                'revenue': 307394000000,
-                'profit_margin': 0.22
-            },
-            'AMZN': {
-                'market_cap': 1600000000000,
-                'sector': 'Consumer Discretionary',
-                'industry': 'Internet Retail',
-                'competitors': ['WMT', 'TGT', 'COST', 'BABA'],
-                'suppliers': ['Various Retailers', 'Logistics Partners'],
-                'raw_materials': ['Consumer Goods', 'Packaging'],
-                'beta': 1.3,
-                'pe_ratio': 35.2,
-                'revenue': 514004000000,
-                'profit_margin': 0.08
-            },
-            'NVDA': {
-                'market_cap': 1200000000000,
-                'sector': 'Technology',
-                'industry': 'Semiconductors',
-                'competitors': ['AMD', 'INTC', 'TSMC'],
-                'suppliers': ['TSMC', 'Samsung', 'SK Hynix'],
-                'raw_materials': ['Silicon', 'Rare Earth Metals'],
-                'beta': 1.8,
-                'pe_ratio': 50.5,
-                'revenue': 26974000000,
-                'profit_margin': 0.40
-            }
-        }
-        
-        metadata = mock_metadata.get(symbol, {
-            'market_cap': 1000000000000,
-            'sector': 'Technology',
-            'industry': 'General',
-            'competitors': [],
-            'suppliers': [],
-            'raw_materials': [],
-            'beta': 1.0,
-            'pe_ratio': 20.0,
-            'revenue': 50000000000,
-            'profit_margin': 0.10
-        })
-        
-        self.metadata_cache[symbol] = metadata
-        return metadata
+        return self.metadata_cache.get('simple', symbol)
+    
+    def _load_stock_metadata(self, symbol):
+        """Metadata for one symbol, loaded on a cache miss"""
+        # Compiled from METADATA_SOURCE_PATH; symbols it does not list get the default
+        return self.metadata_table.get(symbol) or default_metadata()
+    
+    def add_metadata_listener(self, callback):
+        """Register callback(symbol) to hear about metadata refreshes (symbol is None for all)"""
+        def listener(source, symbol):
+            if source in ('simple', None):
+                callback(symbol)
+        self.metadata_cache.add_listener(listener)
+    
+    def refresh_metadata(self, symbol=None):
+        """Forget cached metadata for a symbol (or every symbol) so it is loaded again, and tell the listeners"""
+        self.metadata_cache.invalidate('simple', symbol)
     
     def classify_news_type(self, headline, summary):
         """Classify the type of news based on keywords"""
-        text = f"{headline} {summary}".lower()
-        
-        for news_type, keywords in self.impact_keywords.items():
-            if any(keyword in text for keyword in keywords):
+        return self._first_news_type(self.keyword_matcher.matches(f"{headline} {summary}"))
+    
+    def _first_news_type(self, matched_types):
+        # Table order decides between several matching types
+        for news_type in self.impact_keywords:
+            if news_type in matched_types:
                 return news_type
-        
         return 'general'
     
-    def extract_entities(self, text, metadata):
-        """Extract relevant entities from text"""
-        text_lower = text.lower()
+    def _match_entities(self, text, metadata):
+        """All entity and keyword hits in one pass, using the cached matcher for this metadata"""
+        matcher = entity_matcher(
+            tuple(metadata.get('competitors', [])),
+            tuple(metadata.get('suppliers', [])),
+            tuple(metadata.get('raw_materials', [])),
+            self.keyword_table
+        )
+        return matcher.matches(text)
+    
+    def _entities_from_matches(self, matched, metadata):
         entities = {
             'competitors': [],
             'suppliers': [],
@@ -140,51 +96,66 @@ class SimpleSentimentAnalyzer:
             'keywords': []
         }
         
-        # Check for competitors
-        for competitor in metadata.get('competitors', []):
-            if competitor.lower() in text_lower:
-                entities['competitors'].append(competitor)
-        
-        # Check for suppliers
-        for supplier in metadata.get('suppliers', []):
-            if supplier.lower() in text_lower:
-                entities['suppliers'].append(supplier)
-        
-        # Check for raw materials
-        for material in metadata.get('raw_materials', []):
-            if material.lower() in text_lower:
-                entities['raw_materials'].append(material)
+        # Report hits in metadata and keyword-table order
+        for group in ('competitors', 'suppliers', 'raw_materials'):
+            for name in metadata.get(group, []):
+                if (group, name) in matched:
+                    entities[group].append(name)
         
-        # Check for impact keywords
         for news_type, keywords in self.impact_keywords.items():
             for keyword in keywords:
-                if keyword in text_lower:
+                if ('keywords', news_type, keyword) in matched:
                     entities['keywords'].append(keyword)
         
         return entities
     
-    def analyze_sentiment_simple(self, news_item, stock_symbol):
-        """
-        Simple but effective sentiment analysis for news articles
-        """
-        headline = news_item.get('headline', '')
-        summary = news_item.get('summary', '')
-        full_text = f"{headline} {summary}".strip()
+    def extract_entities(self, text, metadata):
+        """Extract relevant entities from text"""
+        return self._entities_from_matches(self._match_entities(text, metadata), metadata)
+    
+    def polarity_scores(self, full_text):
+        """VADER and TextBlob scores for a text - the expensive part, so results are cached by content"""
+        return self.polarity_scores_many([full_text])[0]
+    
+    def polarity_scores_many(self, texts):
+        """polarity_scores for a list of texts; cache misses are scored together when the fast scorer is selected"""
+        keys = [sentiment_cache.make_key(self.analyzer_version, text) for text in texts]
+        scores = [sentiment_cache.get(key) for key in keys]
+        missing = [i for i, cached in enumerate(scores) if cached is None]
         
-        # Get stock metadata
-        metadata = self.get_stock_metadata(stock_symbol)
+        if self.fast_scorer is not None:
+            computed = self.fast_scorer.score_many([texts[i] for i in missing])
+        else:
+            computed = [self._exact_scores(texts[i]) for i in missing]
         
-        # Extract entities
-        entities = self.extract_entities(full_text, metadata)
+        for i, fresh in zip(missing, computed):
+            scores[i] = fresh
+            sentiment_cache.set(keys[i], fresh)
+        return scores
+    
+    def _exact_scores(self, full_text):
+        # TextBlob's pattern analyzer is called directly: same scores as
+        # TextBlob(text).sentiment without building a blob per article
+        textblob_sentiment = self.textblob_analyzer.analyze(full_text)
+        return {
+            'vader': self.vader.polarity_scores(full_text),
+            'textblob': [textblob_sentiment.polarity, textblob_sentiment.subjectivity]
+        }
+    
+    def _score_text(self, headline, summary, metadata, polarity=None):
+        """Everything in the analysis that depends only on the article text and stock metadata"""
+        full_text = f"{headline} {summary}".strip()
         
-        # Analyze with VADER
-        vader_scores = self.vader.polarity_scores(full_text)
-        vader_compound = vader_scores['compound']
+        # Extract entities and news-type keywords in a single scan
+        matched = self._match_entities(full_text, metadata)
+        entities = self._entities_from_matches(matched, metadata)
         
-        # Analyze with TextBlob
-        blob = TextBlob(full_text)
-        textblob_polarity = blob.sentiment.polarity
-        textblob_subjectivity = blob.sentiment.subjectivity
+        # VADER and TextBlob scores, memoized by text
+        if polarity is None:
+            polarity = self.polarity_scores(full_text)
+        vader_scores = polarity['vader']
+        vader_compound = vader_scores['compound']
+        textblob_polarity, textblob_subjectivity = polarity['textblob']
         
         # Combine scores (weighted average)
         combined_score = (vader_compound * 0.7) + (textblob_polarity * 0.3)
@@ -212,8 +183,8 @@ class SimpleSentimentAnalyzer:
         if entities['keywords']:
             impact_multiplier *= 1.1
         
-        # Classify news type
-        news_type = self.classify_news_type(headline, summary)
+        # Classify news type from the keyword hits found above
+        news_type = self._first_news_type({payload[1] for payload in matched if payload[0] == 'keywords'})
         
         return {
             'label': sentiment_label,
@@ -231,7 +202,16 @@ class SimpleSentimentAnalyzer:
             'textblob_scores': {
                 'polarity': round(textblob_polarity, 3),
                 'subjectivity': round(textblob_subjectivity, 3)
-            },
+            }
+        }
+    
+    def _build_result(self, scores, news_item, stock_symbol, headline, summary):
+        """Attach the per-article fields to a text score; nested dicts are copied so results never share state"""
+        result = dict(scores)
+        result['entities_found'] = {key: list(values) for key, values in scores['entities_found'].items()}
+        result['vader_scores'] = dict(scores['vader_scores'])
+        result['textblob_scores'] = dict(scores['textblob_scores'])
+        result.update({
             'stock_symbol': stock_symbol,
             'news_id': news_item.get('id'),
             'headline': headline,
@@ -239,7 +219,50 @@ class SimpleSentimentAnalyzer:
             'timestamp': news_item.get('datetime'),
             'source': news_item.get('source'),
             'url': news_item.get('url')
+        })
+        return result
+    
+    def analyze_sentiment_simple(self, news_item, stock_symbol):
+        """
+        Simple but effective sentiment analysis for news articles
+        """
+        headline = news_item.get('headline', '')
+        summary = news_item.get('summary', '')
+        
+        # Get stock metadata
+        metadata = self.get_stock_metadata(stock_symbol)
+        
+        scores = self._score_text(headline, summary, metadata)
+        return self._build_result(scores, news_item, stock_symbol, headline, summary)
+    
+    def analyze_many(self, news_items, stock_symbol):
+        """
+        Analyze a list of articles for one stock in a single pass
+        
+        Metadata is looked up once and identical headline/summary pairs are scored
+        once, so syndicated copies of the same story cost a dict lookup.
+        
+        Returns:
+            list: One result per article, in input order, identical to analyze_sentiment_simple
+        """
+        metadata = self.get_stock_metadata(stock_symbol)
+        
+        # Polarity for every distinct text up front, so the fast scorer sees the whole batch at once
+        pairs = list(dict.fromkeys((item.get('headline', ''), item.get('summary', '')) for item in news_items))
+        polarities = self.polarity_scores_many([f"{headline} {summary}".strip() for headline, summary in pairs])
+        scored = {
+            (headline, summary): self._score_text(headline, summary, metadata, polarity)
+            for (headline, summary), polarity in zip(pairs, polarities)
         }
+        
+        results = []
+        for news_item in news_items:
+            headline = news_item.get('headline', '')
+            summary = news_item.get('summary', '')
+            scores = scored[(headline, summary)]
+            results.append(self._build_result(scores, news_item, stock_symbol, headline, summary))
+        
+        return results
 
 # Global instance
 simple_analyzer = SimpleSentimentAnalyzer() 
\ No newline at end of file
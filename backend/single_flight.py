@@ -0,0 +1,139 @@
+import threading
+
+class _Call:
+    """One in-flight execution that later callers wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {}
+    
+    def _namespace(self, key):
+        return key[0] if isinstance(key, tuple) and key else str(key)
+    
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) unless a call for key is already running,
+        in which case wait for it and return its result (or raise its error)
+        
+        Args:
+            key: Hashable key; a tuple's first element names the counter namespace
+        
+        Returns:
+            The result of the single execution, shared by every caller
+        """
+        namespace = self._namespace(key)
+        
+        with self._lock:
+            stats = self._stats.setdefault(namespace, {'executed': 0, 'coalesced': 0})
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                stats['executed'] += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the key before waking waiters so the next caller runs fresh
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        
+        return call.result
+    
+    def do_many(self, keys, values, func):
+        """
+        Batch form of do(): func(values) is called once with only the values whose
+        keys are not already in flight, and must return their results in order
+        
+        A None key is never shared. Results come back in the order of keys; the
+        caller's own batch runs before it waits on anyone else's, so two batches
+        that overlap cannot deadlock.
+        """
+        leading = []   # (index, key, call) this caller executes
+        joined = []    # (index, call) executed by someone else
+        
+        with self._lock:
+            for index, key in enumerate(keys):
+                if key is None:
+                    leading.append((index, None, _Call()))
+                    continue
+                stats = self._stats.setdefault(self._namespace(key), {'executed': 0, 'coalesced': 0})
+                call = self._calls.get(key)
+                if call is not None:
+                    call.waiters += 1
+                    stats['coalesced'] += 1
+                    joined.append((index, call))
+                else:
+                    call = _Call()
+                    self._calls[key] = call
+                    stats['executed'] += 1
+                    leading.append((index, key, call))
+        
+        results = [None] * len(keys)
+        try:
+            if leading:
+                batch = func([values[index] for index, _, _ in leading])
+                for (index, _, call), result in zip(leading, batch):
+                    call.result = result
+                    results[index] = result
+        except Exception as e:
+            for _, _, call in leading:
+                call.error = e
+            raise
+        finally:
+            with self._lock:
+                for _, key, _ in leading:
+                    if key is not None:
+                        self._calls.pop(key, None)
+            for _, _, call in leading:
+                call.done.set()
+        
+        for index, call in joined:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            results[index] = call.result
+        
+        return results
+    
+    def stats(self):
+        """Executed vs coalesced counts per key namespace"""
+        with self._lock:
+            result = {}
+            for namespace, stats in self._stats.items():
+                total = stats['executed'] + stats['coalesced']
+                result[namespace] = {
+                    'executed': stats['executed'],
+                    'coalesced': stats['coalesced'],
+                    'coalesced_ratio': round(stats['coalesced'] / total, 3) if total else 0.0
+                }
+            result['in_flight'] = len(self._calls)
+            return result
+
+# Global instance
+single_flight = SingleFlight()
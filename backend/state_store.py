@@ -0,0 +1,278 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from config import STATE_BACKEND, STATE_DB_PATH, SEEN_NEWS_TTL_HOURS, PRICE_HISTORY_SIZE, SEEN_NEWS_DEDUP
+from news_dedup import RotatingBloomFilter
+
+class StateStore(ABC):
+    """Interface for the monitor's per-symbol price history and seen-news ids"""
+    
+    def __init__(self, ttl_hours=SEEN_NEWS_TTL_HOURS, history_size=PRICE_HISTORY_SIZE):
+        self.ttl_seconds = ttl_hours * 3600
+        self.history_size = history_size
+    
+    @abstractmethod
+    def get_last_price(self, symbol):
+        ...
+    
+    @abstractmethod
+    def record_price(self, symbol, price, timestamp=None):
+        ...
+    
+    @abstractmethod
+    def price_history(self, symbol, limit=None):
+        """Recorded (timestamp, price) pairs for a symbol, oldest first"""
+    
+    @abstractmethod
+    def has_seen(self, symbol, news_id):
+        ...
+    
+    @abstractmethod
+    def mark_seen(self, symbol, news_id, timestamp=None):
+        ...
+    
+    @abstractmethod
+    def purge_expired(self, now=None):
+        """Drop seen-news ids older than the TTL; returns how many were removed"""
+    
+    @abstractmethod
+    def stats(self):
+        ...
+    
+    def close(self):
+        pass
+
+class MemoryStateStore(StateStore):
+    """Process-local state; bounded by the price history size and the seen-news TTL"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._prices = {}  # {symbol: deque of (timestamp, price)}
+        self._seen = {}    # {symbol: OrderedDict of news_id -> seen_at}, oldest first
+    
+    def get_last_price(self, symbol):
+        with self._lock:
+            history = self._prices.get(symbol)
+            return history[-1][1] if history else None
+    
+    def record_price(self, symbol, price, timestamp=None):
+        with self._lock:
+            history = self._prices.get(symbol)
+            if history is None:
+                history = self._prices[symbol] = deque(maxlen=self.history_size)
+            history.append((timestamp or time.time(), price))
+    
+    def price_history(self, symbol, limit=None):
+        with self._lock:
+            history = list(self._prices.get(symbol, ()))
+        return history[-limit:] if limit else history
+    
+    def has_seen(self, symbol, news_id):
+        with self._lock:
+            seen = self._seen.get(symbol)
+            return seen is not None and str(news_id) in seen
+    
+    def mark_seen(self, symbol, news_id, timestamp=None):
+        with self._lock:
+            seen = self._seen.setdefault(symbol, OrderedDict())
+            key = str(news_id)
+            seen[key] = timestamp or time.time()
+            seen.move_to_end(key)
+    
+    def purge_expired(self, now=None):
+        cutoff = (now or time.time()) - self.ttl_seconds
+        removed = 0
+        with self._lock:
+            for symbol, seen in self._seen.items():
+                # Ids are kept in insertion order, so expired ones sit at the front
+                while seen:
+                    news_id, seen_at = next(iter(seen.items()))
+                    if seen_at >= cutoff:
+                        break
+                    seen.popitem(last=False)
+                    removed += 1
+        return removed
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'symbols': len(set(self._prices) | set(self._seen)),
+                'price_points': sum(len(history) for history in self._prices.values()),
+                'seen_news_ids': sum(len(seen) for seen in self._seen.values())
+            }
+
+class SQLiteStateStore(StateStore):
+    """Durable state in a WAL-mode SQLite file so restarts don't re-alert on old news"""
+    
+    def __init__(self, path=STATE_DB_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS price_history (
+                symbol TEXT NOT NULL,
+                ts REAL NOT NULL,
+                price REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_price_history_symbol_ts ON price_history (symbol, ts);
+            CREATE TABLE IF NOT EXISTS seen_news (
+                symbol TEXT NOT NULL,
+                news_id TEXT NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (symbol, news_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_seen_news_seen_at ON seen_news (seen_at);
+        ''')
+        
+        # Only the latest price per symbol is needed on the hot path; seen ids stay on disk
+        self._last_prices = {
+            symbol: price for symbol, price, _ in self._conn.execute(
+                'SELECT symbol, price, MAX(ts) FROM price_history GROUP BY symbol'
+            )
+        }
+    
+    def get_last_price(self, symbol):
+        with self._lock:
+            return self._last_prices.get(symbol)
+    
+    def record_price(self, symbol, price, timestamp=None):
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO price_history (symbol, ts, price) VALUES (?, ?, ?)',
+                (symbol, timestamp or time.time(), price)
+            )
+            self._last_prices[symbol] = price
+    
+    def price_history(self, symbol, limit=None):
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT ts, price FROM price_history WHERE symbol = ? ORDER BY ts DESC LIMIT ?',
+                (symbol, limit or self.history_size)
+            ).fetchall()
+        return rows[::-1]
+    
+    def has_seen(self, symbol, news_id):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM seen_news WHERE symbol = ? AND news_id = ?',
+                (symbol, str(news_id))
+            ).fetchone()
+        return row is not None
+    
+    def mark_seen(self, symbol, news_id, timestamp=None):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO seen_news (symbol, news_id, seen_at) VALUES (?, ?, ?)',
+                (symbol, str(news_id), timestamp or time.time())
+            )
+    
+    def seen_since(self, cutoff):
+        """(symbol, news_id, seen_at) rows recorded at or after cutoff"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT symbol, news_id, seen_at FROM seen_news WHERE seen_at >= ?', (cutoff,)
+            ).fetchall()
+    
+    def purge_expired(self, now=None):
+        cutoff = (now or time.time()) - self.ttl_seconds
+        with self._lock:
+            removed = self._conn.execute('DELETE FROM seen_news WHERE seen_at < ?', (cutoff,)).rowcount
+            # Trim each symbol's price history to the newest history_size points
+            for symbol in list(self._last_prices):
+                self._conn.execute(
+                    '''DELETE FROM price_history WHERE rowid IN (
+                        SELECT rowid FROM price_history WHERE symbol = ?
+                        ORDER BY ts DESC LIMIT -1 OFFSET ?
+                    )''',
+                    (symbol, self.history_size)
+                )
+        return removed
+    
+    def stats(self):
+        with self._lock:
+            price_points = self._conn.execute('SELECT COUNT(*) FROM price_history').fetchone()[0]
+            seen_ids = self._conn.execute('SELECT COUNT(*) FROM seen_news').fetchone()[0]
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'symbols': len(self._last_prices),
+            'price_points': price_points,
+            'seen_news_ids': seen_ids
+        }
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class BloomDedupStateStore(StateStore):
+    """
+    Wraps another store and answers seen-news checks from rotating Bloom filters
+    
+    Prices go to the wrapped store. Seen ids only live in the filters, unless the
+    wrapped store is SQLite: then they are still written to disk for durability
+    and the filters are warmed from the recent rows at startup.
+    """
+    
+    def __init__(self, inner, bloom=None):
+        super().__init__(ttl_hours=inner.ttl_seconds / 3600, history_size=inner.history_size)
+        self.inner = inner
+        self.bloom = bloom or RotatingBloomFilter(window_seconds=self.ttl_seconds)
+        self.persist_seen = isinstance(inner, SQLiteStateStore)
+        
+        if self.persist_seen:
+            for symbol, news_id, seen_at in inner.seen_since(time.time() - self.ttl_seconds):
+                self.bloom.add(f'{symbol}:{news_id}', seen_at)
+    
+    def get_last_price(self, symbol):
+        return self.inner.get_last_price(symbol)
+    
+    def record_price(self, symbol, price, timestamp=None):
+        self.inner.record_price(symbol, price, timestamp)
+    
+    def price_history(self, symbol, limit=None):
+        return self.inner.price_history(symbol, limit)
+    
+    def has_seen(self, symbol, news_id):
+        return f'{symbol}:{news_id}' in self.bloom
+    
+    def mark_seen(self, symbol, news_id, timestamp=None):
+        self.bloom.add(f'{symbol}:{news_id}', timestamp)
+        if self.persist_seen:
+            self.inner.mark_seen(symbol, news_id, timestamp)
+    
+    def purge_expired(self, now=None):
+        removed = self.bloom.purge_expired(now)
+        if self.persist_seen:
+            self.inner.purge_expired(now)
+        return removed
+    
+    def stats(self):
+        stats = self.inner.stats()
+        stats['dedup'] = dict(self.bloom.stats(), method='bloom')
+        return stats
+    
+    def close(self):
+        self.inner.close()
+
+def create_state_store(backend=STATE_BACKEND, path=STATE_DB_PATH, dedup=SEEN_NEWS_DEDUP):
+    """Build the configured state backend ('memory' or 'sqlite') and seen-news dedup ('exact' or 'bloom')"""
+    if backend == 'sqlite':
+        store = SQLiteStateStore(path=path)
+    else:
+        if backend != 'memory':
+            print(f"Unknown STATE_BACKEND '{backend}', using in-memory state")
+        store = MemoryStateStore()
+    
+    if dedup == 'bloom':
+        return BloomDedupStateStore(store)
+    return store
+
+# Global instance
+state_store = create_state_store()
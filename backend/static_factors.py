@@ -0,0 +1,53 @@
+"""
+Per-symbol impact factors that depend only on stock metadata
+
+Volatility, liquidity and sector factors used to be recomputed (with their
+log10 calls) for every article. StaticFactorTable computes them once per
+symbol and hands the same entry back until the symbol's metadata changes:
+either the metadata source returns a different dict, or invalidate() is
+called when metadata is refreshed in place.
+"""
+
+import threading
+
+class StaticFactorTable:
+    """Lazily filled {symbol: factors} table keyed to the metadata it was computed from"""
+
+    def __init__(self, load_metadata, compute):
+        """
+        Args:
+            load_metadata: symbol -> metadata dict (normally a cached lookup)
+            compute: metadata dict -> factors dict
+        """
+        self.load_metadata = load_metadata
+        self.compute = compute
+        self._table = {}  # {symbol: (metadata, factors)}
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'computed': 0, 'invalidations': 0}
+
+    def get(self, symbol):
+        """Factors for a symbol, recomputed only when its metadata is new"""
+        metadata = self.load_metadata(symbol)
+        entry = self._table.get(symbol)
+        if entry is not None and entry[0] is metadata:
+            self.counters['hits'] += 1
+            return entry[1]
+
+        factors = self.compute(metadata)
+        with self._lock:
+            self._table[symbol] = (metadata, factors)
+            self.counters['computed'] += 1
+        return factors
+
+    def invalidate(self, symbol=None):
+        """Drop one symbol's factors, or all of them when symbol is None"""
+        with self._lock:
+            if symbol is None:
+                self._table.clear()
+            else:
+                self._table.pop(symbol, None)
+            self.counters['invalidations'] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, symbols=len(self._table))
@@ -1,9 +1,22 @@
-import requests
 import os
 import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-from config import FINNHUB_API_KEY, ALPHA_VANTAGE_API_KEY
+from config import (
+    FINNHUB_API_KEY, ALPHA_VANTAGE_API_KEY, MONITOR_MAX_WORKERS, MONITOR_DEADLINE_SECONDS,
+    PRICE_STREAM_ENABLED
+)
+from finnhub_client import finnhub_client
+from news_cursor import news_cursors
+from state_store import state_store
+from price_stream import price_stream
 from sentiment import analyze_news_sentiment, get_sentiment_summary
+from sentiment_pool import sentiment_pool
+from sentiment_aggregates import sentiment_aggregates
+from article_archive import article_archive
 from email_utils import send_email
 
 # Example portfolio
@@ -13,9 +26,11 @@ PORTFOLIO = [
 
 PRICE_DROP_THRESHOLD = 0.02  # 2%
 
-# Track last prices and processed news for each stock individually
-last_prices = {}
-processed_news = {}  # {stock_symbol: set of news_ids}
+# Recent price-drop alerts raised from streamed trades
+stream_alerts = deque(maxlen=100)
+
+# Last prices and processed news for each stock live in the configured state
+# backend (see state_store.py) so they survive restarts and stay bounded
 
 def fetch_price(symbol):
     if not FINNHUB_API_KEY or FINNHUB_API_KEY == 'demo':
@@ -23,8 +38,7 @@ def fetch_price(symbol):
         return 150.0 + hash(symbol) % 100
     
     try:
-        url = f'https://finnhub.io/api/v1/quote?symbol={symbol}&token={FINNHUB_API_KEY}'
-        r = requests.get(url, timeout=10)
+        r = finnhub_client.quote(symbol)
         if r.status_code == 200:
             data = r.json()
             return data.get('c')  # current price
@@ -36,6 +50,7 @@ def fetch_price(symbol):
         return None
 
 def fetch_news(symbol):
+    """Recent news for a symbol, newest first, fetched incrementally from Finnhub"""
     if not FINNHUB_API_KEY or FINNHUB_API_KEY == 'demo':
         # Return mock news if no API key - different for each stock
         mock_news = [
@@ -66,136 +81,320 @@ def fetch_news(symbol):
         ]
         return mock_news
     
+    # Only ask for the delta since the last successful poll; the cursor store
+    # merges it into the symbol's buffer of recent articles
+    start, end = news_cursors.window(symbol)
     try:
-        url = f'https://finnhub.io/api/v1/company-news?symbol={symbol}&from=2023-01-01&to=2025-12-31&token={FINNHUB_API_KEY}'
-        r = requests.get(url, timeout=10)
+        r = finnhub_client.company_news(symbol, start, end)
         if r.status_code == 200:
-            return r.json()
+            _, recent = news_cursors.merge(symbol, r.json())
+            return recent
         else:
             print(f"Error fetching news for {symbol}: {r.status_code}")
-            return []
+            return news_cursors.recent(symbol)
     except Exception as e:
         print(f"Exception fetching news for {symbol}: {e}")
-        return []
+        return news_cursors.recent(symbol)
 
-def monitor_stocks(portfolio=PORTFOLIO):
-    alerts = []
-    stock_results = {}
+def check_price_drop(symbol, price):
+    """Alert message if price fell by PRICE_DROP_THRESHOLD or more since the last recorded price"""
+    last = state_store.get_last_price(symbol)
+    if last:
+        change = (price - last) / last
+        if change <= -PRICE_DROP_THRESHOLD:
+            return f'{symbol} dropped by {change*100:.2f}% (from ${last:.2f} to ${price:.2f})'
+    return None
+
+def send_price_alert(symbol, msg):
+    try:
+        send_email(f'Price Alert: {symbol}', msg)
+    except Exception as e:
+        print(f"Failed to send email alert: {e}")
+
+def on_streamed_price(symbol, price, trade_time):
+    """Price-drop check for every streamed trade; runs on the stream thread so it must stay cheap"""
+    msg = check_price_drop(symbol, price)
+    if msg is None:
+        return
+    # Re-baseline so one drop doesn't alert again on every following trade
+    state_store.record_price(symbol, price)
+    stream_alerts.append({'symbol': symbol, 'message': msg, 'trade_time': trade_time})
+    print(f"🚨 {msg}")
+    threading.Thread(target=send_price_alert, args=(symbol, msg), daemon=True).start()
+
+def start_price_stream(portfolio=PORTFOLIO):
+    """Subscribe the portfolio to streamed trades if PRICE_STREAM_ENABLED is set"""
+    if not PRICE_STREAM_ENABLED:
+        return False
+    price_stream.add_listener(on_streamed_price)
+    return price_stream.start(portfolio)
+
+def monitor_symbol(symbol, may_commit=None):
+    """
+    Run the price and news checks for a single stock
     
-    # Check if we have proper API keys
-    if not FINNHUB_API_KEY or FINNHUB_API_KEY == 'demo':
-        alerts.append("Warning: Using demo API key. Get real API keys for live data.")
+    Nothing is recorded and no alert is sent until the checks are done; then
+    may_commit (if given) decides whether the run still counts. A run abandoned
+    there leaves its news unseen, so the next cycle picks it up again.
     
-    for symbol in portfolio:
-        try:
-            print(f"\n📊 Monitoring {symbol}...")
-            
-            # Initialize tracking for this stock if not exists
-            if symbol not in processed_news:
-                processed_news[symbol] = set()
-            
-            # Price check
+    Args:
+        symbol (str): Stock symbol
+        may_commit (callable): Returns False once the result would be discarded
+    
+    Returns:
+        tuple: (alerts, result) where result is None if monitoring failed or was abandoned
+    """
+    alerts = []
+    
+    try:
+        print(f"\n📊 Monitoring {symbol}...")
+        
+        # Price check - prefer a fresh streamed trade over a REST quote
+        price = price_stream.latest_price(symbol) if price_stream.running else None
+        if price is None:
             price = fetch_price(symbol)
-            if price is not None:
-                last = last_prices.get(symbol)
-                if last:
-                    change = (price - last) / last
-                    if change <= -PRICE_DROP_THRESHOLD:
-                        msg = f'{symbol} dropped by {change*100:.2f}% (from ${last:.2f} to ${price:.2f})'
-                        try:
-                            send_email(f'Price Alert: {symbol}', msg)
-                        except Exception as e:
-                            print(f"Failed to send email alert: {e}")
-                        alerts.append(msg)
-                last_prices[symbol] = price
-                print(f"  💰 {symbol} price: ${price:.2f}")
+        
+        # News check - analyze each news item individually
+        news = fetch_news(symbol)
+        stock_articles = []
+        
+        print(f"  📰 Found {len(news)} news articles for {symbol}")
+        
+        unseen = []
+        unseen_ids = set()
+        for item in news[:10]:  # Check more news items
+            news_id = item.get('id')
             
-            # News check - analyze each news item individually
-            news = fetch_news(symbol)
-            stock_articles = []
+            # Skip if we've already processed this news
+            if news_id in unseen_ids or state_store.has_seen(symbol, news_id):
+                continue
+            unseen_ids.add(news_id)
+            unseen.append(item)
+        
+        # Score the new articles as one batch, across the worker pool when SENTIMENT_WORKERS is set
+        sentiments = sentiment_pool.analyze_news_many(unseen, symbol)
+        
+        if may_commit is not None and not may_commit(symbol):
+            print(f"  ⏱️ {symbol}: finished after the deadline, leaving its news for the next cycle")
+            return alerts, None
+        
+        if price is not None:
+            msg = check_price_drop(symbol, price)
+            if msg:
+                send_price_alert(symbol, msg)
+                alerts.append(msg)
+            state_store.record_price(symbol, price)
+            print(f"  💰 {symbol} price: ${price:.2f}")
+        
+        # Mark as processed
+        for item in unseen:
+            state_store.mark_seen(symbol, item.get('id'))
+        results = [(sentiment, None) for sentiment in sentiments]
+        sentiment_aggregates.ingest_many(symbol, unseen, results, analyzer='monitor')
+        article_archive.record(symbol, 'monitor', unseen, results)
+        
+        for item, sentiment in zip(unseen, sentiments):
+            # Create individual article object
+            article = {
+                'id': item.get('id'),
+                'headline': item.get('headline'),
+                'summary': item.get('summary'),
+                'source': item.get('source'),
+                'url': item.get('url'),
+                'datetime': item.get('datetime'),
+                'sentiment_analysis': {
+                    'label': sentiment['label'],
+                    'score': sentiment['score'],
+                    'confidence': sentiment['confidence'],
+                    'positive': sentiment['positive'],
+                    'negative': sentiment['negative'],
+                    'neutral': sentiment['neutral']
+                }
+            }
             
-            print(f"  📰 Found {len(news)} news articles for {symbol}")
+            stock_articles.append(article)
             
-            for item in news[:10]:  # Check more news items
-                news_id = item.get('id')
-                
-                # Skip if we've already processed this news
-                if news_id in processed_news[symbol]:
-                    continue
-                
-                # Mark as processed
-                processed_news[symbol].add(news_id)
-                
-                # Analyze sentiment for this specific news item
-                sentiment = analyze_news_sentiment(item, symbol)
-                
-                # Create individual article object
-                article = {
-                    'id': item.get('id'),
-                    'headline': item.get('headline'),
-                    'summary': item.get('summary'),
-                    'source': item.get('source'),
-                    'url': item.get('url'),
-                    'datetime': item.get('datetime'),
-                    'sentiment_analysis': {
-                        'label': sentiment['label'],
-                        'score': sentiment['score'],
-                        'confidence': sentiment['confidence'],
-                        'positive': sentiment['positive'],
-                        'negative': sentiment['negative'],
-                        'neutral': sentiment['neutral']
-                    }
-                }
-                
-                stock_articles.append(article)
-                
-                print(f"    📄 News: {item.get('headline', 'No headline')[:50]}...")
-                print(f"       Sentiment: {sentiment['label']} (score: {sentiment['score']:.3f})")
-                
-                # Alert for negative sentiment
-                if sentiment['label'] == 'negative' and sentiment['confidence'] > 0.1:
-                    msg = f"""🚨 Negative News Alert for {symbol}:
+            print(f"    📄 News: {item.get('headline', 'No headline')[:50]}...")
+            print(f"       Sentiment: {sentiment['label']} (score: {sentiment['score']:.3f})")
+            
+            # Alert for negative sentiment
+            if sentiment['label'] == 'negative' and sentiment['confidence'] > 0.1:
+                msg = f"""🚨 Negative News Alert for {symbol}:
 📰 Headline: {item.get('headline', 'No headline')}
 📝 Summary: {item.get('summary', 'No summary')}
 😞 Sentiment: {sentiment['label']} (confidence: {sentiment['confidence']:.3f})
 📊 Score: {sentiment['score']:.3f}
 🔗 Source: {item.get('source', 'Unknown')}
 ⏰ Time: {datetime.fromtimestamp(item.get('datetime', 0)).strftime('%Y-%m-%d %H:%M:%S') if item.get('datetime') else 'Unknown'}"""
-                    
-                    try:
-                        send_email(f'Negative News Alert: {symbol}', msg)
-                    except Exception as e:
-                        print(f"Failed to send email alert: {e}")
-                    alerts.append(f"Negative news for {symbol}: {item.get('headline', 'No headline')}")
-            
-            # Store results for this stock
-            stock_results[symbol] = {
-                'price': price,
-                'articles': stock_articles,
-                'total_articles': len(news),
-                'analyzed_articles': len(stock_articles)
-            }
-            
-            if stock_articles:
-                print(f"  📊 {symbol}: Analyzed {len(stock_articles)} new articles")
-            
-        except Exception as e:
-            print(f"Error monitoring {symbol}: {e}")
-            alerts.append(f"Error monitoring {symbol}: {str(e)}")
+                
+                try:
+                    send_email(f'Negative News Alert: {symbol}', msg)
+                except Exception as e:
+                    print(f"Failed to send email alert: {e}")
+                alerts.append(f"Negative news for {symbol}: {item.get('headline', 'No headline')}")
+        
+        if stock_articles:
+            print(f"  📊 {symbol}: Analyzed {len(stock_articles)} new articles")
+        
+        # Results for this stock
+        return alerts, {
+            'price': price,
+            'articles': stock_articles,
+            'total_articles': len(news),
+            'analyzed_articles': len(stock_articles)
+        }
+        
+    except Exception as e:
+        print(f"Error monitoring {symbol}: {e}")
+        alerts.append(f"Error monitoring {symbol}: {str(e)}")
+        return alerts, None
+
+def format_results(stock_results):
+    """Build the detailed results message appended to the alerts list"""
+    results_msg = "\n📊 Detailed Monitoring Results:\n"
+    for symbol, data in stock_results.items():
+        results_msg += f"\n  {symbol}:\n"
+        if data['price'] is not None:
+            results_msg += f"    Price: ${data['price']:.2f}\n"
+        else:
+            results_msg += "    Price: unavailable\n"
+        results_msg += f"    Articles: {data['analyzed_articles']}/{data['total_articles']}\n"
+        
+        # Show individual article sentiments
+        for article in data['articles']:
+            sentiment = article['sentiment_analysis']
+            results_msg += f"    📄 {(article['headline'] or '')[:40]}... - {sentiment['label'].upper()} ({sentiment['score']:.3f})\n"
+    
+    return results_msg
+
+def monitor_stocks(portfolio=PORTFOLIO):
+    alerts = []
+    stock_results = {}
+    
+    # Check if we have proper API keys
+    if not FINNHUB_API_KEY or FINNHUB_API_KEY == 'demo':
+        alerts.append("Warning: Using demo API key. Get real API keys for live data.")
+    
+    # Age out seen-news ids past their TTL so state stays bounded
+    state_store.purge_expired()
+    
+    for symbol in portfolio:
+        symbol_alerts, result = monitor_symbol(symbol)
+        alerts.extend(symbol_alerts)
+        if result is not None:
+            stock_results[symbol] = result
     
     # Add detailed results to alerts
     if stock_results:
-        results_msg = "\n📊 Detailed Monitoring Results:\n"
-        for symbol, data in stock_results.items():
-            results_msg += f"\n  {symbol}:\n"
-            results_msg += f"    Price: ${data['price']:.2f}\n"
-            results_msg += f"    Articles: {data['analyzed_articles']}/{data['total_articles']}\n"
-            
-            # Show individual article sentiments
-            for article in data['articles']:
-                sentiment = article['sentiment_analysis']
-                results_msg += f"    📄 {article['headline'][:40]}... - {sentiment['label'].upper()} ({sentiment['score']:.3f})\n"
-        
-        alerts.append(results_msg)
+        alerts.append(format_results(stock_results))
+    
+    return alerts
+
+def monitor_stocks_concurrent(portfolio=PORTFOLIO, max_workers=None, deadline=None):
+    """
+    Monitor all stocks in parallel with a concurrency limit and an overall deadline
+    
+    Each symbol runs monitor_symbol on a worker thread, so wall-clock time follows
+    the slowest symbol instead of the sum over the portfolio. Symbols that have not
+    reached their commit point when the deadline expires are reported as timed out
+    and left out of the results; if they finish later they record nothing and send
+    no alerts, so their news is still unseen on the next run.
+    
+    Args:
+        portfolio (list): Stock symbols to monitor
+        max_workers (int): Maximum symbols monitored at once (defaults to MONITOR_MAX_WORKERS)
+        deadline (float): Seconds allowed for the whole run (defaults to MONITOR_DEADLINE_SECONDS)
+    
+    Returns:
+        dict: Alerts, per-symbol results, per-symbol timings and deadline status
+    """
+    max_workers = max_workers or MONITOR_MAX_WORKERS
+    deadline = deadline if deadline is not None else MONITOR_DEADLINE_SECONDS
+    portfolio = list(portfolio)
+    
+    alerts = []
+    stock_results = {}
+    timings = {}
+    started_at = {}
+    run_start = time.monotonic()
+    
+    # Symbols that pass the commit point before the deadline are reported even if
+    # they finish just after it; later ones record nothing and alert no one
+    commit_lock = threading.Lock()
+    committed = set()
+    expired = False
+    
+    def may_commit(symbol):
+        with commit_lock:
+            if expired:
+                return False
+            committed.add(symbol)
+            return True
+    
+    if not FINNHUB_API_KEY or FINNHUB_API_KEY == 'demo':
+        alerts.append("Warning: Using demo API key. Get real API keys for live data.")
+    
+    state_store.purge_expired()
+    
+    def run_symbol(symbol):
+        started_at[symbol] = time.monotonic()
+        symbol_alerts, result = monitor_symbol(symbol, may_commit)
+        return symbol_alerts, result, time.monotonic() - started_at[symbol]
+    
+    futures = {}
+    if portfolio:
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(portfolio))),
+            thread_name_prefix='monitor'
+        )
+        futures = {symbol: executor.submit(run_symbol, symbol) for symbol in portfolio}
+        done, _ = wait(futures.values(), timeout=deadline)
+        with commit_lock:
+            expired = True
+            committing = [futures[symbol] for symbol in committed if futures[symbol] not in done]
+        # Symbols already past the commit point only have their alerts left to send
+        done |= wait(committing).done
+        # Don't block on stragglers; queued symbols are cancelled outright
+        executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        done = set()
+    
+    now = time.monotonic()
+    timed_out = []
+    
+    # Collect in portfolio order so the alerts read the same as the serial run
+    for symbol in portfolio:
+        future = futures[symbol]
+        if future in done:
+            symbol_alerts, result, elapsed = future.result()
+            alerts.extend(symbol_alerts)
+            if result is not None:
+                stock_results[symbol] = result
+            timings[symbol] = {
+                'status': 'ok' if result is not None else 'error',
+                'seconds': round(elapsed, 3)
+            }
+        else:
+            timed_out.append(symbol)
+            started = started_at.get(symbol)
+            timings[symbol] = {
+                'status': 'timeout' if started is not None else 'not_started',
+                'seconds': round(now - started, 3) if started is not None else 0.0
+            }
+    
+    if timed_out:
+        alerts.append(f"Monitoring deadline of {deadline:.1f}s exceeded; skipped {', '.join(timed_out)}")
+    
+    if stock_results:
+        alerts.append(format_results(stock_results))
     
-    return alerts 
\ No newline at end of file
+    return {
+        'alerts': alerts,
+        'results': stock_results,
+        'timings': timings,
+        'timed_out': timed_out,
+        'completed': len(portfolio) - len(timed_out),
+        'total': len(portfolio),
+        'elapsed_seconds': round(now - run_start, 3),
+        'deadline_seconds': deadline
+    }
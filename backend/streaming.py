@@ -0,0 +1,81 @@
+"""
+Streaming responses for the analysis endpoints
+
+The /news and /advanced stream variants send each article as soon as it is
+scored instead of building the whole list first. Records are written as
+NDJSON (one JSON object per line) or as Server-Sent Events, and the stream
+ends with a summary record built from running totals, so nothing grows with
+the number of articles.
+"""
+
+import json
+from fastapi.responses import StreamingResponse
+
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream'
+}
+
+def encode_record(record, fmt):
+    """One record as an NDJSON line or an SSE event named after its type"""
+    payload = json.dumps(record, default=str)
+    if fmt == 'sse':
+        return f"event: {record.get('type', 'message')}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+def analyzed_in_chunks(symbol, items, analyze, chunk_size):
+    """Yield (item, sentiment, impact) for each article, scoring chunk_size articles at a time"""
+    chunk_size = max(1, chunk_size)
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        for item, (sentiment, impact) in zip(chunk, analyze(symbol, chunk)):
+            yield item, sentiment, impact
+
+def stream_response(records, fmt):
+    """StreamingResponse that encodes records as they are produced; failures end the stream with an error record"""
+    def body():
+        try:
+            for record in records:
+                yield encode_record(record, fmt)
+        except Exception as e:
+            print(f"❌ Error while streaming analysis: {e}")
+            yield encode_record({'type': 'error', 'detail': str(e)}, fmt)
+
+    # Keep proxies from buffering the stream
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+class RunningSummary:
+    """Overall sentiment and impact for a list of analyses, kept as running totals"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_impact = 0.0
+        self.total_sentiment = 0.0
+        self.high_impact = 0
+
+    def add(self, sentiment, impact):
+        self.count += 1
+        self.total_impact += impact['impact_score']
+        self.total_sentiment += sentiment['score']
+        if impact['impact_level'] in ('HIGH', 'CRITICAL'):
+            self.high_impact += 1
+
+    def as_dict(self):
+        avg_impact = self.total_impact / self.count if self.count else 0
+        avg_sentiment = self.total_sentiment / self.count if self.count else 0
+
+        if avg_sentiment > 0.1:
+            overall_sentiment = 'POSITIVE'
+        elif avg_sentiment < -0.1:
+            overall_sentiment = 'NEGATIVE'
+        else:
+            overall_sentiment = 'NEUTRAL'
+
+        return {
+            'sentiment': overall_sentiment,
+            'average_sentiment_score': round(avg_sentiment, 3),
+            'average_impact_score': round(avg_impact, 2),
+            'total_articles_analyzed': self.count,
+            'high_impact_articles': self.high_impact
+        }
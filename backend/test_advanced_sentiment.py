@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the transformer inference engine
+Builds a tiny random BERT classifier in a temp directory - no download needed
+"""
+
+import tempfile
+import threading
+from advanced_sentiment import AdvancedSentimentAnalyzer, InferenceEngine
+from advanced_impact_calculator import advanced_impact_calculator
+
+HEADLINES = [
+    'apple reports record earnings',
+    'tesla faces regulatory investigation',
+    'nvidia shares surge on strong demand',
+    'amazon warns of weak sales',
+    'microsoft signs new cloud deal',
+    'supply shortage hits production',
+]
+
+def make_tiny_model(path, labels=('positive', 'negative', 'neutral')):
+    """Save a one-layer BERT with a three-class head and a small vocabulary to path"""
+    import os
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    words = sorted({word for headline in HEADLINES for word in headline.split()})
+    vocab_file = os.path.join(path, 'vocab.txt')
+    with open(vocab_file, 'w') as f:
+        f.write('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + words))
+    BertTokenizerFast(vocab_file=vocab_file).save_pretrained(path)
+
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(words) + 5, hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=64, max_position_embeddings=64,
+        id2label=dict(enumerate(labels)),
+        label2id={label: i for i, label in enumerate(labels)}
+    )
+    BertForSequenceClassification(config).eval().save_pretrained(path)
+    return path
+
+def test_micro_batching_engine():
+    """Concurrent callers share batches and get the same probabilities as direct inference"""
+    with tempfile.TemporaryDirectory() as path:
+        make_tiny_model(path)
+        engine = InferenceEngine(model_path=path, max_batch_size=4, max_latency_ms=200)
+
+        results = [None] * len(HEADLINES)
+        def call(i):
+            results[i] = engine.predict([HEADLINES[i]])[0]
+
+        engine.load()
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(len(HEADLINES))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected = [engine.predict_direct([headline])[0] for headline in HEADLINES]
+        for got, want in zip(results, expected):
+            assert set(got) == {'positive', 'negative', 'neutral'}
+            assert all(abs(got[label] - want[label]) < 1e-4 for label in want)
+
+        stats = engine.stats()
+        assert stats['texts'] == len(HEADLINES) and stats['batches'] < len(HEADLINES)
+        assert stats['largest_batch'] <= 4
+        print(f"  ✅ {stats['requests']} callers served in {stats['batches']} batches (average {stats['average_batch']})")
+        engine.close()
+
+        # int8 weights still give a probability distribution per text
+        quantized = InferenceEngine(model_path=path, quantize=True)
+        for scores in quantized.predict(HEADLINES):
+            assert abs(sum(scores.values()) - 1.0) < 1e-4
+        quantized.close()
+        print("  ✅ int8 quantized model loads and scores")
+
+def test_advanced_impact_with_local_model():
+    """calculate_advanced_impact runs on the transformer analyzer's output"""
+    with tempfile.TemporaryDirectory() as path:
+        make_tiny_model(path)
+        analyzer = AdvancedSentimentAnalyzer(InferenceEngine(model_path=path))
+        items = [{'id': i, 'headline': headline, 'summary': '', 'datetime': 1700000000} for i, headline in enumerate(HEADLINES)]
+
+        sentiments = analyzer.analyze_many(items, 'TSLA')
+        assert [sentiment['news_id'] for sentiment in sentiments] == list(range(len(HEADLINES)))
+        for item, sentiment in zip(items, sentiments):
+            impact = advanced_impact_calculator.calculate_advanced_impact('TSLA', item, sentiment)
+            assert 0 <= impact['impact_score'] <= 100
+            assert impact['analysis_models'] == [path]
+        analyzer.engine.close()
+        print(f"  ✅ Advanced impact scored for {len(items)} articles")
+
+def test_generic_labels_need_explicit_mapping():
+    """LABEL_0..N heads fail to load unless ADVANCED_LABELS names the classes"""
+    from advanced_sentiment import _label_names
+    assert _label_names({0: 'Negative', 1: 'Positive'}) == ['negative', 'positive']
+    assert _label_names({0: 'LABEL_0', 1: 'LABEL_1'}, 'positive, negative') == ['positive', 'negative']
+    for id2label, configured in (({0: 'LABEL_0', 1: 'LABEL_1'}, ''), ({0: 'pos', 1: 'neg', 2: 'neu'}, ''),
+                                 ({0: 'LABEL_0', 1: 'LABEL_1'}, 'negative,neutral,positive'),
+                                 ({0: 'LABEL_0', 1: 'LABEL_1'}, 'bullish,bearish')):
+        try:
+            _label_names(id2label, configured)
+            assert False, f"expected {id2label} with {configured!r} to be rejected"
+        except ValueError:
+            pass
+
+    with tempfile.TemporaryDirectory() as path:
+        make_tiny_model(path, labels=('LABEL_0', 'LABEL_1', 'LABEL_2'))
+        engine = InferenceEngine(model_path=path)
+        try:
+            engine.load()
+            assert False, "generic labels must not be guessed"
+        except ValueError:
+            assert 'ADVANCED_LABELS' in engine.stats()['load_error'] and not engine.stats()['loaded']
+
+        mapped = InferenceEngine(model_path=path, labels='neutral,negative,positive')
+        direct = mapped.predict_direct(HEADLINES[:2])
+        assert all(list(scores) == ['neutral', 'negative', 'positive'] for scores in direct)
+        mapped.close()
+    print("  ✅ Generic labels need an explicit mapping")
+
+if __name__ == "__main__":
+    print("🚀 Testing the transformer inference engine")
+    print("=" * 60)
+    test_micro_batching_engine()
+    test_advanced_impact_with_local_model()
+    test_generic_labels_need_explicit_mapping()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the analyzed-article archive
+"""
+
+import os
+import tempfile
+from article_archive import ArticleArchive
+
+def make_result(i):
+    item = {
+        'id': i,
+        'headline': f'Headline {i}',
+        'summary': 'Summary',
+        'source': 'Test',
+        'url': None,
+        'datetime': 1700000000 + (i // 2) * 60  # pairs share a timestamp to exercise the seq tie-break
+    }
+    sentiment = {'label': 'POSITIVE' if i % 2 else 'NEGATIVE', 'score': 0.5 if i % 2 else -0.5, 'news_type': 'EARNINGS' if i % 3 else 'GENERAL'}
+    impact = {'impact_score': 10.0 * (i % 10), 'impact_level': 'HIGH' if i % 4 == 0 else 'LOW', 'news_type': sentiment['news_type']}
+    return item, (sentiment, impact)
+
+def test_batched_writes_and_keyset_pages():
+    """Rows are written in batches, deduplicated per analyzer, and pages cover the range exactly once"""
+    with tempfile.TemporaryDirectory() as directory:
+        archive = ArticleArchive(path=os.path.join(directory, 'archive.db'), enabled=True, batch_size=64, flush_seconds=0.05)
+        items, results = zip(*(make_result(i) for i in range(250)))
+        archive.record('AAPL', 'simple', items, results)
+        archive.record('AAPL', 'simple', items[:10], results[:10])
+        archive.record('AAPL', 'advanced', items[:5], results[:5])
+        archive.record('MSFT', 'simple', [{'id': 'x', 'headline': 'Other', 'datetime': 1700000000}], [({'label': 'neutral', 'score': 0.0}, None)])
+        assert archive.flush()
+        
+        stats = archive.stats()
+        assert stats['written'] == 256 and stats['duplicates'] == 10 and stats['articles'] == 256
+        assert stats['batches'] >= 4
+        
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = archive.query(symbol='AAPL', analyzer='simple', start=1700000000 + 600, end=1700000000 + 6000, limit=17, cursor=cursor)
+            seen.extend(article['id'] for article in page['articles'])
+            pages += 1
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        expected = [str(i) for i in range(250) if 600 <= (i // 2) * 60 <= 6000]
+        assert sorted(seen, key=int) == expected and len(set(seen)) == len(seen)
+        datetimes = [int(i) // 2 for i in seen]
+        assert datetimes == sorted(datetimes, reverse=True)
+        print(f"  ✅ {len(seen)} articles over {pages} keyset pages")
+        
+        high = archive.query(impact_level='HIGH', news_type='EARNINGS', limit=500)['articles']
+        assert high and all(a['impact_level'] == 'HIGH' and a['news_type'] == 'EARNINGS' for a in high)
+        assert high[0]['sentiment_analysis']['score'] in (0.5, -0.5) and high[0]['impact_analysis']['impact_level'] == 'HIGH'
+        monitor_row = archive.query(symbol='MSFT')['articles'][0]
+        assert monitor_row['impact_analysis'] is None and monitor_row['sentiment_analysis']['label'] == 'neutral'
+        
+        # Indexes serve the symbol and impact-level range queries
+        plan = archive._reader.execute(
+            'EXPLAIN QUERY PLAN SELECT seq FROM analyzed_articles WHERE symbol = ? AND datetime >= ? ORDER BY datetime DESC, seq DESC',
+            ('AAPL', 0)
+        ).fetchall()
+        assert any('idx_articles_symbol_datetime' in row[-1] for row in plan)
+
+def test_refetched_articles_stored_once():
+    """Articles without ids, or with ids that change on every fetch, are archived once"""
+    with tempfile.TemporaryDirectory() as directory:
+        archive = ArticleArchive(path=os.path.join(directory, 'archive.db'), enabled=True, flush_seconds=0.05)
+        sentiment = {'label': 'POSITIVE', 'score': 0.4}
+        for fetch in range(3):
+            # Like the mock news: a new id and timestamp on every fetch, same article
+            mock = {'id': f'mock_AAPL_1_{fetch}', 'headline': 'AAPL reports strong quarterly earnings',
+                    'summary': 'Beat estimates.', 'url': 'https://mock-news.com/aapl', 'datetime': 1700000000 + fetch}
+            anonymous = {'id': None, 'headline': 'Supplier update', 'summary': '', 'url': None, 'datetime': 1700000000}
+            archive.record('AAPL', 'simple', [mock, anonymous], [(sentiment, None), (sentiment, None)])
+        assert archive.flush()
+        assert archive.stats()['articles'] == 2 and archive.stats()['duplicates'] == 4
+    assert not ArticleArchive(path='').enabled
+    print("  ✅ Re-fetched articles archived once")
+
+if __name__ == "__main__":
+    print("🚀 Testing the article archive")
+    print("=" * 60)
+    test_batched_writes_and_keyset_pages()
+    test_refetched_articles_stored_once()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for the backtesting engine
+Runs on a small synthetic Parquet/Arrow corpus written to a temp directory
+"""
+
+import os
+import tempfile
+import numpy as np
+from backtest import run_backtest, write_fixture, load_prices, DIRECTION_SIGNS
+from simple_impact_calculator import simple_impact_calculator, PRICE_DIRECTIONS
+from simple_sentiment import simple_analyzer
+
+def reference_hits(data_dir, horizon, band):
+    """Per-article replay with calculate_simple_impact, for comparison"""
+    import pyarrow.parquet as pq
+    news = pq.read_table(os.path.join(data_dir, 'news', 'news.parquet')).to_pylist()
+    prices = load_prices(os.path.join(data_dir, 'prices'))
+    hits, abs_error, evaluated = 0, 0.0, 0
+    for article in news:
+        bar_times, closes = prices[article['symbol']]
+        entry = np.searchsorted(bar_times, article['datetime'], side='right') - 1
+        exit_ = np.searchsorted(bar_times, article['datetime'] + horizon, side='left')
+        if entry < 0 or exit_ >= len(bar_times):
+            continue
+        sentiment = simple_analyzer.analyze_many([article], article['symbol'])[0]
+        impact = simple_impact_calculator.calculate_simple_impact(article['symbol'], article, sentiment, as_of=article['datetime'])
+        prediction = impact['price_prediction']
+        predicted_sign = DIRECTION_SIGNS[PRICE_DIRECTIONS.index(prediction['direction'])]
+        actual = (closes[exit_] / closes[entry] - 1) * 100
+        actual_sign = 1 if actual > band else -1 if actual < -band else 0
+        hits += predicted_sign == actual_sign
+        abs_error += abs(predicted_sign * prediction['percentage'] - actual)
+        evaluated += 1
+    return hits, abs_error, evaluated
+
+def test_backtest_matches_per_article_replay():
+    """Vectorized replay agrees with scoring every article one by one, in-process and across workers"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_fixture(data_dir, articles=3000, days=30, row_group_size=1000)
+        report = run_backtest(data_dir, workers=0, horizon_seconds=86400, neutral_band_pct=0.25)
+        
+        hits, abs_error, evaluated = reference_hits(data_dir, 86400, 0.25)
+        overall = report['overall']
+        assert report['articles'] == 3000 and report['evaluated'] == evaluated
+        assert report['evaluated'] + report['unmatched'] == report['articles']
+        assert abs(overall['hit_rate'] - round(hits / evaluated, 4)) < 1e-9
+        assert abs(overall['mean_absolute_error'] - round(abs_error / evaluated, 4)) < 1e-9
+        assert sum(group['articles'] for group in report['by_symbol'].values()) == evaluated
+        assert sum(group['articles'] for group in report['by_news_type'].values()) == evaluated
+        assert sum(bin_['articles'] for bin_ in overall['calibration']) == evaluated
+        print(f"  ✅ {evaluated} articles, hit rate {overall['hit_rate']}, calibration error {overall['calibration_error']}")
+        
+        pooled = run_backtest(data_dir, workers=2, horizon_seconds=86400, neutral_band_pct=0.25)
+        assert pooled['tasks'] == 3 and pooled['workers'] == 2
+        for key in ('overall', 'by_symbol', 'by_news_type'):
+            assert pooled[key] == report[key]
+        print("  ✅ Worker processes give the same report")
+
+def test_arrow_files_with_precomputed_sentiment():
+    """Arrow IPC news with stored sentiment columns skips text scoring"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_fixture(data_dir, articles=2000, days=30, with_sentiment=True)
+        table = pq.read_table(os.path.join(data_dir, 'news', 'news.parquet'))
+        os.remove(os.path.join(data_dir, 'news', 'news.parquet'))
+        with pa.OSFile(os.path.join(data_dir, 'news', 'news.arrow'), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                for batch in table.to_batches(max_chunksize=500):
+                    writer.write_batch(batch)
+        
+        report = run_backtest(data_dir, workers=0)
+        assert report['tasks'] == 4 and report['evaluated'] > 0
+        assert set(report['by_news_type']) <= {'EARNINGS', 'REGULATORY', 'PRODUCT', 'MARKET', 'GENERAL'}
+        # Planted price reactions follow the stored sentiment, so directional calls beat chance
+        assert report['overall']['hit_rate'] > 0.4
+        print(f"  ✅ Arrow corpus: hit rate {report['overall']['hit_rate']}")
+
+def test_timestamp_columns_and_null_news_types():
+    """Arrow timestamp columns are read as seconds, and null news types count as general"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    from backtest import column_seconds
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_fixture(data_dir, articles=2000, days=30, with_sentiment=True)
+        expected = run_backtest(data_dir, workers=0)
+        
+        news_path = os.path.join(data_dir, 'news', 'news.parquet')
+        prices_path = os.path.join(data_dir, 'prices', 'bars.parquet')
+        news, prices = pq.read_table(news_path), pq.read_table(prices_path)
+        nanoseconds = pc.multiply(news.column('datetime').cast(pa.int64()), 10**9).cast(pa.timestamp('ns', tz='UTC'))
+        pq.write_table(news.set_column(news.schema.get_field_index('datetime'), 'datetime', nanoseconds), news_path)
+        seconds = prices.column('timestamp').cast(pa.int64()).cast(pa.timestamp('s'))
+        pq.write_table(prices.set_column(prices.schema.get_field_index('timestamp'), 'timestamp', seconds), prices_path)
+        
+        converted = run_backtest(data_dir, workers=0)
+        for key in ('evaluated', 'overall', 'by_symbol', 'by_news_type'):
+            assert converted[key] == expected[key]
+        
+        # Drop every news type: all of them are scored and reported as GENERAL
+        news = pq.read_table(news_path)
+        nulls = pa.nulls(len(news), pa.string())
+        pq.write_table(news.set_column(news.schema.get_field_index('news_type'), 'news_type', nulls), news_path)
+        untyped = run_backtest(data_dir, workers=0)
+        assert set(untyped['by_news_type']) == {'GENERAL'} and untyped['evaluated'] == expected['evaluated']
+    
+    try:
+        column_seconds(pa.chunked_array([['2024-01-01']]))
+        assert False, "string times must be rejected"
+    except ValueError:
+        pass
+    print("  ✅ Timestamp columns converted to seconds; null news types are GENERAL")
+
+def test_stored_scores_without_confidence():
+    """Stored scores without a confidence column fall back to |score| instead of failing"""
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_fixture(data_dir, articles=1000, days=30, with_sentiment=True)
+        news_path = os.path.join(data_dir, 'news', 'news.parquet')
+        news = pq.read_table(news_path)
+        confidence = pc.min_element_wise(pc.abs(news.column('sentiment_score')), 1.0)
+        pq.write_table(news.set_column(news.schema.get_field_index('confidence'), 'confidence', confidence), news_path)
+        expected = run_backtest(data_dir, workers=0)
+
+        pq.write_table(news.drop(['confidence']), news_path)
+        report = run_backtest(data_dir, workers=0)
+        assert report['evaluated'] == expected['evaluated'] > 0
+        for key in ('overall', 'by_symbol', 'by_news_type'):
+            assert report[key] == expected[key]
+
+        # Scores alone are enough too
+        pq.write_table(news.select(['symbol', 'datetime', 'headline', 'summary', 'sentiment_score']), news_path)
+        scores_only = run_backtest(data_dir, workers=0)
+        assert scores_only['evaluated'] == expected['evaluated'] and set(scores_only['by_news_type']) == {'GENERAL'}
+    print(f"  ✅ Stored scores without confidence: mean confidence {report['overall']['mean_confidence']}")
+
+if __name__ == "__main__":
+    print("🚀 Testing the backtesting engine")
+    print("=" * 60)
+    test_backtest_matches_per_article_replay()
+    test_arrow_files_with_precomputed_sentiment()
+    test_timestamp_columns_and_null_news_types()
+    test_stored_scores_without_confidence()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for cross-ticker impact propagation
+"""
+
+from entity_index import EntityIndex
+from simple_sentiment import simple_analyzer
+
+PORTFOLIO = ['AAPL', 'MSFT', 'TSLA', 'GOOGL', 'AMZN', 'NVDA']
+
+def test_fan_out_to_related_symbols():
+    """A TSMC headline fetched for AAPL reaches NVDA at damped impact, once per article"""
+    index = EntityIndex(universe=PORTFOLIO, load_metadata=simple_analyzer.get_stock_metadata, damping=0.5, min_impact=20, history=10)
+    
+    affected = index.affected('TSMC warns of a chip shortage; lithium prices climb', source_symbol='AAPL')
+    assert set(affected) == {'NVDA', 'TSLA'}
+    assert {'relation': 'suppliers', 'entity': 'TSMC'} in affected['NVDA']
+    assert {'relation': 'competitors', 'entity': 'TSMC'} in affected['NVDA']
+    assert affected['TSLA'] == [{'relation': 'raw_materials', 'entity': 'Lithium'}]
+    # Whole words only: 'GM' must not match inside 'GMT'
+    assert index.affected('Markets close at 4pm GMT') == {}
+    
+    item = {'id': 7, 'headline': 'TSMC raises prices', 'summary': '', 'datetime': 1700000000}
+    sentiment = {'label': 'NEGATIVE', 'score': -0.4}
+    results = [(sentiment, {'impact_score': 70.0, 'impact_level': 'HIGH'})]
+    index.propagate_many('AAPL', [item], results)
+    index.propagate_many('AAPL', [item], [(sentiment, {'impact_score': 70.0, 'impact_level': 'HIGH'})])
+    
+    propagated = results[0][1]['propagated_to']
+    assert [target['symbol'] for target in propagated] == ['NVDA']
+    assert propagated[0]['impact_score'] == 35.0 and propagated[0]['impact_level'] == 'LOW'
+    received = index.received('NVDA')
+    assert len(received) == 1 and received[0]['source_symbol'] == 'AAPL' and received[0]['news_id'] == 7
+    
+    # Below the minimum impact nothing is passed on
+    low = [(sentiment, {'impact_score': 10.0, 'impact_level': 'MINIMAL'})]
+    index.propagate_many('AAPL', [item], low)
+    assert low[0][1]['propagated_to'] == []
+    print(f"  ✅ Propagation: {index.stats()}")
+
+def test_received_ordered_by_article_time():
+    """A newest-first batch larger than the history keeps its newest articles, listed newest first"""
+    index = EntityIndex(universe=PORTFOLIO, load_metadata=simple_analyzer.get_stock_metadata, damping=0.5, min_impact=20, history=3)
+    items = [{'id': i, 'headline': f'TSMC update {i}', 'summary': '', 'datetime': 1700000000 + i * 60} for i in range(5, 0, -1)]
+    results = [({'label': 'NEGATIVE', 'score': -0.4}, {'impact_score': 70.0, 'impact_level': 'HIGH'}) for _ in items]
+    index.propagate_many('AAPL', items, results)
+    assert [entry['news_id'] for entry in index.received('NVDA')] == [5, 4, 3]
+
+    # A later batch of older news does not push out the newer articles
+    older = [{'id': 0, 'headline': 'TSMC update 0', 'summary': '', 'datetime': 1700000000}]
+    index.propagate_many('AAPL', older, results[:1])
+    newer = [{'id': 9, 'headline': 'TSMC update 9', 'summary': '', 'datetime': 1700000000 + 9 * 60}]
+    index.propagate_many('AAPL', newer, [({'label': 'NEGATIVE', 'score': -0.4}, {'impact_score': 70.0, 'impact_level': 'HIGH'})])
+    assert [entry['news_id'] for entry in index.received('NVDA')] == [9, 5, 4]
+    print("  ✅ Received impacts ordered by article time")
+
+def test_index_rebuilds_after_metadata_change():
+    """Entities added to a symbol's metadata are indexed after invalidate()"""
+    metadata = {'AAA': {'suppliers': ['Acme']}, 'BBB': {'competitors': []}}
+    index = EntityIndex(universe=['AAA', 'BBB'], load_metadata=metadata.get)
+    assert set(index.affected('Acme recalls parts')) == {'AAA'}
+    metadata['BBB'] = {'competitors': ['Acme']}
+    assert set(index.affected('Acme recalls parts')) == {'AAA'}
+    index.invalidate()
+    assert set(index.affected('Acme recalls parts')) == {'AAA', 'BBB'}
+    print("  ✅ Index rebuilt after metadata change")
+
+if __name__ == "__main__":
+    print("🚀 Testing cross-ticker impact propagation")
+    print("=" * 60)
+    test_fan_out_to_related_symbols()
+    test_received_ordered_by_article_time()
+    test_index_rebuilds_after_metadata_change()
+    print("\n✅ All tests completed!")
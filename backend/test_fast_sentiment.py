@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized lexicon scorer
+Checks FastLexiconScorer against VADER and TextBlob on a small headline corpus
+"""
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from textblob.en.sentiments import PatternAnalyzer
+from fast_sentiment import FastLexiconScorer, TOLERANCE
+from simple_sentiment import SimpleSentimentAnalyzer
+
+# Headlines exercising the rules the scorer reimplements: boosters, caps,
+# negation, "but", "least", "kind of", punctuation emphasis and modifiers
+FIXTURE_CORPUS = [
+    'Apple reports record quarterly earnings and raises revenue guidance',
+    'Tesla faces regulatory investigation over compliance violations',
+    'Microsoft beats analyst expectations but misses on profit margin',
+    "Amazon's outlook is not very bright, but the cloud unit remains extremely profitable.",
+    "Microsoft's AI push is a huge success; investors couldn't be happier!!!!",
+    'Shares fell 10% after a disappointing, weak quarter?? Really??',
+    'Nvidia is VERY STRONG while rivals struggle',
+    'The company has never been so strong.',
+    'Without doubt, the best quarter ever.',
+    'It is the least bad option for shareholders.',
+    'At least the guidance was not terrible.',
+    'The results were kind of weak.',
+    'He is not a good manager.',
+    'Earnings were really not good.',
+    'Google faces no major threats, says CEO.',
+    'U.S. regulators approve the $3.5 bn deal; shares jump 5% (Reuters)',
+    "Tesla's Q3 results weren't great -- margins fell sharply, analysts say.",
+    'Nvidia "crushes" estimates... again?!',
+    'Supply chain problems hurt production badly.',
+    "Meta's stock surged on better-than-expected ad revenue.",
+    'Critics call the decision a serious mistake.',
+    'Revenue growth slowed somewhat in Q2; guidance was cut.',
+    'Analysts were surprised by the strong results.',
+    'Investors worry about lithium and silicon costs.',
+    '',
+]
+
+def test_scores_match_reference_libraries():
+    """VADER and TextBlob scores stay within TOLERANCE of the reference implementations"""
+    vader = SentimentIntensityAnalyzer()
+    textblob = PatternAnalyzer()
+    scorer = FastLexiconScorer(vader.lexicon)
+
+    fast = scorer.score_many(FIXTURE_CORPUS)
+    assert len(fast) == len(FIXTURE_CORPUS)
+
+    for text, scores in zip(FIXTURE_CORPUS, fast):
+        expected = vader.polarity_scores(text)
+        for field in ('compound', 'pos', 'neg', 'neu'):
+            assert abs(scores['vader'][field] - expected[field]) <= TOLERANCE, (text, field)
+        polarity, subjectivity = textblob.analyze(text)
+        assert abs(scores['textblob'][0] - polarity) <= TOLERANCE, (text, 'polarity')
+        assert abs(scores['textblob'][1] - subjectivity) <= TOLERANCE, (text, 'subjectivity')
+
+    # Batching never mixes texts: one at a time gives the same scores
+    assert [scorer.score(text) for text in FIXTURE_CORPUS] == fast
+    print(f"  ✅ {len(FIXTURE_CORPUS)} texts within {TOLERANCE} of VADER and TextBlob")
+
+def test_fast_analyzer_labels():
+    """SENTIMENT_SCORER=fast gives the same labels as the exact analyzer"""
+    items = [{'id': i, 'headline': text, 'summary': ''} for i, text in enumerate(FIXTURE_CORPUS)]
+    exact = SimpleSentimentAnalyzer(scorer='exact').analyze_many(items, 'AAPL')
+    fast = SimpleSentimentAnalyzer(scorer='fast').analyze_many(items, 'AAPL')
+
+    assert [result['label'] for result in fast] == [result['label'] for result in exact]
+    print(f"  ✅ Labels agree on all {len(items)} articles")
+
+if __name__ == "__main__":
+    print("🚀 Testing the vectorized lexicon scorer")
+    print("=" * 60)
+    test_scores_match_reference_libraries()
+    test_fast_analyzer_labels()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for the Finnhub client's retries, backoff and timeouts
+Requests go to a scripted transport adapter instead of the network
+"""
+
+import random
+import requests
+from requests.adapters import BaseAdapter
+import finnhub_client as client_module
+from finnhub_client import FinnhubClient
+
+class ScriptedAdapter(BaseAdapter):
+    """Answers each request with the next scripted status, headers or exception"""
+
+    def __init__(self, script):
+        super().__init__()
+        self.script = list(script)
+        self.requests = []  # (url, timeout) per attempt
+
+    def send(self, request, timeout=None, **kwargs):
+        self.requests.append((request.url, timeout))
+        step = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if isinstance(step, Exception):
+            raise step
+        status, headers = step if isinstance(step, tuple) else (step, {})
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = b'{}'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+class FakeClock:
+    """Stands in for the time and random modules: records jitter bounds and sleeps"""
+
+    def __init__(self):
+        self.bounds = []
+        self.sleeps = []
+
+    def uniform(self, low, high):
+        self.bounds.append((low, high))
+        return high / 2
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+class FakeScheduler:
+    def __init__(self):
+        self.acquired = []
+        self.throttled = 0
+
+    def acquire(self, priority_class):
+        self.acquired.append(priority_class)
+        return 0.25
+
+    def record_throttled(self):
+        self.throttled += 1
+
+def make_client(script, **kwargs):
+    kwargs.setdefault('scheduler', None)
+    client = FinnhubClient(api_key='test', base_url='https://finnhub.test/api/v1', backoff=0.5, **kwargs)
+    adapter = ScriptedAdapter(script)
+    client.session.mount('https://', adapter)
+    return client, adapter
+
+def with_fake_clock(func):
+    clock = FakeClock()
+    original_time, original_random = client_module.time, client_module.random
+    client_module.time, client_module.random = clock, clock
+    try:
+        func(clock)
+    finally:
+        client_module.time, client_module.random = original_time, original_random
+
+def test_retry_after_and_backoff_bounds():
+    """Each retry sleeps uniform(0, backoff * 2**attempt), on top of Retry-After when the server sends one"""
+    def run(clock):
+        client, adapter = make_client([(429, {'Retry-After': '7'}), 503, (429, {'Retry-After': '0.1'}), 200], max_retries=3)
+        response = client.quote('AAPL')
+        assert response.status_code == 200 and len(adapter.requests) == 4
+        assert clock.bounds == [(0, 0.5), (0, 1.0), (0, 2.0)]
+        # Never earlier than the server allows: Retry-After is a floor, the jitter comes after it
+        assert clock.sleeps == [7.25, 0.5, 1.1]
+
+        # An HTTP-date Retry-After is ignored rather than breaking the retry
+        clock.bounds.clear()
+        client, _ = make_client([(503, {'Retry-After': 'Wed, 21 Oct 2026 07:28:00 GMT'}), 200])
+        assert client.quote('AAPL').status_code == 200 and clock.bounds == [(0, 0.5)]
+    with_fake_clock(run)
+
+    # Full jitter: real delays spread across the whole window instead of clustering at the cap
+    client, _ = make_client([200])
+    sleeps = []
+    original_time = client_module.time
+    client_module.time = type('Clock', (), {'sleep': staticmethod(sleeps.append)})
+    try:
+        random.seed(5)
+        for _ in range(500):
+            client._sleep_before_retry(2)
+    finally:
+        client_module.time = original_time
+    assert all(0 <= delay <= 2.0 for delay in sleeps)
+    assert min(sleeps) < 0.2 and max(sleeps) > 1.8 and 0.8 < sum(sleeps) / len(sleeps) < 1.2
+    print(f"  ✅ Retry-After and full jitter (mean delay {sum(sleeps) / len(sleeps):.2f}s of 2.0s)")
+
+def test_retry_exhaustion():
+    """After max_retries the last response is returned, or the last connection error raised"""
+    def run(clock):
+        client, adapter = make_client([503], max_retries=2)
+        response = client.company_news('AAPL', '2026-10-01', '2026-10-17')
+        assert response.status_code == 503 and len(adapter.requests) == 3 and len(clock.sleeps) == 2
+
+        client, adapter = make_client([requests.ConnectionError('reset')], max_retries=2)
+        try:
+            client.quote('AAPL')
+            assert False, "expected the connection error to propagate"
+        except requests.ConnectionError:
+            pass
+        assert len(adapter.requests) == 3
+
+        # Errors that retrying cannot fix come back at once
+        client, adapter = make_client([404], max_retries=2)
+        assert client.profile('NOPE').status_code == 404 and len(adapter.requests) == 1
+
+        clock.sleeps.clear()
+        client, adapter = make_client([requests.Timeout('slow'), 502, 200], max_retries=2)
+        assert client.metrics('AAPL').status_code == 200 and len(clock.sleeps) == 2
+    with_fake_clock(run)
+    print("  ✅ Retry exhaustion")
+
+def test_per_endpoint_timeouts_and_quota():
+    """Each endpoint gets its own (connect, read) timeout and quota class; every attempt takes a token"""
+    scheduler = FakeScheduler()
+
+    def run(clock):
+        client, adapter = make_client([200], timeouts={'stock/metric': (1, 2)}, scheduler=scheduler)
+        client.quote('AAPL')
+        client.company_news('AAPL', '2026-10-01', '2026-10-17')
+        client.profile('AAPL')
+        client.metrics('AAPL')
+        client.get('stock/peers', {'symbol': 'AAPL'})
+        client.get('quote', {'symbol': 'AAPL'}, timeout=0.5)
+        assert [timeout for _, timeout in adapter.requests] == [(3.05, 5), (3.05, 10), (3.05, 10), (1, 2), (3.05, 10), 0.5]
+        assert adapter.requests[1][0].startswith('https://finnhub.test/api/v1/company-news?')
+        assert scheduler.acquired == ['quote', 'news', 'metadata', 'metadata', 'metadata', 'quote']
+
+        scheduler.acquired.clear()
+        client, _ = make_client([429, 200], scheduler=scheduler)
+        response = client.quote('AAPL')
+        assert scheduler.acquired == ['quote', 'quote'] and scheduler.throttled == 1
+        assert response.queue_wait_seconds == 0.5
+    with_fake_clock(run)
+    print("  ✅ Per-endpoint timeouts and quota classes")
+
+if __name__ == "__main__":
+    print("🚀 Testing the Finnhub client")
+    print("=" * 60)
+    test_retry_after_and_backoff_bounds()
+    test_retry_exhaustion()
+    test_per_endpoint_timeouts_and_quota()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test script for vectorized impact scoring
+score_batch / calculate_simple_impact_many must equal calculate_simple_impact
+"""
+
+import random
+from simple_impact_calculator import simple_impact_calculator
+
+AS_OF = 1700000000
+
+def test_batch_matches_scalar():
+    """Every field equals the per-article result, including missing dates, unknown types and capped scores"""
+    rng = random.Random(3)
+    news_types = list(simple_impact_calculator.news_type_weights) + ['unknown']
+    ages = [None, 0, 'yesterday', -3600, 0.5, 86399, 86400, 2 * 86400, 3 * 86400 + 1, 4 * 86400, 8 * 86400, 30 * 86400]
+    
+    articles, sentiments = [], []
+    for i in range(600):
+        age = ages[i % len(ages)]
+        articles.append({'id': i, 'datetime': AS_OF - age if isinstance(age, (int, float)) and age else age})
+        sentiments.append({
+            'score': rng.choice([0.3, 0.1, -0.1, -0.3, 0.0, round(rng.uniform(-1, 1), 3)]),
+            'confidence': round(rng.uniform(0, 1), 3),
+            'impact_multiplier': rng.choice([1.0, 1.3, 2.4, 5.0]),
+            'news_type': rng.choice(news_types).upper(),
+            'entities_found': {'competitors': []}
+        })
+    
+    for symbol in ('AAPL', 'TSLA', 'ZZZZ'):
+        expected = [simple_impact_calculator.calculate_simple_impact(symbol, a, s, AS_OF) for a, s in zip(articles, sentiments)]
+        batched = simple_impact_calculator.calculate_simple_impact_many(symbol, articles, sentiments, AS_OF)
+        assert batched == expected, symbol
+        assert {impact['impact_level'] for impact in batched} >= {'MINIMAL', 'LOW', 'MEDIUM'}
+        print(f"  ✅ {symbol}: {len(batched)} articles identical to the per-article path")
+    
+    assert simple_impact_calculator.calculate_simple_impact_many('AAPL', [], [], AS_OF) == []
+
+if __name__ == "__main__":
+    print("🚀 Testing vectorized impact scoring")
+    print("=" * 60)
+    test_batch_matches_scalar()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for the Aho-Corasick keyword matcher
+Compares it with the plain `in` loops it replaced over a synthetic corpus
+"""
+
+import random
+from keyword_matcher import KeywordMatcher
+from simple_sentiment import simple_analyzer
+
+def reference_matches(patterns, text, word_boundaries=False):
+    """Payloads of every pattern found by str.find, checking each occurrence's neighbours"""
+    text = text.lower()
+    found = set()
+    for pattern, payload in patterns:
+        pattern = pattern.lower()
+        start = text.find(pattern) if pattern else -1
+        while start != -1:
+            end = start + len(pattern)
+            if not word_boundaries or (
+                (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+            ):
+                found.add(payload)
+                break
+            start = text.find(pattern, start + 1)
+    return found
+
+def reference_entities(text, metadata):
+    """extract_entities and classify_news_type as they were before the matcher"""
+    text_lower = text.lower()
+    entities = {'competitors': [], 'suppliers': [], 'raw_materials': [], 'keywords': []}
+    for group in ('competitors', 'suppliers', 'raw_materials'):
+        for name in metadata.get(group, []):
+            if name.lower() in text_lower:
+                entities[group].append(name)
+    for news_type, keywords in simple_analyzer.impact_keywords.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                entities['keywords'].append(keyword)
+    news_type = 'general'
+    for candidate, keywords in simple_analyzer.impact_keywords.items():
+        if any(keyword in text_lower for keyword in keywords):
+            news_type = candidate
+            break
+    return entities, news_type
+
+def make_corpus(vocabulary, count=3000, seed=11):
+    rng = random.Random(seed)
+    filler = ['the', 'a', 'shares', 'of', 'rose', 'fell', 'after', 'GMT', 'newsroom', 'Co.', '3rd', '-', 'x']
+    words = vocabulary + filler
+    texts = []
+    for _ in range(count):
+        tokens = [rng.choice(words) for _ in range(rng.randint(3, 25))]
+        # Glue some tokens together so patterns also appear inside longer words
+        texts.append(''.join(token + rng.choice([' ', ' ', ' ', '', ', ', '-']) for token in tokens))
+    return texts
+
+def test_overlapping_patterns_and_failure_links():
+    """Patterns that are prefixes, suffixes and infixes of each other are all found"""
+    patterns = [(word, word) for word in ('he', 'she', 'his', 'hers', 'ushers', 'her', 'e', 'abcd', 'bc', 'bcde')]
+    matcher = KeywordMatcher(patterns)
+    assert matcher.matches('USHERS') == {'he', 'she', 'hers', 'ushers', 'her', 'e'}
+    assert matcher.matches('abcde') == {'abcd', 'bc', 'bcde', 'e'}
+    assert matcher.matches('abce') == {'bc', 'e'}
+    assert [(start, end) for start, end, payload in matcher.finditer('hishe') if payload == 'he'] == [(3, 5)]
+    assert KeywordMatcher([('', 'empty'), ('x', 'x')]).size == 1
+    print("  ✅ Overlapping patterns and failure links")
+
+def test_matches_agree_with_substring_loops():
+    """Over a synthetic corpus, matches() equals the `in` loops, with and without word boundaries"""
+    metadata = {symbol: simple_analyzer.get_stock_metadata(symbol) for symbol in ('AAPL', 'TSLA', 'NVDA')}
+    vocabulary = [keyword for keywords in simple_analyzer.impact_keywords.values() for keyword in keywords]
+    for data in metadata.values():
+        for group in ('competitors', 'suppliers', 'raw_materials'):
+            vocabulary.extend(data[group])
+    vocabulary += ['GM', 'AMD', 'INTC', 'newest', 'marketplace', 'productive', 'Silicone']
+    texts = make_corpus(vocabulary)
+
+    patterns = [(word, word.lower()) for word in set(vocabulary)]
+    plain = KeywordMatcher(patterns)
+    whole_words = KeywordMatcher(patterns, word_boundaries=True)
+    for text in texts:
+        assert plain.matches(text) == reference_matches(patterns, text), text
+        assert whole_words.matches(text) == reference_matches(patterns, text, word_boundaries=True), text
+
+    # The analyzer's single pass gives the same entities and news type as before
+    for i, text in enumerate(texts):
+        symbol = ('AAPL', 'TSLA', 'NVDA')[i % 3]
+        entities, news_type = reference_entities(text, metadata[symbol])
+        assert simple_analyzer.extract_entities(text, metadata[symbol]) == entities, text
+        assert simple_analyzer.classify_news_type(text, '') == news_type, text
+    print(f"  ✅ {len(texts)} texts agree with the substring loops")
+
+def test_word_boundaries():
+    """Whole-word matching rejects letters or digits on either side, but not punctuation"""
+    matcher = KeywordMatcher([('GM', 'GM'), ('LG Chem', 'LG Chem'), ('new', 'new')], word_boundaries=True)
+    assert matcher.matches('Markets close at 4pm GMT') == set()
+    assert matcher.matches('GM2 and xGM') == set()
+    assert matcher.matches('(GM), LG Chem.') == {'GM', 'LG Chem'}
+    assert matcher.matches('GMT then GM') == {'GM'}
+    assert matcher.matches('the news is new') == {'new'}
+    assert KeywordMatcher([('new', 'new')]).matches('the news') == {'new'}
+    print("  ✅ Word boundaries")
+
+if __name__ == "__main__":
+    print("🚀 Testing the keyword matcher")
+    print("=" * 60)
+    test_overlapping_patterns_and_failure_links()
+    test_matches_agree_with_substring_loops()
+    test_word_boundaries()
+    print("\n✅ All tests completed!")
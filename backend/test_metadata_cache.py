@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared stock metadata cache
+Uses an in-memory loader that counts calls instead of Finnhub
+"""
+
+import os
+import tempfile
+import time
+from metadata_cache import MetadataCache
+
+class FakeSource:
+    """Loader whose answers and failures the test controls"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.beta = 1.0
+        self.failing = False
+    
+    def __call__(self, symbol):
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError('upstream down')
+        return {'symbol': symbol, 'beta': self.beta}
+
+def test_ttl_stale_while_revalidate_and_snapshot():
+    """Fresh hits skip the loader, expired entries are served while reloading, and a snapshot restores them"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'metadata.json')
+        source = FakeSource()
+        cache = MetadataCache(ttl=60, retry_seconds=60, snapshot_path=path)
+        cache.register('finnhub', source, default=lambda symbol: {'symbol': symbol, 'beta': 'default'})
+        changes = []
+        cache.add_listener(lambda source_name, symbol: changes.append((source_name, symbol)))
+        
+        assert cache.preload(['AAPL', 'MSFT']) == 2 and source.calls == 2
+        assert cache.get('finnhub', 'AAPL')['beta'] == 1.0 and source.calls == 2
+        assert cache.preload(['AAPL', 'MSFT']) == 0
+        
+        # Expire AAPL: the old value comes back at once and a background refresh loads the new one
+        source.beta = 2.0
+        cache._entries[('finnhub', 'AAPL')]['expires_at'] = time.time() - 1
+        assert cache.get('finnhub', 'AAPL')['beta'] == 1.0
+        cache.close()
+        assert cache.get('finnhub', 'AAPL')['beta'] == 2.0
+        assert changes == [('finnhub', 'AAPL')]
+        
+        # A failed first load falls back to the default without caching it for the full TTL
+        source.failing = True
+        assert cache.get('finnhub', 'TSLA')['beta'] == 'default'
+        assert cache._entries[('finnhub', 'TSLA')]['ok'] is False
+        
+        # A restart reads the snapshot and makes no upstream calls for cached symbols
+        restarted_source = FakeSource()
+        restarted = MetadataCache(ttl=60, snapshot_path=path)
+        restarted.register('finnhub', restarted_source)
+        assert restarted.get('finnhub', 'AAPL')['beta'] == 2.0
+        assert restarted.preload(['AAPL', 'MSFT']) == 0 and restarted_source.calls == 0
+        assert ('finnhub', 'TSLA') not in restarted._entries
+        
+        stats = cache.stats()
+        print(f"  ✅ {stats['hits']} hits, {stats['stale_hits']} stale, {stats['refreshes']} refreshed, {stats['failures']} failed")
+
+def test_analyzers_share_cache():
+    """SimpleSentimentAnalyzer, the advanced analyzer and ImpactCalculator all read the global cache"""
+    from advanced_sentiment import advanced_analyzer
+    from impact_calculator import impact_calculator
+    from metadata_cache import metadata_cache
+    from simple_sentiment import simple_analyzer
+    
+    assert simple_analyzer.metadata_cache is metadata_cache
+    assert advanced_analyzer.get_stock_metadata('AAPL') is simple_analyzer.get_stock_metadata('AAPL')
+    assert impact_calculator.get_stock_metadata('AAPL') is metadata_cache.get('finnhub', 'AAPL')
+    print("  ✅ Analyzers share one metadata cache")
+
+if __name__ == "__main__":
+    print("🚀 Testing the stock metadata cache")
+    print("=" * 60)
+    test_ttl_stale_while_revalidate_and_snapshot()
+    test_analyzers_share_cache()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled, memory-mapped stock metadata table
+"""
+
+import os
+import tempfile
+from metadata_table import MetadataTable, default_metadata
+from simple_sentiment import simple_analyzer
+
+CSV_SOURCE = """symbol,market_cap,sector,industry,competitors,suppliers,raw_materials,beta,pe_ratio,revenue,profit_margin
+aaa,2000000000,Energy,Oil & Gas,BBB|Shell,Halliburton,Crude Oil|Steel,1.4,12.5,900000000,0.18
+BBB,,Energy,,AAA,,,0.9,,,
+"""
+
+def test_compile_and_map_csv():
+    """A CSV source compiles to a mapped table; missing fields take the defaults"""
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'metadata.csv')
+        with open(source_path, 'w') as f:
+            f.write(CSV_SOURCE)
+        table = MetadataTable.open(source_path)
+        
+        assert table.path == os.path.join(directory, 'metadata.table') and os.path.exists(table.path)
+        assert len(table) == 2 and 'AAA' in table and 'aaa' in table and 'CCC' not in table
+        aaa = table.get('AAA')
+        assert aaa == {
+            'market_cap': 2000000000, 'sector': 'Energy', 'industry': 'Oil & Gas',
+            'competitors': ['BBB', 'Shell'], 'suppliers': ['Halliburton'], 'raw_materials': ['Crude Oil', 'Steel'],
+            'beta': 1.4, 'pe_ratio': 12.5, 'revenue': 900000000, 'profit_margin': 0.18
+        }
+        bbb = table.get('BBB')
+        defaults = default_metadata()
+        assert bbb['beta'] == 0.9 and bbb['competitors'] == ['AAA'] and bbb['suppliers'] == []
+        assert bbb['market_cap'] == defaults['market_cap'] and bbb['industry'] == defaults['industry']
+        assert table.get('CCC') is None
+        
+        # 'Energy' and 'AAA'/'BBB' are pooled once however many rows use them
+        assert table.stats()['strings'] == 9 and table.stats()['memory_mapped']
+        
+        # A newer source is recompiled on the next open
+        with open(source_path, 'a') as f:
+            f.write("CCC,,Utilities,,,,,,,,\n")
+        os.utime(source_path, (os.path.getmtime(table.path) + 1,) * 2)
+        assert MetadataTable.open(source_path).get('CCC')['sector'] == 'Utilities'
+    print(f"  ✅ CSV compiled and mapped: {aaa['competitors']}")
+
+def test_lookups_across_a_large_universe():
+    """Every symbol resolves to its own row, including probes past hash collisions"""
+    table = MetadataTable.from_records({f"SYM{i}": {'beta': i / 1000} for i in range(5000)})
+    assert all(table.get(f"SYM{i}")['beta'] == i / 1000 for i in range(5000))
+    assert table.row('SYM5000') is None
+    print(f"  ✅ {len(table)} symbols, {table.stats()['bytes']:,} bytes")
+
+def test_analyzer_metadata_from_table():
+    """The simple analyzer reads the shipped table and defaults unknown symbols"""
+    nvda = simple_analyzer._load_stock_metadata('NVDA')
+    assert nvda['suppliers'] == ['TSMC', 'Samsung', 'SK Hynix'] and nvda['market_cap'] == 1200000000000
+    assert simple_analyzer._load_stock_metadata('UNLISTED') == default_metadata()
+    print("  ✅ Analyzer metadata served from the table")
+
+if __name__ == "__main__":
+    print("🚀 Testing the stock metadata table")
+    print("=" * 60)
+    test_compile_and_map_csv()
+    test_lookups_across_a_large_universe()
+    test_analyzer_metadata_from_table()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for background monitoring jobs
+Runs the scheduler against a stand-in for monitor_stocks_concurrent
+"""
+
+import threading
+import time
+from fastapi.testclient import TestClient
+import monitor_scheduler as scheduler_module
+import stock_monitor
+from main import app
+from monitor_scheduler import MonitorScheduler, QueueFullError
+
+class FakeMonitor:
+    """Records runs and holds each one until released"""
+
+    def __init__(self):
+        self.runs = []
+        self.release = threading.Event()
+        self.fail = False
+
+    def __call__(self, portfolio, max_workers=None, deadline=None):
+        self.runs.append(list(portfolio))
+        assert self.release.wait(5)
+        if self.fail:
+            raise RuntimeError('finnhub down')
+        return {
+            'alerts': ['alert'],
+            'results': {symbol: {'price': 1.0} for symbol in portfolio},
+            'timings': {symbol: 0.01 for symbol in portfolio},
+            'timed_out': [],
+            'elapsed_seconds': 0.01
+        }
+
+def wait_for(scheduler, job_id, statuses, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = scheduler.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {statuses}")
+
+def start_scheduler(fake, **kwargs):
+    original = stock_monitor.monitor_stocks_concurrent
+    stock_monitor.monitor_stocks_concurrent = fake
+    scheduler = MonitorScheduler(interval=0, **kwargs)
+    scheduler.start()
+    return scheduler, original
+
+def test_job_lifecycle_coalescing_and_queue_limit():
+    """Jobs go queued -> running -> completed/failed; repeats coalesce and the queue is bounded"""
+    fake = FakeMonitor()
+    scheduler, original = start_scheduler(fake, max_jobs=3, max_queued=2)
+    try:
+        running = scheduler.submit(portfolio=['AAPL'])
+        assert running['status'] == 'queued' and not running['coalesced']
+        wait_for(scheduler, running['id'], ('running',))
+
+        # Identical requests join the queued job instead of queueing more runs
+        queued = scheduler.submit()
+        again = scheduler.submit()
+        assert again['id'] == queued['id'] and again['coalesced']
+        other = scheduler.submit(portfolio=['TSLA'])
+        assert other['id'] != queued['id']
+        try:
+            scheduler.submit(portfolio=['MSFT'])
+            assert False, "expected the queue to be full"
+        except QueueFullError:
+            pass
+
+        fake.release.set()
+        done = wait_for(scheduler, running['id'], ('completed',))
+        assert done['results'] == {'AAPL': {'price': 1.0}} and done['alerts'] == ['alert']
+        assert done['started_at'] >= done['created_at'] and done['finished_at'] >= done['started_at']
+        wait_for(scheduler, queued['id'], ('completed',))
+        wait_for(scheduler, other['id'], ('completed',))
+        assert fake.runs == [['AAPL'], stock_monitor.PORTFOLIO, ['TSLA']]
+
+        fake.fail = True
+        failed = scheduler.submit(portfolio=['NVDA'])
+        failed = wait_for(scheduler, failed['id'], ('failed',))
+        assert failed['error'] == 'finnhub down'
+
+        # Finished jobs beyond the history limit are dropped, newest kept
+        jobs = scheduler.list_jobs()
+        assert len(jobs) == 3 and jobs[0]['id'] == failed['id'] and scheduler.get(running['id']) is None
+        print(f"  ✅ Job lifecycle: {[job['status'] for job in jobs]}")
+    finally:
+        fake.release.set()
+        scheduler.stop()
+        stock_monitor.monitor_stocks_concurrent = original
+
+def test_monitor_job_endpoints():
+    """POST /monitor queues a job, GET /monitor/jobs[/{id}] report it, a full queue answers 429"""
+    fake = FakeMonitor()
+    scheduler, original = start_scheduler(fake, max_queued=1)
+    global_scheduler = scheduler_module.monitor_scheduler
+    scheduler_module.monitor_scheduler = scheduler
+    client = TestClient(app)
+    try:
+        first = client.post('/monitor').json()
+        assert first['status'] == 'queued' and first['status_url'] == f"/monitor/jobs/{first['job_id']}"
+        wait_for(scheduler, first['job_id'], ('running',))
+
+        second = client.post('/monitor', params={'deadline': 30}).json()
+        assert client.post('/monitor', params={'deadline': 30}).json()['job_id'] == second['job_id']
+        assert client.post('/monitor').status_code == 429
+
+        fake.release.set()
+        wait_for(scheduler, second['job_id'], ('completed',))
+        job = client.get(first['status_url']).json()
+        assert job['status'] == 'completed' and set(job['results']) == set(stock_monitor.PORTFOLIO)
+        listed = client.get('/monitor/jobs', params={'limit': 1}).json()['jobs']
+        assert [entry['id'] for entry in listed] == [second['job_id']] and 'results' not in listed[0]
+        assert client.get('/monitor/jobs/missing').status_code == 404
+        print("  ✅ Monitor job endpoints")
+    finally:
+        fake.release.set()
+        scheduler_module.monitor_scheduler = global_scheduler
+        scheduler.stop()
+        stock_monitor.monitor_stocks_concurrent = original
+
+if __name__ == "__main__":
+    print("🚀 Testing background monitoring jobs")
+    print("=" * 60)
+    test_job_lifecycle_coalescing_and_queue_limit()
+    test_monitor_job_endpoints()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental news polling cursors
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from news_cursor import NewsCursorStore, OVERLAP_SECONDS
+
+def article(news_id, timestamp):
+    return {'id': news_id, 'headline': f'Headline {news_id}', 'datetime': timestamp}
+
+def day(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+
+def test_window_follows_the_high_water_mark():
+    """The first poll looks back the initial window; later polls start a day before the newest article"""
+    cursors = NewsCursorStore(initial_lookback_days=7, buffer_size=50)
+    now = datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).strftime('%Y-%m-%d')
+    assert cursors.window('AAPL') == ((now - timedelta(days=7)).strftime('%Y-%m-%d'), tomorrow)
+    assert cursors.cursor('AAPL') is None
+
+    latest = int(time.time()) - 3 * 86400
+    cursors.merge('AAPL', [article('a', latest - 3600), article('b', latest)])
+    assert cursors.window('AAPL') == (day(latest - OVERLAP_SECONDS), tomorrow)
+    assert cursors.cursor('AAPL') == {'latest_datetime': latest, 'latest_id': 'b', 'buffered_articles': 2}
+    # Other symbols keep their own cursor
+    assert cursors.window('MSFT')[0] == (now - timedelta(days=7)).strftime('%Y-%m-%d')
+    print("  ✅ Window follows the high-water mark")
+
+def test_overlapping_windows_deduplicated_by_id():
+    """Articles returned again by the overlapping window are not new; late ones inside it are"""
+    cursors = NewsCursorStore(buffer_size=50)
+    t = 1700000000
+    new, recent = cursors.merge('AAPL', [article(2, t), article(1, t - 600), article(None, t)])
+    assert [item['id'] for item in new] == [2, 1] and [item['id'] for item in recent] == [2, 1]
+
+    # The next poll repeats the overlap, adds a newer article and one published late inside the window
+    new, recent = cursors.merge('AAPL', [article(1, t - 600), article(3, t + 60), article(2, t), article(4, t - 300)])
+    assert [item['id'] for item in new] == [3, 4]
+    assert [item['id'] for item in recent] == [3, 2, 4, 1]
+    assert cursors.cursor('AAPL')['latest_id'] == 3
+
+    # Nothing new: the buffer comes back unchanged and the cursor does not move
+    new, recent = cursors.merge('AAPL', [article(3, t + 60), article(4, t - 300)])
+    assert new == [] and [item['id'] for item in recent] == [3, 2, 4, 1]
+    assert cursors.cursor('AAPL')['latest_datetime'] == t + 60
+    print("  ✅ Overlapping windows deduplicated by id")
+
+def test_boundary_pruned_past_two_overlaps():
+    """Ids older than latest - 2 * OVERLAP_SECONDS are forgotten, and articles that old are ignored"""
+    cursors = NewsCursorStore(buffer_size=50)
+    t = 1700000000
+    cursors.merge('TSLA', [article('old', t), article('edge', t + OVERLAP_SECONDS)])
+    assert set(cursors._cursors['TSLA']['boundary']) == {'old', 'edge'}
+
+    # Filtering uses the cursor as it was before this poll: t + OVERLAP_SECONDS
+    latest = t + 2 * OVERLAP_SECONDS + 1
+    new, _ = cursors.merge('TSLA', [article('newest', latest), article('stale', t - OVERLAP_SECONDS - 1)])
+    assert [item['id'] for item in new] == ['newest']
+    # 'old' fell below the cutoff, 'edge' can still reappear in the next window
+    assert set(cursors._cursors['TSLA']['boundary']) == {'edge', 'newest'}
+    assert all(item_time >= latest - 2 * OVERLAP_SECONDS for item_time in cursors._cursors['TSLA']['boundary'].values())
+
+    # An article right at the cutoff is still accepted
+    new, _ = cursors.merge('TSLA', [article('at_cutoff', latest - 2 * OVERLAP_SECONDS)])
+    assert [item['id'] for item in new] == ['at_cutoff']
+    print("  ✅ Boundary pruned past two overlaps")
+
+def test_buffer_cap_and_reset():
+    """The buffer keeps only the newest buffer_size articles; reset drops one symbol or all"""
+    cursors = NewsCursorStore(buffer_size=3)
+    t = 1700000000
+    new, recent = cursors.merge('NVDA', [article(i, t + i) for i in range(5)])
+    assert len(new) == 5 and [item['id'] for item in recent] == [4, 3, 2]
+    _, recent = cursors.merge('NVDA', [article(5, t - 10), article(6, t + 10)])
+    assert [item['id'] for item in recent] == [6, 4, 3] and cursors.recent('NVDA') == recent
+    assert cursors.cursor('NVDA')['buffered_articles'] == 3
+
+    cursors.merge('AMD', [article('x', t)])
+    cursors.reset('NVDA')
+    assert cursors.cursor('NVDA') is None and cursors.recent('NVDA') == []
+    assert cursors.recent('AMD')[0]['id'] == 'x'
+    # After a reset the same ids count as new again
+    assert len(cursors.merge('NVDA', [article(4, t + 4)])[0]) == 1
+    cursors.reset()
+    assert cursors.cursor('AMD') is None and cursors.cursor('NVDA') is None
+    print("  ✅ Buffer cap and reset")
+
+if __name__ == "__main__":
+    print("🚀 Testing incremental news cursors")
+    print("=" * 60)
+    test_window_follows_the_high_water_mark()
+    test_overlapping_windows_deduplicated_by_id()
+    test_boundary_pruned_past_two_overlaps()
+    test_buffer_cap_and_reset()
+    print("\n✅ All tests completed!")
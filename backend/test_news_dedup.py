@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for Bloom-filter seen-news dedup
+"""
+
+import time
+from news_dedup import BloomFilter, RotatingBloomFilter
+
+DAY = 86400
+
+def test_false_positive_rate_within_target():
+    """Filled to capacity, no seen id is missed and unseen ids match at about the target rate"""
+    bloom = BloomFilter(capacity=20000, fp_rate=0.01)
+    for i in range(20000):
+        bloom.add(f'AAPL:{i}')
+    assert all(f'AAPL:{i}' in bloom for i in range(20000))
+    probes = 100000
+    measured = sum(1 for i in range(probes) if f'TSLA:{i}' in bloom) / probes
+    assert 0.005 < measured < 0.015 and abs(bloom.estimated_fp_rate() - 0.01) < 0.002
+
+    # The rotating filter splits its budget across buckets, so the whole window stays on target
+    window = RotatingBloomFilter(window_seconds=4 * DAY, buckets=4, bucket_capacity=5000, fp_rate=0.01)
+    now = time.time()
+    for age in range(4):
+        for i in range(5000):
+            window.add(f'AAPL:{age}:{i}', now - age * DAY)
+    stats = window.stats()
+    assert stats['buckets'] == 4 and stats['keys'] == 20000 and stats['overfull_buckets'] == 0
+    assert all(f'AAPL:{age}:{i}' in window for age in range(4) for i in range(5000))
+    measured = sum(1 for i in range(probes) if f'TSLA:{i}' in window) / probes
+    assert measured < 0.015 and stats['estimated_fp_rate'] < 0.011
+    print(f"  ✅ FP rate: measured {measured:.4f}, estimated {stats['estimated_fp_rate']:.4f}, target 0.01")
+
+def test_buckets_rotate_out_of_the_window():
+    """Ids leave with their bucket once it ages past the window; older ids are never added"""
+    window = RotatingBloomFilter(window_seconds=3 * DAY, buckets=3, bucket_capacity=1000, fp_rate=0.001)
+    now = time.time()
+    window.add('AAPL:oldest', now - 2 * DAY)
+    window.add('AAPL:middle', now - DAY)
+    window.add('AAPL:newest', now)
+    window.add('AAPL:expired', now - 3 * DAY)
+    assert window.stats()['keys'] == 3 and 'AAPL:expired' not in window
+
+    # One day later the oldest bucket drops out; two days later only the newest id is left
+    assert window.purge_expired(now + DAY) == 1
+    assert 'AAPL:oldest' not in window and 'AAPL:middle' in window and 'AAPL:newest' in window
+    assert window.purge_expired(now + 2 * DAY) == 1
+    assert 'AAPL:middle' not in window and 'AAPL:newest' in window
+    assert window.stats()['buckets'] == 1 and window.purge_expired(now + 2 * DAY) == 0
+
+    # Overfilling a bucket is reported so capacity can be raised
+    small = RotatingBloomFilter(window_seconds=DAY, buckets=1, bucket_capacity=10, fp_rate=0.01)
+    for i in range(11):
+        small.add(f'NVDA:{i}')
+    assert small.stats()['overfull_buckets'] == 1
+    print("  ✅ Buckets rotate out of the window")
+
+if __name__ == "__main__":
+    print("🚀 Testing seen-news dedup")
+    print("=" * 60)
+    test_false_positive_rate_within_target()
+    test_buckets_rotate_out_of_the_window()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming price ingestion
+Runs PriceStream against the local stub trade server - no API key needed
+"""
+
+import time
+from finnhub_stub import StubTradeServer
+from price_stream import PriceStream
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_stream_reconnect_and_resubscribe():
+    """Trades update the latest-price table and survive a dropped connection"""
+    server = StubTradeServer().start()
+    stream = PriceStream(url=server.url, api_key=None, reconnect_delay=0.05)
+    received = []
+    stream.add_listener(lambda symbol, price, trade_time: received.append((symbol, price)))
+    
+    try:
+        stream.start(['AAPL', 'TSLA'])
+        assert wait_for(lambda: server.subscribed('AAPL') and server.subscribed('TSLA'))
+        
+        server.publish('AAPL', 190.5)
+        assert wait_for(lambda: stream.latest_price('AAPL') == 190.5)
+        print(f"  ✅ AAPL streamed at {stream.latest_price('AAPL')}")
+        
+        # Late subscriptions go out on the live connection
+        stream.subscribe('NVDA')
+        assert wait_for(lambda: server.subscribed('NVDA'))
+        
+        # Drop the socket: the client reconnects and resubscribes everything
+        server.drop_connections()
+        assert wait_for(lambda: server.connections_accepted >= 2 and server.subscribed('NVDA'))
+        server.publish('TSLA', 240.0)
+        assert wait_for(lambda: stream.latest_price('TSLA') == 240.0)
+        print(f"  ✅ Reconnected {stream.counters['reconnects']} time(s), TSLA streamed at {stream.latest_price('TSLA')}")
+        
+        assert ('AAPL', 190.5) in received and ('TSLA', 240.0) in received
+        assert stream.latest_price('AAPL', max_age=0) is None  # stale entries are ignored
+    finally:
+        stream.stop()
+        server.stop()
+
+if __name__ == "__main__":
+    print("🚀 Testing streaming price ingestion")
+    print("=" * 60)
+    test_stream_reconnect_and_resubscribe()
+    print("\n✅ All tests completed!")
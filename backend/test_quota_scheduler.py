@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the Finnhub quota scheduler
+"""
+
+import threading
+import time
+from quota_scheduler import QuotaScheduler
+
+def test_priority_order_when_tokens_are_scarce():
+    """Queued callers are granted by priority class, then in arrival order"""
+    scheduler = QuotaScheduler(calls_per_minute=300, burst=1)  # one token every 0.2s
+    scheduler.acquire('metadata')
+    granted = []
+    lock = threading.Lock()
+    
+    def call(priority_class, name):
+        scheduler.acquire(priority_class)
+        with lock:
+            granted.append(name)
+    
+    threads = []
+    for priority_class, name in (('metadata', 'metadata-1'), ('news', 'news-1'), ('metadata', 'metadata-2'), ('quote', 'quote-1')):
+        thread = threading.Thread(target=call, args=(priority_class, name))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.01)
+    assert scheduler.usage()['queued'] == {'quote': 1, 'news': 1, 'metadata': 2}
+    for thread in threads:
+        thread.join(timeout=5)
+    
+    assert granted == ['quote-1', 'news-1', 'metadata-1', 'metadata-2']
+    usage = scheduler.usage()
+    assert usage['classes']['metadata']['granted'] == 3 and usage['calls_last_minute'] == 5
+    assert usage['classes']['metadata']['max_wait'] >= 0.5
+    print(f"  ✅ Granted in priority order: {granted}")
+
+def test_refill_and_burst_capacity():
+    """The bucket starts full, refills at the configured rate and never exceeds the burst"""
+    scheduler = QuotaScheduler(calls_per_minute=600, burst=3)  # 10 tokens per second
+    for _ in range(3):
+        assert scheduler.acquire('quote') < 0.05
+    assert scheduler.usage()['tokens_available'] < 1
+    time.sleep(0.25)
+    assert 2 <= scheduler.usage()['tokens_available'] <= 3
+    time.sleep(0.3)
+    assert scheduler.usage()['tokens_available'] == 3
+    print("  ✅ Refill and burst capacity")
+
+def test_throttle_backoff_and_timeout():
+    """A 429 drains the bucket so the next call waits; a timed-out caller leaves the queue"""
+    scheduler = QuotaScheduler(calls_per_minute=120, burst=5)  # one token every 0.5s
+    scheduler.record_throttled()
+    assert scheduler.usage()['tokens_available'] == 0 and scheduler.usage()['throttled_responses'] == 1
+    
+    try:
+        scheduler.acquire('news', timeout=0.1)
+        assert False, "expected a timeout"
+    except TimeoutError:
+        pass
+    assert scheduler.usage()['queued']['news'] == 0
+    
+    waited = scheduler.acquire('news')
+    assert 0.2 <= waited <= 1.0
+    print(f"  ✅ Backed off {waited:.2f}s after a 429")
+
+def test_disabled_scheduler_records_calls_from_many_threads():
+    """With no quota configured calls never wait, and concurrent stats updates are not lost"""
+    scheduler = QuotaScheduler(calls_per_minute=0)
+    assert not scheduler.enabled
+    
+    def calls():
+        for _ in range(2000):
+            assert scheduler.acquire('quote') == 0.0
+    
+    threads = [threading.Thread(target=calls) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    usage = scheduler.usage()
+    assert usage['classes']['quote']['granted'] == 16000 and usage['calls_last_minute'] == 16000
+    assert usage['utilization'] is None
+    print("  ✅ Disabled scheduler records every call")
+
+if __name__ == "__main__":
+    print("🚀 Testing the Finnhub quota scheduler")
+    print("=" * 60)
+    test_priority_order_when_tokens_are_scarce()
+    test_refill_and_burst_capacity()
+    test_throttle_backoff_and_timeout()
+    test_disabled_scheduler_records_calls_from_many_threads()
+    print("\n✅ All tests completed!")
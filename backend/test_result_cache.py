@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed sentiment result cache
+"""
+
+import os
+import tempfile
+import time
+from result_cache import ResultCache
+
+def test_keys_are_content_addressed_and_versioned():
+    """Equivalent text shares a key; a new analyzer version never reuses old results"""
+    key = ResultCache.make_key('v1', 'Apple beats estimates')
+    assert key == ResultCache.make_key('v1', '  Apple beats estimates\n')
+    assert ResultCache.make_key('v1', 'Caf\u00e9 chain') == ResultCache.make_key('v1', 'Cafe\u0301 chain')
+    assert key != ResultCache.make_key('v2', 'Apple beats estimates')
+    assert ResultCache.make_key('v1', 'ab', 'c') != ResultCache.make_key('v1', 'a', 'bc')
+
+    cache = ResultCache(max_entries=10, ttl=60, disk_path='')
+    cache.set(key, {'compound': 0.5})
+    assert cache.get(ResultCache.make_key('v2', 'Apple beats estimates')) is None
+    assert cache.get(key) == {'compound': 0.5}
+    print("  ✅ Keys are content-addressed and versioned")
+
+def test_lru_eviction_and_expiry():
+    """The least recently used entry is evicted first and expired entries are dropped"""
+    cache = ResultCache(max_entries=2, ttl=60, disk_path='')
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+    short = ResultCache(max_entries=10, ttl=0.05, disk_path='')
+    short.set('a', 1)
+    time.sleep(0.1)
+    assert short.get('a') is None
+    assert short.stats()['expirations'] == 1 and short.stats()['entries'] == 0
+
+    calls = []
+    assert short.get_or_compute('b', lambda: calls.append(1) or 'fresh') == 'fresh'
+    assert short.get_or_compute('b', lambda: calls.append(1) or 'again') == 'fresh'
+    assert len(calls) == 1
+    print(f"  ✅ LRU eviction and TTL expiry: {cache.stats()}")
+
+def test_disk_tier_survives_restart():
+    """A new cache on the same file reads results back from disk; purge and clear remove them"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.db')
+        cache = ResultCache(max_entries=10, ttl=60, disk_path=path)
+        cache.set('a', {'compound': 0.25, 'label': 'POSITIVE'})
+        cache.set('old', {'compound': 0.0})
+        cache._disk.execute('UPDATE results SET stored_at = ? WHERE key = ?', (time.time() - 120, 'old'))
+
+        # Expired rows are purged when the file is opened
+        reopened = ResultCache(max_entries=1, ttl=60, disk_path=path)
+        assert reopened.stats()['disk_purged'] == 1 and reopened.get('old') is None
+        assert reopened.get('a') == {'compound': 0.25, 'label': 'POSITIVE'}
+        assert reopened.stats()['disk_hits'] == 1
+        # Promoted into memory, so the next read is a memory hit
+        assert reopened.get('a') is not None and reopened.stats()['hits'] == 1
+        assert reopened.purge_disk() == 0
+
+        reopened.clear()
+        assert ResultCache(max_entries=10, ttl=60, disk_path=path).get('a') is None
+    print("  ✅ Disk tier read back after restart")
+
+def test_disk_tier_capped():
+    """The disk tier keeps at most disk_max_rows, dropping the oldest results every purge_every writes"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.db')
+        cache = ResultCache(max_entries=100, ttl=3600, disk_path=path, disk_max_rows=10, purge_every=5)
+        for i in range(23):
+            cache.set(f'k{i}', i)
+            rows = cache._disk.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            assert rows <= 10 + 4, rows
+        assert cache.stats()['disk_purged'] == 10
+        cache.purge_disk()
+        keys = {key for key, in cache._disk.execute('SELECT key FROM results')}
+        assert keys == {f'k{i}' for i in range(13, 23)}
+
+        # A cap lowered between restarts is applied on open
+        reopened = ResultCache(max_entries=100, ttl=3600, disk_path=path, disk_max_rows=3)
+        assert reopened._disk.execute('SELECT COUNT(*) FROM results').fetchone()[0] == 3
+        assert reopened.get('k22') == 22 and reopened.get('k19') is None
+    print("  ✅ Disk tier capped at disk_max_rows")
+
+if __name__ == "__main__":
+    print("🚀 Testing the sentiment result cache")
+    print("=" * 60)
+    test_keys_are_content_addressed_and_versioned()
+    test_lru_eviction_and_expiry()
+    test_disk_tier_survives_restart()
+    test_disk_tier_capped()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for the running per-symbol sentiment aggregates
+Checks them against sentiment.get_sentiment_summary computed from scratch
+"""
+
+from sentiment import get_sentiment_summary
+from sentiment_aggregates import SentimentAggregates
+
+def test_aggregates_match_full_recompute():
+    """Incremental totals equal a from-scratch summary; duplicates and id-less articles are not counted"""
+    aggregates = SentimentAggregates(alpha=0.5, bucket_seconds=3600, max_buckets=2, seen_ids=100)
+    base = 1700000000 - 1700000000 % 3600
+    sentiments = [
+        {'label': 'positive', 'score': 0.6},
+        {'label': 'NEGATIVE', 'score': -0.4},
+        {'label': 'positive', 'score': 0.2},
+        {'label': 'neutral', 'score': 0.0},
+    ]
+    impacts = [
+        {'impact_score': 90.0, 'impact_level': 'CRITICAL'},
+        {'impact_score': 40.0, 'impact_level': 'MEDIUM'},
+        None,
+        {'impact_score': 65.0, 'impact_level': 'HIGH'},
+    ]
+    for i, (sentiment, impact) in enumerate(zip(sentiments, impacts)):
+        assert aggregates.ingest('AAPL', f'n{i}', sentiment, impact, timestamp=base + i * 3600)
+    
+    assert not aggregates.ingest('AAPL', 'n0', sentiments[0], impacts[0])
+    assert not aggregates.ingest('AAPL', None, sentiments[0])
+    
+    summary = aggregates.summary('AAPL')
+    expected = get_sentiment_summary([dict(s, label=s['label'].lower()) for s in sentiments])
+    for field in expected:
+        assert summary[field] == expected[field], field
+    
+    assert summary['ewma_score'] == round(((0.6 * 0.5 - 0.4 * 0.5) * 0.5 + 0.2 * 0.5) * 0.5, 4)
+    assert summary['impact_articles'] == 3 and summary['high_impact_articles'] == 2
+    assert summary['average_impact_score'] == round((90 + 40 + 65) / 3, 2)
+    
+    # Only the two newest hourly buckets are kept
+    assert [bucket['start'] for bucket in summary['buckets']] == [base + 2 * 3600, base + 3 * 3600]
+    assert summary['buckets'][0]['positive_count'] == 1 and summary['buckets'][1]['neutral_count'] == 1
+    print(f"  ✅ {summary['total_news']} articles aggregated, EWMA {summary['ewma_score']}")
+    
+    empty = aggregates.summary('MSFT')
+    assert empty['total_news'] == 0 and empty['overall_sentiment'] == 'neutral' and empty['buckets'] == []
+
+def test_analyzers_aggregated_separately():
+    """The same article scored by /news and by the monitor lands in separate aggregates"""
+    aggregates = SentimentAggregates()
+    assert aggregates.ingest('TSLA', 'a1', {'label': 'positive', 'score': 0.5}, {'impact_score': 70.0, 'impact_level': 'HIGH'})
+    assert aggregates.ingest('TSLA', 'a1', {'label': 'neutral', 'score': 0.02}, analyzer='monitor')
+    assert not aggregates.ingest('TSLA', 'a1', {'label': 'neutral', 'score': 0.02}, analyzer='monitor')
+    
+    simple, monitor = aggregates.summary('TSLA'), aggregates.summary('TSLA', analyzer='monitor')
+    assert simple['analyzer'] == 'simple' and simple['positive_count'] == 1 and simple['ewma_score'] == 0.5
+    assert monitor['analyzer'] == 'monitor' and monitor['neutral_count'] == 1 and monitor['impact_articles'] == 0
+    assert aggregates.symbols() == ['TSLA'] and aggregates.stats()['symbols'] == 1
+    aggregates.reset('TSLA')
+    assert aggregates.summary('TSLA', analyzer='monitor')['total_news'] == 0
+    print("  ✅ Analyzers aggregated separately")
+
+def test_most_recent_article_dominates_ewma():
+    """A newest-first batch is folded in by time, so the latest article weighs most"""
+    aggregates = SentimentAggregates(alpha=0.5)
+    base = 1700000000
+    # As fetch_news returns them: newest first
+    items = [
+        {'id': 'new', 'datetime': base + 7200},
+        {'id': 'mid', 'datetime': base + 3600},
+        {'id': 'old', 'datetime': base}
+    ]
+    results = [({'label': 'negative', 'score': -0.8}, None), ({'label': 'neutral', 'score': 0.0}, None), ({'label': 'positive', 'score': 0.8}, None)]
+    assert aggregates.ingest_many('NVDA', items, results, analyzer='monitor') == 3
+    # old sets 0.8, mid halves it to 0.4, new pulls it to 0.4 * 0.5 - 0.8 * 0.5
+    ewma = aggregates.summary('NVDA', analyzer='monitor')['ewma_score']
+    assert ewma == round((0.8 * 0.5) * 0.5 - 0.8 * 0.5, 4) and ewma < 0
+
+    shuffled = SentimentAggregates(alpha=0.5)
+    order = [1, 2, 0]
+    shuffled.ingest_many('NVDA', [items[i] for i in order], [results[i] for i in order])
+    assert shuffled.summary('NVDA')['ewma_score'] == ewma
+    print(f"  ✅ Most recent article dominates the EWMA ({ewma})")
+
+if __name__ == "__main__":
+    print("🚀 Testing per-symbol sentiment aggregates")
+    print("=" * 60)
+    test_aggregates_match_full_recompute()
+    test_analyzers_aggregated_separately()
+    test_most_recent_article_dominates_ewma()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the sentiment worker pool
+Scores the same articles in worker processes and in-process and compares them
+"""
+
+from benchmark import make_articles
+from sentiment import analyze_news_sentiment
+from sentiment_pool import SentimentPool
+from simple_sentiment import simple_analyzer
+
+def test_pool_matches_in_process_scoring():
+    """Chunked results from two workers come back complete and in input order"""
+    articles = make_articles(50, duplicate_ratio=0.2)
+    pool = SentimentPool(workers=2, chunk_size=8)
+    
+    try:
+        results = pool.analyze_many(articles, 'TSLA')
+        assert results == simple_analyzer.analyze_many(articles, 'TSLA')
+        assert [result['news_id'] for result in results] == [article['id'] for article in articles]
+        
+        news_results = pool.analyze_news_many(articles, 'TSLA')
+        assert news_results == [analyze_news_sentiment(article, 'TSLA') for article in articles]
+        
+        stats = pool.stats()
+        assert stats['running'] and stats['chunks'] == 14 and stats['inline_batches'] == 0
+        
+        # A request-sized batch is split across the workers; a tiny one stays in-process
+        pool.analyze_many(articles[:20], 'TSLA')
+        pool.analyze_many(articles[:3], 'TSLA')
+        assert pool.stats()['chunks'] == 14 + 3 and pool.stats()['inline_batches'] == 1
+        print(f"  ✅ {len(articles)} articles scored in {stats['chunks']} chunks across {stats['workers']} workers")
+    finally:
+        pool.close()
+    
+    # A disabled pool scores in-process
+    inline = SentimentPool(workers=0)
+    assert inline.analyze_many(articles[:5], 'TSLA') == simple_analyzer.analyze_many(articles[:5], 'TSLA')
+    assert inline.stats()['inline_batches'] == 1 and not inline.stats()['running']
+
+def test_monitor_scores_new_articles_through_the_pool():
+    """monitor_symbol sends its unseen articles to the pool as one batch"""
+    import stock_monitor
+    from state_store import MemoryStateStore
+    
+    pool = SentimentPool(workers=2, chunk_size=8, min_chunk_size=1)
+    original_pool, original_store = stock_monitor.sentiment_pool, stock_monitor.state_store
+    stock_monitor.sentiment_pool, stock_monitor.state_store = pool, MemoryStateStore()
+    try:
+        _, result = stock_monitor.monitor_symbol('NVDA')
+        stats = pool.stats()
+        assert stats['batches'] == 1 and stats['articles'] == result['analyzed_articles'] > 0
+        assert stats['chunks'] == 2 and stats['inline_batches'] == 0
+        for article in result['articles']:
+            expected = analyze_news_sentiment(article, 'NVDA')
+            assert article['sentiment_analysis']['score'] == expected['score']
+        print(f"  ✅ Monitor scored {stats['articles']} articles in {stats['chunks']} pooled chunks")
+    finally:
+        stock_monitor.sentiment_pool, stock_monitor.state_store = original_pool, original_store
+        pool.close()
+
+if __name__ == "__main__":
+    print("🚀 Testing the sentiment worker pool")
+    print("=" * 60)
+    test_pool_matches_in_process_scoring()
+    test_monitor_scores_new_articles_through_the_pool()
+    print("\n✅ All tests completed!")
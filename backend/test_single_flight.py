@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight request coalescing
+"""
+
+import threading
+import time
+from single_flight import SingleFlight
+
+def run_concurrently(flight, key, func, callers=8):
+    """Start callers on the same key and release func once all of them are waiting"""
+    release = threading.Event()
+    outcomes = [None] * callers
+
+    def leader_func():
+        assert release.wait(5)
+        return func()
+
+    def caller(index):
+        try:
+            outcomes[index] = ('ok', flight.do(key, leader_func))
+        except Exception as e:
+            outcomes[index] = ('error', e)
+
+    threads = [threading.Thread(target=caller, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with flight._lock:
+            call = flight._calls.get(key)
+            if call is not None and call.waiters == callers - 1:
+                break
+        time.sleep(0.005)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+def test_concurrent_callers_share_one_execution():
+    """Callers with the same key run the function once and all get its result"""
+    flight = SingleFlight()
+    executions = []
+    outcomes = run_concurrently(flight, ('quote', 'AAPL'), lambda: executions.append(1) or {'c': 189.5})
+    assert len(executions) == 1
+    assert outcomes == [('ok', {'c': 189.5})] * 8
+    stats = flight.stats()
+    assert stats['quote']['executed'] == 1 and stats['quote']['coalesced'] == 7 and stats['in_flight'] == 0
+
+    # Once finished, the key runs fresh again
+    assert flight.do(('quote', 'AAPL'), lambda: 'fresh') == 'fresh'
+    print(f"  ✅ 8 callers, 1 execution: {stats['quote']}")
+
+def test_exception_reaches_every_waiter():
+    """The leader's exception is raised in every coalesced caller and the key is released"""
+    flight = SingleFlight()
+    error = ValueError('rate limited')
+
+    def fail():
+        raise error
+
+    outcomes = run_concurrently(flight, ('news', 'TSLA'), fail, callers=5)
+    assert outcomes == [('error', error)] * 5
+    assert flight.stats()['in_flight'] == 0
+    assert flight.do(('news', 'TSLA'), lambda: 'recovered') == 'recovered'
+    print("  ✅ Exception reaches every waiter")
+
+def test_do_many_batches_and_none_keys():
+    """do_many runs only keys not in flight, never shares None keys, and keeps key order"""
+    flight = SingleFlight()
+    batches = []
+
+    def analyze(values):
+        batches.append(list(values))
+        return [value.upper() for value in values]
+
+    assert flight.do_many([None, None, 'k'], ['a', 'a', 'b'], analyze) == ['A', 'A', 'B']
+    assert batches == [['a', 'a', 'b']] and flight.stats()['in_flight'] == 0
+
+    # A batch overlapping one in flight waits for the shared key and runs the rest itself
+    started, release = threading.Event(), threading.Event()
+
+    def slow(values):
+        started.set()
+        assert release.wait(5)
+        return analyze(values)
+
+    first = {}
+    thread = threading.Thread(target=lambda: first.update(result=flight.do_many(['x', 'y'], ['x', 'y'], slow)))
+    thread.start()
+    assert started.wait(5)
+    second = {}
+    joiner = threading.Thread(target=lambda: second.update(result=flight.do_many(['y', None, 'z'], ['y', 'n', 'z'], analyze)))
+    joiner.start()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and flight._calls['y'].waiters == 0:
+        time.sleep(0.005)
+    release.set()
+    thread.join(5)
+    joiner.join(5)
+    assert first['result'] == ['X', 'Y'] and second['result'] == ['Y', 'N', 'Z']
+    assert batches[1:] == [['n', 'z'], ['x', 'y']]
+    assert flight.stats()['k']['executed'] == 1 and flight.stats()['y']['coalesced'] == 1
+
+    # An error fails the whole batch and releases its keys
+    def broken(values):
+        raise RuntimeError('model unavailable')
+
+    try:
+        flight.do_many(['p', None], ['p', 'q'], broken)
+        assert False, "expected the batch to fail"
+    except RuntimeError:
+        pass
+    assert flight.stats()['in_flight'] == 0
+    print("  ✅ do_many batches around in-flight and None keys")
+
+if __name__ == "__main__":
+    print("🚀 Testing single-flight coalescing")
+    print("=" * 60)
+    test_concurrent_callers_share_one_execution()
+    test_exception_reaches_every_waiter()
+    test_do_many_batches_and_none_keys()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for the monitor state stores
+Runs the same operations against the in-memory and SQLite backends
+"""
+
+import os
+import sqlite3
+import tempfile
+from state_store import BloomDedupStateStore, MemoryStateStore, SQLiteStateStore, StateStore, create_state_store
+
+NOW = 1700000000.0
+
+def exercise(store):
+    """Apply one sequence of updates and return everything the store reports"""
+    observed = [store.get_last_price('AAPL')]
+    for i in range(8):
+        store.record_price('AAPL', 100.0 + i, NOW + i)
+    store.record_price('TSLA', 250.0, NOW)
+    for i, news_id in enumerate([1, 2, 'mock_3', 2]):
+        store.mark_seen('AAPL', news_id, NOW - 7200 + i * 3600)
+    store.mark_seen('TSLA', 1, NOW)
+
+    observed += [
+        store.get_last_price('AAPL'), store.get_last_price('TSLA'), store.get_last_price('NVDA'),
+        store.price_history('AAPL'), store.price_history('AAPL', limit=2), store.price_history('NVDA'),
+        store.has_seen('AAPL', 1), store.has_seen('AAPL', '2'), store.has_seen('TSLA', 2), store.has_seen('NVDA', 1)
+    ]
+    # With a one-hour TTL only the ids seen in the last hour survive
+    observed.append(store.purge_expired(now=NOW + 1800))
+    observed += [store.has_seen('AAPL', 1), store.has_seen('AAPL', 'mock_3'), store.has_seen('AAPL', 2), store.has_seen('TSLA', 1)]
+    stats = store.stats()
+    observed.append({key: stats[key] for key in ('symbols', 'seen_news_ids')})
+    return observed
+
+def test_memory_and_sqlite_agree():
+    """Both backends give the same prices, history window, seen ids and purge counts"""
+    with tempfile.TemporaryDirectory() as directory:
+        memory = MemoryStateStore(ttl_hours=1, history_size=5)
+        sqlite_store = SQLiteStateStore(path=os.path.join(directory, 'state.db'), ttl_hours=1, history_size=5)
+        expected = exercise(memory)
+        assert exercise(sqlite_store) == expected
+        sqlite_store.close()
+    assert expected[4] == [(NOW + i, 100.0 + i) for i in range(3, 8)]
+    assert expected[-1] == {'symbols': 2, 'seen_news_ids': 3}
+    print(f"  ✅ Memory and SQLite backends agree ({len(expected)} observations)")
+
+def test_sqlite_state_survives_reopen():
+    """A reopened WAL database keeps last prices and seen ids, so restarts don't re-alert"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'state.db')
+        store = SQLiteStateStore(path=path, ttl_hours=1, history_size=3)
+        assert store._conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        for i in range(5):
+            store.record_price('AAPL', 180.0 + i, NOW + i)
+        store.mark_seen('AAPL', 'abc', NOW)
+        store.purge_expired(now=NOW)
+        # Without a checkpoint the rows may still sit in the WAL file; another connection sees them
+        assert sqlite3.connect(path).execute('SELECT COUNT(*) FROM seen_news').fetchone()[0] == 1
+        store.close()
+
+        reopened = SQLiteStateStore(path=path, ttl_hours=1, history_size=3)
+        assert reopened.get_last_price('AAPL') == 184.0
+        assert reopened.price_history('AAPL') == [(NOW + 2, 182.0), (NOW + 3, 183.0), (NOW + 4, 184.0)]
+        assert reopened.stats()['price_points'] == 3
+        assert reopened.has_seen('AAPL', 'abc') and not reopened.has_seen('AAPL', 'def')
+
+        # Bloom dedup over SQLite warms its filters from the recent rows on disk
+        bloom = BloomDedupStateStore(reopened)
+        assert bloom.persist_seen and bloom.has_seen('AAPL', 'abc') is False  # older than the TTL
+        bloom.mark_seen('AAPL', 'fresh')
+        bloom.close()
+        restarted = BloomDedupStateStore(SQLiteStateStore(path=path, ttl_hours=1))
+        assert restarted.has_seen('AAPL', 'fresh')
+        restarted.close()
+    print("  ✅ SQLite state survives a reopen")
+
+def test_create_state_store_selection():
+    """create_state_store picks the backend and wraps it for Bloom dedup"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'state.db')
+        assert isinstance(create_state_store('memory', path, 'exact'), MemoryStateStore)
+        assert isinstance(create_state_store('redis', path, 'exact'), MemoryStateStore)
+        sqlite_store = create_state_store('sqlite', path, 'exact')
+        assert isinstance(sqlite_store, SQLiteStateStore) and sqlite_store.stats()['path'] == path
+        sqlite_store.close()
+
+        bloom = create_state_store('memory', path, 'bloom')
+        assert isinstance(bloom, BloomDedupStateStore) and isinstance(bloom.inner, MemoryStateStore)
+        assert not bloom.persist_seen and bloom.stats()['dedup']['method'] == 'bloom'
+        durable = create_state_store('sqlite', path, 'bloom')
+        assert isinstance(durable.inner, SQLiteStateStore) and durable.persist_seen
+        durable.close()
+    print("  ✅ create_state_store selection")
+
+def test_incomplete_backend_rejected():
+    """A backend missing part of the interface fails when it is created, not on first use"""
+    class PricesOnly(StateStore):
+        def get_last_price(self, symbol):
+            return None
+
+        def record_price(self, symbol, price, timestamp=None):
+            pass
+
+    for store_class in (StateStore, PricesOnly):
+        try:
+            store_class()
+            assert False, f"{store_class.__name__} should not be instantiable"
+        except TypeError as e:
+            assert 'has_seen' in str(e)
+    print("  ✅ Incomplete backend rejected at construction")
+
+if __name__ == "__main__":
+    print("🚀 Testing the monitor state stores")
+    print("=" * 60)
+    test_memory_and_sqlite_agree()
+    test_sqlite_state_survives_reopen()
+    test_create_state_store_selection()
+    test_incomplete_backend_rejected()
+    print("\n✅ All tests completed!")
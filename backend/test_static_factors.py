@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed per-symbol factor tables
+"""
+
+from advanced_impact_calculator import advanced_impact_calculator
+from simple_impact_calculator import simple_impact_calculator
+from simple_sentiment import simple_analyzer
+
+ITEM = {'id': 1, 'headline': 'Earnings beat expectations', 'summary': '', 'datetime': None}
+SENTIMENT = {'score': 0.6, 'confidence': 0.9, 'impact_multiplier': 1.3, 'news_type': 'EARNINGS', 'entities': {'industry_keywords': ['chip']}}
+
+def test_factors_computed_once_and_invalidated():
+    """Factors match the metadata functions, are reused, and follow a metadata refresh"""
+    metadata = simple_analyzer.get_stock_metadata('NVDA')
+    factors = advanced_impact_calculator.static_factors.get('NVDA')
+    assert factors['volatility_factor'] == advanced_impact_calculator.calculate_volatility_factor(metadata)
+    assert factors['liquidity_factor'] == advanced_impact_calculator.calculate_liquidity_factor(metadata)
+    assert advanced_impact_calculator.static_factors.get('NVDA') is factors
+    assert simple_impact_calculator.static_factors.get('NVDA')['volatility_factor'] == simple_impact_calculator.calculate_volatility_factor(metadata)
+    
+    before_simple = simple_impact_calculator.calculate_simple_impact('NVDA', ITEM, SENTIMENT)
+    before_advanced = advanced_impact_calculator.calculate_advanced_impact('NVDA', ITEM, SENTIMENT)
+    
+    # Metadata edited in place is only picked up after an explicit refresh
+    original_beta = metadata['beta']
+    try:
+        metadata['beta'] = original_beta * 2
+        assert simple_impact_calculator.calculate_simple_impact('NVDA', ITEM, SENTIMENT) == before_simple
+        simple_analyzer.refresh_metadata('NVDA')
+        simple_analyzer.metadata_cache.put('simple', 'NVDA', metadata)  # as if the refresh loaded the edited values
+        
+        after_simple = simple_impact_calculator.calculate_simple_impact('NVDA', ITEM, SENTIMENT)
+        after_advanced = advanced_impact_calculator.calculate_advanced_impact('NVDA', ITEM, SENTIMENT)
+        assert after_simple['metadata']['beta'] == original_beta * 2
+        assert after_simple['factors']['volatility_factor'] > before_simple['factors']['volatility_factor']
+        assert after_advanced['factors']['volatility_factor'] > before_advanced['factors']['volatility_factor']
+    finally:
+        metadata['beta'] = original_beta
+        simple_analyzer.refresh_metadata()
+    
+    assert simple_impact_calculator.calculate_simple_impact('NVDA', ITEM, SENTIMENT) == before_simple
+    assert advanced_impact_calculator.calculate_advanced_impact('NVDA', ITEM, SENTIMENT) == before_advanced
+    print(f"  ✅ Factor tables: {advanced_impact_calculator.static_factors.stats()}")
+
+if __name__ == "__main__":
+    print("🚀 Testing precomputed factor tables")
+    print("=" * 60)
+    test_factors_computed_once_and_invalidated()
+    print("\n✅ All tests completed!")
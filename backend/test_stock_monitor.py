@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the concurrent monitoring run and its deadline
+A slow symbol's news fetch is held past the deadline to check what it leaves behind
+"""
+
+import threading
+import time
+import stock_monitor
+from sentiment_aggregates import SentimentAggregates
+from state_store import MemoryStateStore
+
+class Harness:
+    """Swaps the monitor's news source, state and email for stand-ins"""
+
+    def __init__(self, hold=(), slow_email=()):
+        self.hold = set(hold)
+        self.slow_email = set(slow_email)
+        self.release = threading.Event()
+        self.emails = []
+        self.store = MemoryStateStore()
+        self.originals = {}
+
+    def fetch_news(self, symbol):
+        if symbol in self.hold:
+            assert self.release.wait(5)
+        return [
+            {'id': f'{symbol}-1', 'headline': f'{symbol} shares plunge after fraud investigation and terrible losses',
+             'summary': 'Investors fear a disaster.', 'source': 'Test', 'url': None, 'datetime': 1700000060},
+            {'id': f'{symbol}-2', 'headline': f'{symbol} opens a new office', 'summary': '',
+             'source': 'Test', 'url': None, 'datetime': 1700000000}
+        ]
+
+    def send_email(self, subject, body):
+        if any(subject.endswith(symbol) for symbol in self.slow_email):
+            time.sleep(0.4)
+        self.emails.append(subject)
+        return True
+
+    def __enter__(self):
+        replacements = {
+            'fetch_news': self.fetch_news,
+            'send_email': self.send_email,
+            'state_store': self.store,
+            'sentiment_aggregates': SentimentAggregates()
+        }
+        for name, value in replacements.items():
+            self.originals[name] = getattr(stock_monitor, name)
+            setattr(stock_monitor, name, value)
+        return self
+
+    def __exit__(self, *exc):
+        self.release.set()
+        join_monitor_threads()
+        for name, value in self.originals.items():
+            setattr(stock_monitor, name, value)
+
+def join_monitor_threads():
+    for thread in threading.enumerate():
+        if thread.name.startswith('monitor_'):
+            thread.join(5)
+
+def test_deadline_keeps_partial_results_and_leaves_late_news_unseen():
+    """Finished symbols are reported; a symbol past the deadline records nothing and is picked up next run"""
+    with Harness(hold={'SLOW'}) as harness:
+        run = stock_monitor.monitor_stocks_concurrent(['AAPL', 'SLOW', 'MSFT'], max_workers=3, deadline=0.3)
+        assert set(run['results']) == {'AAPL', 'MSFT'} and run['timed_out'] == ['SLOW']
+        assert run['completed'] == 2 and run['total'] == 3
+        assert run['timings']['AAPL']['status'] == 'ok' and run['timings']['SLOW']['status'] == 'timeout'
+        assert run['timings']['SLOW']['seconds'] >= 0.3 and run['elapsed_seconds'] < 2
+        assert any('deadline of 0.3s exceeded; skipped SLOW' in alert for alert in run['alerts'])
+        assert harness.store.has_seen('AAPL', 'AAPL-1') and harness.store.get_last_price('AAPL') is not None
+
+        # The straggler finishes after the run returned: no seen ids, price, aggregates or email
+        harness.release.set()
+        join_monitor_threads()
+        assert not harness.store.has_seen('SLOW', 'SLOW-1') and not harness.store.has_seen('SLOW', 'SLOW-2')
+        assert harness.store.get_last_price('SLOW') is None
+        assert stock_monitor.sentiment_aggregates.summary('SLOW', analyzer='monitor')['total_news'] == 0
+        assert not any(subject.endswith('SLOW') for subject in harness.emails)
+
+        # The next run reports the news the late run left behind
+        harness.hold.clear()
+        again = stock_monitor.monitor_stocks_concurrent(['AAPL', 'SLOW'], max_workers=2, deadline=5)
+        assert again['timed_out'] == [] and again['results']['SLOW']['analyzed_articles'] == 2
+        assert again['results']['AAPL']['analyzed_articles'] == 0
+        assert harness.store.has_seen('SLOW', 'SLOW-1')
+        print(f"  ✅ Partial results at the deadline, timings {run['timings']}")
+
+def test_symbol_past_its_commit_point_is_still_reported():
+    """A symbol already recording and alerting when the deadline hits is waited for, not dropped"""
+    with Harness(slow_email={'MSFT'}) as harness:
+        run = stock_monitor.monitor_stocks_concurrent(['MSFT'], max_workers=1, deadline=0.2)
+        assert run['timed_out'] == [] and run['results']['MSFT']['analyzed_articles'] == 2
+        assert run['timings']['MSFT']['status'] == 'ok' and run['timings']['MSFT']['seconds'] >= 0.2
+        assert 'Negative News Alert: MSFT' in harness.emails
+        assert any(alert.startswith('Negative news for MSFT') for alert in run['alerts'])
+        print("  ✅ Symbol past its commit point is still reported")
+
+if __name__ == "__main__":
+    print("🚀 Testing concurrent monitoring deadlines")
+    print("=" * 60)
+    test_deadline_keeps_partial_results_and_leaves_late_news_unseen()
+    test_symbol_past_its_commit_point_is_still_reported()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming analysis endpoints
+Compares the NDJSON/SSE streams with the regular /news and /advanced responses
+"""
+
+import json
+from fastapi.testclient import TestClient
+from main import app
+
+def test_news_stream_matches_news():
+    """Streamed article records match /news and end with a summary"""
+    client = TestClient(app)
+    expected = client.get('/news/AAPL').json()
+    
+    response = client.get('/news/AAPL/stream')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    records = [json.loads(line) for line in response.text.splitlines()]
+    
+    # Demo news gets fresh ids and timestamps per fetch, so compare the analysis itself
+    articles = [record for record in records if record['type'] == 'article']
+    assert len(articles) == len(expected['articles'])
+    for article, reference in zip(articles, expected['articles']):
+        assert article['headline'] == reference['headline']
+        assert article['sentiment_analysis'] == reference['sentiment_analysis']
+        assert set(article) == set(reference) | {'type'}
+    summary = records[-1]
+    assert summary['type'] == 'summary' and summary['analyzed_articles'] == expected['analyzed_articles']
+    print(f"  ✅ {len(articles)} streamed articles match /news")
+
+def test_advanced_stream_sse():
+    """SSE events carry the same analyses and overall summary as /advanced"""
+    client = TestClient(app)
+    expected = client.get('/advanced/TSLA').json()
+    
+    response = client.get('/advanced/TSLA/stream', params={'format': 'sse'})
+    assert response.headers['content-type'].startswith('text/event-stream')
+    events = [event for event in response.text.split('\n\n') if event]
+    names = [event.split('\n')[0].removeprefix('event: ') for event in events]
+    payloads = [json.loads(event.split('\n')[1].removeprefix('data: ')) for event in events]
+    
+    assert names[0] == 'metadata' and names[-1] == 'summary'
+    assert names.count('analysis') == len(expected['detailed_analyses'])
+    assert payloads[-1]['overall_analysis'] == expected['overall_analysis']
+    print(f"  ✅ {names.count('analysis')} SSE analyses, summary matches /advanced")
+    
+    assert client.get('/news/TSLA/stream', params={'format': 'xml'}).status_code == 400
+
+if __name__ == "__main__":
+    print("🚀 Testing streaming analysis endpoints")
+    print("=" * 60)
+    test_news_stream_matches_news()
+    test_advanced_stream_sse()
+    print("\n✅ All tests completed!")
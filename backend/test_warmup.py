@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Test script for the startup warm-up
+Runs every warm-up step in-process and checks the readiness report
+"""
+
+from warmup import Warmup
+
+def test_warmup_reports_steps_and_models():
+    """A finished warm-up is ready, timed per step and reports the loaded lexicons"""
+    warmup = Warmup(portfolio=['AAPL', 'TSLA'], include_advanced=False, enabled=True)
+    assert not warmup.ready
+    
+    warmup.start()
+    assert warmup.wait(timeout=120)
+    status = warmup.status()
+    
+    assert status['ready'] and status['state'] == 'ready'
+    assert [step['step'] for step in status['steps']] == [
+        'import_analyzers', 'textblob_lexicon', 'stock_metadata', 'warmup_batch', 'sentiment_pool'
+    ]
+    assert all(step['ok'] and step['seconds'] >= 0 for step in status['steps'])
+    assert status['models_loaded']['vader'] and status['models_loaded']['textblob']
+    for step in status['steps']:
+        print(f"  ✅ {step['step']}: {step['seconds']:.3f}s")
+    
+    # A disabled warm-up never blocks readiness
+    assert Warmup(enabled=False).start().ready
+
+if __name__ == "__main__":
+    print("🚀 Testing the startup warm-up")
+    print("=" * 60)
+    test_warmup_reports_steps_and_models()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,180 @@
+"""
+Startup warm-up and readiness
+
+The first request used to pay for importing the analyzers, building the VADER
+and TextBlob lexicons and filling the metadata cache. Warmup does all of that
+in a background thread when the server starts, scores a small batch so every
+lazy path has run once, and records how long each step took. /ready reports
+the result.
+"""
+
+import sys
+import threading
+import time
+from config import WARMUP_ENABLED, WARMUP_ADVANCED_MODEL
+
+# Enough variety to touch entities, news-type keywords, negation and impact factors
+WARMUP_ARTICLES = [
+    {
+        'id': 'warmup-1',
+        'headline': 'Company reports record quarterly earnings and raises guidance',
+        'summary': 'Analysts were surprised by the strong results and supplier commentary.',
+        'datetime': None,
+        'source': 'Warm-up',
+        'url': None
+    },
+    {
+        'id': 'warmup-2',
+        'headline': 'Regulators open investigation; shares are not expected to recover soon',
+        'summary': 'Competition and raw material costs weigh on the outlook.',
+        'datetime': None,
+        'source': 'Warm-up',
+        'url': None
+    }
+]
+
+class Warmup:
+    """Preloads analyzers and caches, then reports readiness with per-step timings"""
+
+    def __init__(self, portfolio=None, include_advanced=WARMUP_ADVANCED_MODEL, enabled=WARMUP_ENABLED):
+        self.portfolio = portfolio
+        self.include_advanced = include_advanced
+        self.enabled = enabled
+        self.state = 'pending'
+        self.steps = []
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+        self._done = threading.Event()
+
+    def start(self):
+        """Run the warm-up in a background thread so health checks answer meanwhile"""
+        if not self.enabled:
+            self.state = 'skipped'
+            self._done.set()
+            return self
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name='warmup', daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def ready(self):
+        return self.state in ('ready', 'skipped')
+
+    def run(self):
+        self.state = 'warming'
+        self.started_at = time.time()
+        print("🔥 Warming up analyzers...")
+
+        ok = all([
+            self._step('import_analyzers', self._import_analyzers),
+            self._step('textblob_lexicon', self._load_textblob_lexicon),
+            self._step('stock_metadata', self._prefill_metadata),
+            self._step('warmup_batch', self._score_warmup_batch),
+            self._step('sentiment_pool', self._start_sentiment_pool),
+        ])
+        if self.include_advanced:
+            ok = self._step('transformer_model', self._load_transformer) and ok
+
+        self.finished_at = time.time()
+        self.state = 'ready' if ok else 'failed'
+        print(f"{'✅' if ok else '❌'} Warm-up {self.state} in {self.finished_at - self.started_at:.2f}s")
+        self._done.set()
+        return ok
+
+    def _step(self, name, func):
+        start = time.perf_counter()
+        try:
+            detail = func()
+            error = None
+        except Exception as e:
+            detail = None
+            error = str(e)
+            print(f"❌ Warm-up step {name} failed: {e}")
+        self.steps.append({
+            'step': name,
+            'seconds': round(time.perf_counter() - start, 4),
+            'ok': error is None,
+            'detail': detail,
+            'error': error
+        })
+        return error is None
+
+    def _import_analyzers(self):
+        # Builds the VADER lexicon and the keyword matchers at import
+        import sentiment
+        import simple_sentiment
+        import simple_impact_calculator
+
+    def _load_textblob_lexicon(self):
+        # pattern parses its XML lexicon on first use
+        from textblob.en import sentiment as textblob_lexicon
+        return {'words': len(textblob_lexicon)}
+
+    def _prefill_metadata(self):
+        # Importing the analyzers registers their metadata sources with the shared cache
+        import impact_calculator
+        from metadata_cache import metadata_cache
+        from simple_sentiment import simple_analyzer
+        symbols = self._portfolio()
+        loaded = metadata_cache.preload(symbols)
+        return {'symbols': len(symbols), 'loaded': loaded}
+
+    def _score_warmup_batch(self):
+        from sentiment import analyze_news_sentiment
+        from simple_sentiment import simple_analyzer
+        from simple_impact_calculator import simple_impact_calculator
+
+        symbol = (self._portfolio() or ['AAPL'])[0]
+        for article, result in zip(WARMUP_ARTICLES, simple_analyzer.analyze_many(WARMUP_ARTICLES, symbol)):
+            simple_impact_calculator.calculate_simple_impact(symbol, article, result)
+            analyze_news_sentiment(article, symbol)
+        return {'articles': len(WARMUP_ARTICLES), 'symbol': symbol}
+
+    def _start_sentiment_pool(self):
+        from sentiment_pool import sentiment_pool
+        if sentiment_pool.enabled:
+            sentiment_pool.start()
+        return {'workers': sentiment_pool.workers}
+
+    def _load_transformer(self):
+        from advanced_sentiment import advanced_analyzer
+        advanced_analyzer.engine.load()
+        advanced_analyzer.engine.predict([WARMUP_ARTICLES[0]['headline']])
+        return {'model_path': advanced_analyzer.engine.model_path}
+
+    def _portfolio(self):
+        if self.portfolio is None:
+            from stock_monitor import PORTFOLIO
+            self.portfolio = list(PORTFOLIO)
+        return self.portfolio
+
+    def models_loaded(self):
+        """What is actually in memory right now, without importing anything to find out"""
+        simple = sys.modules.get('simple_sentiment')
+        textblob = sys.modules.get('textblob.en')
+        advanced = sys.modules.get('advanced_sentiment')
+        return {
+            'vader': simple is not None and hasattr(simple, 'simple_analyzer'),
+            'textblob': textblob is not None and dict.__len__(textblob.sentiment) > 0,
+            'transformer': advanced is not None and advanced.advanced_analyzer.engine.model is not None
+        }
+
+    def status(self):
+        total = None
+        if self.started_at is not None and self.finished_at is not None:
+            total = round(self.finished_at - self.started_at, 4)
+        return {
+            'ready': self.ready,
+            'state': self.state,
+            'total_seconds': total,
+            'steps': list(self.steps),
+            'models_loaded': self.models_loaded()
+        }
+
+# Global instance
+warmup = Warmup()